@@ -0,0 +1,64 @@
+"""Scaling of match_cashflow_to_discount_curve against the previous nested loop.
+
+Run from the repository root:
+    python -m benchmarks.match_cashflow_to_discount_curve
+"""
+
+import datetime
+import timeit
+from typing import Dict, List
+
+from src.analytics.utils.cashflow import match_cashflow_to_discount_curve
+
+
+def _nested_loop_match(
+    cashflows: List[Dict],
+    discount_curve: List[Dict]
+) -> List[Dict]:
+    matched_list = []
+
+    for cashflow in cashflows:
+        for rate in discount_curve:
+            if rate['date'] == cashflow["date"]:
+                matched_list.append(
+                    {
+                        "date": cashflow["date"],
+                        "cashflow_value": cashflow["cashflow_value"],
+                        "discount_rate": rate["discount_rate"]
+                    }
+                )
+
+    return matched_list
+
+
+def _daily_discount_curve(number_of_days: int) -> List[Dict]:
+    start = datetime.datetime(2000, 1, 1)
+    return [
+        {"date": start + datetime.timedelta(days=day), "discount_rate": 0.03 + day * 1e-6}
+        for day in range(number_of_days)
+    ]
+
+
+def _monthly_cashflows(number_of_cashflows: int) -> List[Dict]:
+    start = datetime.datetime(2000, 1, 1)
+    return [
+        {"date": start + datetime.timedelta(days=30 * (month + 1)), "cashflow_value": 10.00}
+        for month in range(number_of_cashflows)
+    ]
+
+
+def main() -> None:
+    print(f"{'curve points':>12} {'cashflows':>10} {'nested (ms)':>12} {'indexed (ms)':>13} {'speedup':>8}")
+    for number_of_days, number_of_cashflows in [(1_000, 30), (3_650, 120), (10_950, 360), (18_250, 600)]:
+        discount_curve = _daily_discount_curve(number_of_days)
+        cashflows = _monthly_cashflows(number_of_cashflows)
+        assert _nested_loop_match(cashflows, discount_curve) == match_cashflow_to_discount_curve(cashflows, discount_curve)
+
+        repeats = 3
+        nested = min(timeit.repeat(lambda: _nested_loop_match(cashflows, discount_curve), number=1, repeat=repeats))
+        indexed = min(timeit.repeat(lambda: match_cashflow_to_discount_curve(cashflows, discount_curve), number=1, repeat=repeats))
+        print(f"{number_of_days:>12} {number_of_cashflows:>10} {nested * 1e3:>12.2f} {indexed * 1e3:>13.2f} {nested / indexed:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
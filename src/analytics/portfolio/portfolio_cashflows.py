@@ -2,7 +2,8 @@ import datetime
 from typing import Dict, List, Tuple
 
 from src.analytics.utils.date_time import (
-    _default_date
+    to_day_number,
+    _day_number_on_or_after
 )
 
 def get_portfolio_future_cashflows(
@@ -23,6 +24,7 @@ def get_portfolio_future_cashflows(
         
     * Uses the portfolio holdings date attribute as the effective pricing date.
     * Includes only cashflows that have not yet reached their record ex date.
+    * Dates are "YYYY-MM-DD" strings, or day numbers for typed indices (see date_time.to_typed_dates).
 
     Args:
         portfolio_holdings (Dict): A dictionary containing the portfolio holdings and the effective pricing date.
@@ -39,7 +41,7 @@ def get_portfolio_future_cashflows(
     assert isinstance(key_mapping, list), "key_mapping input must be of type list."
     assert all(isinstance(key_tuple, tuple) and len(key_tuple) == 2 for key_tuple in key_mapping), "key_mapping input must be a list of tuples, each tuple containing two strings."
     
-    pricing_date = _default_date(portfolio_holdings["date"])
+    pricing_date = to_day_number(portfolio_holdings["date"])
     portfolio_holdings_map = {id: info["volume"] for id, info in portfolio_holdings["holdings"].items()}
     
     portfolio_future_cashflows = {}
@@ -48,12 +50,12 @@ def get_portfolio_future_cashflows(
         
         for date, cashflow in security_cashflows.items():
             
-            ex_coupon_date = _default_date(cashflow['date']['ex_date'])
-            payment_date = _default_date(cashflow['date']['payment_date'])
+            ex_coupon_date = to_day_number(cashflow['date']['ex_date'])
+            payment_date = to_day_number(cashflow['date']['payment_date'])
             if ex_coupon_date < pricing_date < payment_date:
                 continue
             
-            if _default_date(date) < pricing_date:
+            if to_day_number(date) < pricing_date:
                 continue
             
             portfolio_future_cashflows[date] = {} if date not in portfolio_future_cashflows else portfolio_future_cashflows[date]
@@ -65,7 +67,7 @@ def get_portfolio_future_cashflows(
                 key_mapping
             )
             
-    portfolio_future_cashflows = {k: v for k, v in sorted(portfolio_future_cashflows.items(), key=lambda item: _default_date(item[0]))}
+    portfolio_future_cashflows = {k: v for k, v in sorted(portfolio_future_cashflows.items(), key=lambda item: to_day_number(item[0]))}
             
     return portfolio_future_cashflows
 
@@ -88,6 +90,7 @@ def get_portfolio_historical_cashflows(
         cashflow profiles of those holdings.
         
     * Uses the portfolio holdings date attribute as the effective pricing date.
+    * Dates are "YYYY-MM-DD" strings, or day numbers for typed indices (see date_time.to_typed_dates).
 
     Args:
         portfolio_holdings_index (Dict): A dictionary containing the portfolio holdings and the effective pricing date.
@@ -102,14 +105,17 @@ def get_portfolio_historical_cashflows(
     assert security_cashflows_object, "security_cashflows_object input must not be empty."
     
     holdings_dates = [date for date in portfolio_holdings_index.keys()]
-    ordered_holdings_dates = sorted(holdings_dates, key=lambda date: _default_date(date))
+    ordered_holdings_dates = sorted(holdings_dates, key=to_day_number)
+    ordered_holdings_days = [to_day_number(date) for date in ordered_holdings_dates]
+    # Payment dates have no time of day, so are on or after pricing_date from this day number.
+    pricing_day = _day_number_on_or_after(pricing_date)
         
     portfolio_historical_cashflows = {}
 
     for i in range(0, len(ordered_holdings_dates)):
         
-        holdings_date = _default_date(ordered_holdings_dates[i])
-        next_holdings_date = _default_date(ordered_holdings_dates[i+1]) if i+1 < len(ordered_holdings_dates) else datetime.datetime.max
+        holdings_date = ordered_holdings_days[i]
+        next_holdings_date = ordered_holdings_days[i+1] if i+1 < len(ordered_holdings_days) else float("inf")
         
         holdings_at_date = portfolio_holdings_index[ordered_holdings_dates[i]]['holdings']
         
@@ -123,10 +129,10 @@ def get_portfolio_historical_cashflows(
             
             for date, cashflow in security_cashflows.items():
                 
-                ex_coupon_date = _default_date(cashflow['date']['ex_date'])
-                coupon_payment_date = _default_date(cashflow['date']['payment_date'])
+                ex_coupon_date = to_day_number(cashflow['date']['ex_date'])
+                coupon_payment_date = to_day_number(cashflow['date']['payment_date'])
                 
-                if not (holdings_date < ex_coupon_date < next_holdings_date) or (coupon_payment_date >= pricing_date):
+                if not (holdings_date < ex_coupon_date < next_holdings_date) or (coupon_payment_date >= pricing_day):
                     continue
                                 
                 if date not in portfolio_historical_cashflows:
@@ -139,7 +145,7 @@ def get_portfolio_historical_cashflows(
                     key_mapping
                 )
     
-    portfolio_historical_cashflows = {k: v for k, v in sorted(portfolio_historical_cashflows.items(), key=lambda item: _default_date(item[0]))}
+    portfolio_historical_cashflows = {k: v for k, v in sorted(portfolio_historical_cashflows.items(), key=lambda item: to_day_number(item[0]))}
     
     return portfolio_historical_cashflows
 
@@ -1,21 +1,330 @@
 import datetime
-from typing import Dict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 from src.analytics.utils.date_time import (
+    to_day_number,
     _default_date
 )
 
-import datetime
+NO_PRICE_AVAILABLE: Dict[str, Any] = {
+    "date": datetime.datetime(2000,1,1),
+    "per_original_face_value": -1.00,
+    "currency": "N/A",
+    "base_currency_conversion_rate": 1.00,
+    "value": 0
+}
+
+PRICE_FIELDS = [
+    "date",
+    "per_original_face_value",
+    "currency",
+    "base_currency_conversion_rate",
+    "value"
+]
+
+
+class AsOfPriceIndex:
+    """Latest price on or before a date for each security of a price history index
+        ({security: {date: price}}, dated by "YYYY-MM-DD" strings or day numbers).
+
+    The price history is validated once, when the index is built. Prices are then kept
+    sorted by security and day number, so the latest prices of every security on any number
+    of dates are found in a single searchsorted pass.
+    """
+
+    def __init__(self, price_history_index: Dict) -> None:
+        _validate_price_history(price_history_index)
+        self.securities = list(price_history_index.keys())
+
+        position_list: List[int] = []
+        day_list: List[int] = []
+        prices: List[Dict] = []
+        for position, prices_by_date in enumerate(price_history_index.values()):
+            for date, price in prices_by_date.items():
+                position_list.append(position)
+                day_list.append(to_day_number(date))
+                prices.append(price)
+
+        security_positions = np.asarray(position_list, dtype=np.int64)
+        days = np.asarray(day_list, dtype=np.int64)
+        order = np.lexsort((days, security_positions))
+        self._security_positions = security_positions[order]
+        self._days = days[order]
+        self._prices = [prices[i] for i in order]
+
+        # Prices are searched by security_position * span + (day - first_day), increasing
+        # across securities and, within a security, with the day.
+        self._first_day = int(days.min()) if days.size else 0
+        self._span = int(days.max()) - self._first_day + 1 if days.size else 1
+        self._keys = self._security_positions * self._span + (self._days - self._first_day)
+        self._fields: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def positions(self, pricing_dates: Sequence[Union[str, datetime.date, int]]) -> np.ndarray:
+        """Positions of the latest prices on or before each pricing date.
+
+        Args:
+            pricing_dates (Sequence[Union[str, datetime.date, int]]): Pricing dates (times of day are ignored).
+
+        Returns:
+            np.ndarray: (pricing dates x securities) positions in the index, -1 where a security
+                has no price on or before the date.
+        """
+        pricing_days = np.asarray([to_day_number(date) for date in pricing_dates], dtype=np.int64)
+        securities = np.arange(len(self.securities))
+        if not len(self):
+            return np.full((pricing_days.size, securities.size), -1, dtype=np.int64)
+
+        offsets = np.clip(pricing_days - self._first_day, -1, self._span - 1)
+        # Searching security by security keeps the search keys close to sorted, which is much faster.
+        positions = (np.searchsorted(self._keys, securities[:, None] * self._span + offsets, side="right") - 1).T
+        # Before a security's first price the search lands on the previous security.
+        is_priced = (positions >= 0) & (self._security_positions[np.maximum(positions, 0)] == securities)
+
+        return np.where(is_priced, positions, -1)
+
+    def field_matrix(self, positions: np.ndarray, field: str, missing: Any) -> np.ndarray:
+        """A price field (see PRICE_FIELDS) at positions from AsOfPriceIndex.positions.
+
+        Args:
+            positions (np.ndarray): Positions in the index, -1 where there is no price.
+            field (str): Price field.
+            missing (Any): Value where there is no price.
+
+        Returns:
+            np.ndarray: Field values with the shape of positions.
+        """
+        values = self.field_values(field)
+        if not values.size:
+            return np.full(positions.shape, missing)
+
+        return np.where(positions >= 0, values[np.maximum(positions, 0)], missing)
+
+    def field_values(self, field: str) -> np.ndarray:
+        """A price field (see PRICE_FIELDS) of every price, in index position order."""
+        if field not in self._fields:
+            self._fields[field] = np.array([price[field] for price in self._prices])
+
+        return self._fields[field]
+
+    def prices_at(self, positions: np.ndarray) -> Dict:
+        """Prices of each security at positions from AsOfPriceIndex.positions (one pricing date).
+
+        Args:
+            positions (np.ndarray): Positions, one per security.
+
+        Returns:
+            Dict: Price of each security, an empty dictionary where it has no price.
+        """
+        return {
+            security: self._prices[position] if position >= 0 else {}
+            for security, position in zip(self.securities, positions.tolist())
+        }
+
+    def prices_on_date(self, pricing_date: Union[str, datetime.date, int]) -> Dict:
+        """Latest price of each security on or before pricing_date.
+
+        Args:
+            pricing_date (Union[str, datetime.date, int]): Pricing date.
+
+        Returns:
+            Dict: Price of each security, an empty dictionary where it has no price.
+        """
+        return self.prices_at(self.positions([pricing_date])[0])
+
+
+@dataclass
+class PortfolioValuationMatrix:
+    """Columnar valuations of a portfolio over its holdings dates.
+
+    Each matrix has one row per holdings date and one column per security. Prices are the
+    latest on or before each date (see AsOfPriceIndex), with NO_PRICE_AVAILABLE where a
+    security has none. Positions are valued at volume x value / per_original_face_value in
+    the price currency, and converted to the base currency by base_currency_conversion_rate.
+    """
+
+    dates: List
+    securities: List[str]
+    is_held: np.ndarray
+    volume: np.ndarray
+    price_position: np.ndarray
+    value: np.ndarray
+    per_original_face_value: np.ndarray
+    base_currency_conversion_rate: np.ndarray
+    currencies: List[str]
+    currency_index: np.ndarray
+    price_index: AsOfPriceIndex
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def position_valuation(self) -> np.ndarray:
+        return np.where(self.is_held, self.volume * self.value / self.per_original_face_value, 0.0)
+
+    @property
+    def total_valuation(self) -> np.ndarray:
+        """(dates x currencies) sums of the held position valuations in each currency."""
+        number_of_currencies = len(self.currencies)
+        bins = np.arange(len(self.dates))[:, None] * number_of_currencies + self.currency_index
+        # Positions not held are valued at zero, so add nothing.
+        totals = np.bincount(
+            bins.ravel(),
+            weights=self.position_valuation.ravel(),
+            minlength=len(self.dates) * number_of_currencies
+        )
+
+        return totals.reshape(len(self.dates), number_of_currencies)
+
+    @property
+    def base_currency_valuation(self) -> np.ndarray:
+        """Portfolio valuation in the base currency at each date."""
+        return (self.position_valuation * self.base_currency_conversion_rate).sum(axis=1)
+
+    def to_valuation_index(self) -> Dict:
+        """Materialise the valuations in the nested dictionary format returned by
+            get_portfolio_valuation_index.
+
+        Returns:
+            Dict: Valuation of each holdings date.
+        """
+        position_valuation = self.position_valuation.tolist()
+        total_valuation = self.total_valuation.tolist()
+        volume = self.volume.tolist()
+        held_columns = [np.flatnonzero(row).tolist() for row in self.is_held]
+
+        portfolio_valuation_index: Dict = {}
+        for i, date in enumerate(self.dates):
+            pricing_date = date if isinstance(date, int) else _default_date(date)
+            no_price_available = _no_price_available(pricing_date)
+            valuation: Dict[str, Dict] = {
+                "total_valuation": {},
+                "position_valuation": {}
+            }
+            for j in held_columns[i]:
+                position = int(self.price_position[i, j])
+                currency_index = int(self.currency_index[i, j])
+                currency = self.currencies[currency_index]
+                valuation["position_valuation"][self.securities[j]] = {
+                    "currency": currency,
+                    "volume": volume[i][j],
+                    "price": self.price_index._prices[position] if position >= 0 else no_price_available,
+                    "valuation": position_valuation[i][j]
+                }
+                valuation["total_valuation"][currency] = total_valuation[i][currency_index]
+
+            portfolio_valuation_index[date] = {
+                "date": pricing_date,
+                "valuation": valuation
+            }
+
+        return portfolio_valuation_index
+
+
+def get_holdings_matrix(
+    portfolio_holdings_index: Dict
+) -> Tuple[List, List[str], np.ndarray, np.ndarray]:
+    """Holdings of a holdings index as (dates x securities) matrices.
+
+    Args:
+        portfolio_holdings_index (Dict): Holdings by date.
+
+    Returns:
+        Tuple[List, List[str], np.ndarray, np.ndarray]: Dates, securities (in order of first
+            holding), whether each security is held at each date and its volume.
+    """
+    securities: Dict[str, int] = {}
+    volumes = []
+    for holdings in portfolio_holdings_index.values():
+        assert isinstance(holdings["holdings"], Dict), "holdings input must be of type dict."
+        assert holdings["holdings"], "holdings must not be empty."
+        for security, holding in holdings["holdings"].items():
+            securities.setdefault(security, len(securities))
+            volumes.append(holding["volume"] if holding else 0)
+
+    is_held = np.zeros((len(portfolio_holdings_index), len(securities)), dtype=np.bool_)
+    # Integer volumes stay integers, as they are reported by to_valuation_index.
+    volume = np.zeros(is_held.shape, dtype=np.asarray(volumes).dtype)
+    for i, holdings in enumerate(portfolio_holdings_index.values()):
+        for security, holding in holdings["holdings"].items():
+            assert holding, "Holdings dictionary cannot be empty."
+            is_held[i, securities[security]] = True
+            volume[i, securities[security]] = holding["volume"]
+
+    return list(portfolio_holdings_index.keys()), list(securities.keys()), is_held, volume
+
+def get_portfolio_valuation_matrix(
+    dates: Sequence,
+    securities: Sequence[str],
+    volume: np.ndarray,
+    price_history_index: Union[Dict, AsOfPriceIndex],
+    is_held: Optional[np.ndarray]=None
+) -> PortfolioValuationMatrix:
+    """Value a (dates x securities) volume matrix, with prices forward filled from a price
+        history index.
+
+    Args:
+        dates (Sequence): Holdings dates, "YYYY-MM-DD" strings or day numbers.
+        securities (Sequence[str]): Securities of the volume columns.
+        volume (np.ndarray): (dates x securities) volumes.
+        price_history_index (Union[Dict, AsOfPriceIndex]): Price history index, or an AsOfPriceIndex built from one.
+        is_held (Optional[np.ndarray], optional): Whether each security is held at each date.
+            Defaults to None, for non zero volumes.
+
+    Returns:
+        PortfolioValuationMatrix: The valuations.
+    """
+    volume = np.asarray(volume)
+    assert np.issubdtype(volume.dtype, np.number), "volume must be numeric."
+    assert volume.shape == (len(dates), len(securities)), "volume must have a row per date and a column per security."
+    is_held = volume != 0 if is_held is None else np.asarray(is_held, dtype=bool)
+    price_index = price_history_index if isinstance(price_history_index, AsOfPriceIndex) else AsOfPriceIndex(price_history_index)
+
+    price_columns = {security: column for column, security in enumerate(price_index.securities)}
+    columns = np.array([price_columns.get(security, -1) for security in securities], dtype=np.int64)
+    price_position = np.full(volume.shape, -1, dtype=np.int64)
+    if price_columns and columns.size:
+        price_position = np.where(columns >= 0, price_index.positions(dates)[:, np.maximum(columns, 0)], -1)
+
+    # Currencies are encoded once per price, the last code being the no price currency.
+    price_currencies = np.append(price_index.field_values("currency").astype(str), NO_PRICE_AVAILABLE["currency"])
+    currencies, currency_codes = np.unique(price_currencies, return_inverse=True)
+    currency_codes = currency_codes.reshape(-1)
+    currency_index = np.where(price_position >= 0, currency_codes[np.maximum(price_position, 0)], currency_codes[-1])
+
+    return PortfolioValuationMatrix(
+        dates=list(dates),
+        securities=list(securities),
+        is_held=is_held,
+        volume=volume,
+        price_position=price_position,
+        value=price_index.field_matrix(price_position, "value", NO_PRICE_AVAILABLE["value"]).astype(np.float64),
+        per_original_face_value=price_index.field_matrix(price_position, "per_original_face_value", NO_PRICE_AVAILABLE["per_original_face_value"]).astype(np.float64),
+        base_currency_conversion_rate=price_index.field_matrix(price_position, "base_currency_conversion_rate", NO_PRICE_AVAILABLE["base_currency_conversion_rate"]).astype(np.float64),
+        currencies=currencies.tolist(),
+        currency_index=currency_index,
+        price_index=price_index
+    )
 
 def get_portfolio_valuation_index(
     portfolio_holdings_index: Dict,
-    price_history_index: Dict        
+    price_history_index: Union[Dict, AsOfPriceIndex]
 ) -> Dict:
     """Create a series of valuations for a set of holdings. Constructed from a holdings index.
 
+    Dates are "YYYY-MM-DD" strings, or day numbers for typed indices (see date_time.to_typed_dates),
+    in which case valuations are dated by day number. The valuations are computed as a
+    PortfolioValuationMatrix (see get_portfolio_valuation_matrix) and materialised as
+    dictionaries; use the matrix directly when the nested dictionary format is not required.
+
     Args:
         portfolio_holdings_index (Dict): _description_
-        price_history_index (Dict): _description_
+        price_history_index (Union[Dict, AsOfPriceIndex]): _description_
 
     Raises:
         Exception: portfolio_holdings_index not dict type.
@@ -27,42 +336,26 @@ def get_portfolio_valuation_index(
     """
     assert portfolio_holdings_index, "portfolio_holdings_index input must not be empty."
     assert isinstance(portfolio_holdings_index, Dict), "portfolio_holdings_index input must be of type dict."
-    assert isinstance(price_history_index, Dict), "price_history_index input must be of type dict."
-    
-    portfolio_valuation_index = {}
+    assert isinstance(price_history_index, (Dict, AsOfPriceIndex)), "price_history_index input must be of type dict."
     
-    for date, holdings in portfolio_holdings_index.items():
-        
-        prices_on_date_dict = _get_prices_on_date(_default_date(date), price_history_index)
-        holdings_on_date_dict = holdings["holdings"]
-        
-        portfolio_valuation_index[date] = get_portfolio_valuation(
-            _default_date(date),
-            holdings_on_date_dict,
-            prices_on_date_dict
-        )
+    dates, securities, is_held, volume = get_holdings_matrix(portfolio_holdings_index)
+    valuation_matrix = get_portfolio_valuation_matrix(dates, securities, volume, price_history_index, is_held)
     
-    return portfolio_valuation_index
+    return valuation_matrix.to_valuation_index()
 
 def get_portfolio_valuation(
-    pricing_date: datetime.datetime,
+    pricing_date: Union[datetime.datetime, int],
     holdings: Dict,
     pricing: Dict
 ) -> Dict:
-    assert isinstance(pricing_date, datetime.datetime), "pricing_date input must be of type datetime.datetime."
+    assert isinstance(pricing_date, (datetime.datetime, int)), "pricing_date input must be of type datetime.datetime."
     assert isinstance(holdings, Dict), "holdings input must be of type dict."
     assert isinstance(pricing, Dict), "pricing input must be of type dict."
     assert holdings, "holdings must not be empty."
     
-    no_price_available = {
-        "date": datetime.datetime(2000,1,1),
-        "per_original_face_value": -1.00,
-        "currency": "N/A",
-        "base_currency_conversion_rate": 1.00,
-        "value": 0
-    }
+    no_price_available = _no_price_available(pricing_date)
     
-    portfolio_valuation = {
+    portfolio_valuation: Dict[str, Any] = {
         "date": pricing_date,
         "valuation": {
             "total_valuation": {},
@@ -90,11 +383,11 @@ def get_portfolio_valuation(
     return portfolio_valuation
 
 def get_position_valuation(
-    pricing_date: datetime.datetime,
+    pricing_date: Union[datetime.datetime, int],
     holding: Dict,
     price: Dict
 ) -> Dict:
-    assert isinstance(pricing_date, datetime.datetime), "pricing_date input must be of type datetime.datetime."
+    assert isinstance(pricing_date, (datetime.datetime, int)), "pricing_date input must be of type datetime.datetime."
     assert isinstance(holding, dict), "holding input must be of type dict."
     assert isinstance(price, dict), "price object input must be of type dict."
     assert pricing_date >= price['date'], "price object date must be on or before pricing date."
@@ -104,28 +397,34 @@ def get_position_valuation(
     
     return holding_valuation
 
+def _no_price_available(
+    pricing_date: Union[datetime.datetime, int]
+) -> Dict:
+    """NO_PRICE_AVAILABLE, dated by day number for day number pricing dates."""
+    no_price_available: Dict[str, Any] = dict(NO_PRICE_AVAILABLE)
+    if not isinstance(pricing_date, datetime.datetime):
+        no_price_available["date"] = to_day_number(no_price_available["date"])
+
+    return no_price_available
+
 def _get_prices_on_date(
-    pricing_date: datetime.datetime,
-    prices_history: Dict
+    pricing_date: Union[datetime.datetime, int],
+    prices_history: Union[Dict, AsOfPriceIndex]
 ) -> Dict:
-    assert isinstance(pricing_date, datetime.datetime), "pricing_date must be a datetime object"
+    assert isinstance(pricing_date, (datetime.datetime, int)), "pricing_date must be a datetime object or day number"
+    price_index = prices_history if isinstance(prices_history, AsOfPriceIndex) else AsOfPriceIndex(prices_history)
+                                
+    return price_index.prices_on_date(pricing_date)
+
+def _validate_price_history(
+    prices_history: Dict
+) -> None:
     assert isinstance(prices_history, dict), "prices_history must be a dictionary"
     for security, prices in prices_history.items():
         assert isinstance(security, str), f"{security} must be a string"
         assert isinstance(prices, dict), f"{prices} must be a dictionary"
         for date, price in prices.items():
-            assert isinstance(date, str), f"{date} must be a string"
+            assert isinstance(date, (str, int)), f"{date} must be a string or day number"
             assert isinstance(price, dict), f"{price} must be a dictionary"
-            assert "date" in price, f"{price} must contain a 'date' key"
-            assert "per_original_face_value" in price, f"{price} must contain a 'per_original_face_value' key"
-            assert "currency" in price, f"{price} must contain a 'currency' key"
-            assert "base_currency_conversion_rate" in price, f"{price} must contain a 'base_currency_conversion_rate' key"
-            assert "value" in price, f"{price} must contain a 'value' key"
-    
-    prices_on_date = {}
-    for security, prices in prices_history.items():
-        price_dates = [date for date in prices.keys() if _default_date(date) <= pricing_date]
-        
-        prices_on_date[security] = prices[max(price_dates)] if price_dates else {}
-                                
-    return prices_on_date
\ No newline at end of file
+            for field in PRICE_FIELDS:
+                assert field in price, f"{price} must contain a '{field}' key"
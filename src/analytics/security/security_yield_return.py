@@ -1,26 +1,42 @@
 import datetime
 
-from typing import Dict, List
+from typing import Dict, List, Optional, Union
 
-from src.analytics.utils.financial import discount_rate_of_cashflows
+import numpy as np
+
+from src.analytics.utils.financial import discount_rate_of_cashflows, yield_of_cashflows, yields_of_cashflow_matrix
+from src.analytics.utils.date_time import years_between_date_arrays
 from src.analytics.utils.cashflow import trim_cashflows_after_workout
-from src.analytics.utils.curve import construct_ns_curve, construct_nss_curve
-from src.analytics.utils.helper import calculate_years_between_dates
+from src.analytics.utils.curve_cache import CurveCache, DEFAULT_CURVE_CACHE
+from src.analytics.utils.helper import calculate_years_between_dates, calculate_years_between_date_arrays
+from src.analytics.utils.day_count import tenor_day_count, year_fraction, year_fractions
+from src.analytics.utils.lookup import CurveOption
 
 def yield_to_workout(
     pricing_date: datetime.datetime,
     cashflows: List[Dict],
     present_value: float,
-    workout_date: datetime.datetime
+    workout_date: datetime.datetime,
+    true_yield: bool=False,
+    guess: Optional[float]=None,
+    day_count: Optional[str]=None
 ) -> float:
     """Calculate the annualised yield to a defined workout date using present 
         value of cashflows.
 
+    By default the cashflows are summed and treated as one payment at the final
+    cashflow date (discount_rate_of_cashflows). With true_yield each cashflow is
+    discounted at its own date (yield_of_cashflows).
+
     Args:
         pricing_date (datetime.datetime): Date to which cashflows are discounted.
         cashflows (List[Dict]): Cashflows between pricing and final cashflow.
         present_value (float): Present value (usually price/pricing value).
         workout_date (datetime.datetime): Redemption date (call/maturity etc)
+        true_yield (bool, optional): Solve the yield of the individual cashflows. Defaults to False.
+        guess (Optional[float], optional): Starting yield for the true_yield solver.
+        day_count (Optional[str], optional): Day count convention for the years to each cashflow
+            (see day_count.year_fractions), or None for days/365. Defaults to None.
 
     Returns:
         float: Annualised yield.
@@ -31,11 +47,21 @@ def yield_to_workout(
         workout_date
     )
     
-    yield_to_workout = discount_rate_of_cashflows(
-        pricing_date,
-        workout_cashflows,
-        present_value
-    )
+    if true_yield:
+        yield_to_workout = yield_of_cashflows(
+            pricing_date,
+            workout_cashflows,
+            present_value,
+            guess,
+            day_count
+        )
+    else:
+        yield_to_workout = discount_rate_of_cashflows(
+            pricing_date,
+            workout_cashflows,
+            present_value,
+            day_count
+        )
 
     return yield_to_workout
 
@@ -70,7 +96,11 @@ def g_spread(
     present_value: float,
     workout_date: datetime.datetime,
     government_curve: List[Dict],
-    interpolation_method: str=['ns', 'nss']
+    interpolation_method: str=['ns', 'nss'],
+    true_yield: bool=False,
+    curve_cache: Optional[CurveCache]=None,
+    guess: Optional[float]=None,
+    day_count: Optional[str]=None
 ) -> float:
     """The difference between the yield and government rate at a specified 
         workout date.
@@ -82,6 +112,13 @@ def g_spread(
         workout_date (datetime.datetime): Redemption date (call/maturity etc).
         government_curve (List[Dict]): Dates and rates of benchmark curve.
         interpolation_method (str): Method used to interpolate benchmark_curve.
+        true_yield (bool, optional): Use the true yield to workout (see yield_to_workout).
+        curve_cache (Optional[CurveCache], optional): Cache of calibrated curves. Defaults to
+            DEFAULT_CURVE_CACHE, which is shared process-wide (see curve_cache.clear_curve_cache).
+        guess (Optional[float], optional): Starting yield for the true_yield solver.
+        day_count (Optional[str], optional): Day count convention for the benchmark curve, the
+            workout tenor and the yield (see DAY_COUNT_CONVENTIONS), or None for whole years on the
+            curve and days/365 for the yield. Defaults to None.
 
     Returns:
         float: Annualised spread to government curve.
@@ -93,7 +130,11 @@ def g_spread(
         present_value,
         workout_date,
         government_curve,
-        interpolation_method
+        interpolation_method,
+        true_yield,
+        curve_cache,
+        guess,
+        day_count
     )
 
     return g_spread
@@ -104,7 +145,11 @@ def i_spread(
     present_value: float,
     workout_date: datetime.datetime,
     swap_curve: List[Dict],
-    interpolation_method: str=['ns', 'nss']
+    interpolation_method: str=['ns', 'nss'],
+    true_yield: bool=False,
+    curve_cache: Optional[CurveCache]=None,
+    guess: Optional[float]=None,
+    day_count: Optional[str]=None
 ) -> float:
     """The difference between the yield and swap rate at a specified 
         workout date.
@@ -116,6 +161,13 @@ def i_spread(
         workout_date (datetime.datetime): Redemption date (call/maturity etc).
         swap_curve (List[Dict]): Dates and rates of benchmark curve.
         interpolation_method (str): Method used to interpolate benchmark_curve.
+        true_yield (bool, optional): Use the true yield to workout (see yield_to_workout).
+        curve_cache (Optional[CurveCache], optional): Cache of calibrated curves. Defaults to
+            DEFAULT_CURVE_CACHE, which is shared process-wide (see curve_cache.clear_curve_cache).
+        guess (Optional[float], optional): Starting yield for the true_yield solver.
+        day_count (Optional[str], optional): Day count convention for the benchmark curve, the
+            workout tenor and the yield (see DAY_COUNT_CONVENTIONS), or None for whole years on the
+            curve and days/365 for the yield. Defaults to None.
 
     Returns:
         float: Annualised spread to swap curve.
@@ -127,7 +179,11 @@ def i_spread(
         present_value,
         workout_date,
         swap_curve,
-        interpolation_method
+        interpolation_method,
+        true_yield,
+        curve_cache,
+        guess,
+        day_count
     )
 
     return i_spread
@@ -138,7 +194,11 @@ def spread_to_benchmark(
     present_value: float,
     workout_date: datetime.datetime,
     benchmark_curve: List[Dict],
-    interpolation_method: str=['ns', 'nss']
+    interpolation_method: str=['ns', 'nss'],
+    true_yield: bool=False,
+    curve_cache: Optional[CurveCache]=None,
+    guess: Optional[float]=None,
+    day_count: Optional[str]=None
 ) -> float:
     """Calculate the annualised spread to benchmark to a defined workout date using present 
         value of cashflows and the benchmark curve.
@@ -150,27 +210,210 @@ def spread_to_benchmark(
         workout_date (datetime.datetime): Redemption date (call/maturity etc).
         benchmark_curve (List[Dict]): Dates and rates of benchmark curve.
         interpolation_method (str): Method used to interpolate benchmark_curve.
+        true_yield (bool, optional): Use the true yield to workout (see yield_to_workout).
+        curve_cache (Optional[CurveCache], optional): Cache of calibrated curves. Defaults to
+            DEFAULT_CURVE_CACHE, which is shared process-wide (see curve_cache.clear_curve_cache).
+        guess (Optional[float], optional): Starting yield for the true_yield solver.
+        day_count (Optional[str], optional): Day count convention for the benchmark curve, the
+            workout tenor and the yield (see DAY_COUNT_CONVENTIONS), or None for whole years on the
+            curve and days/365 for the yield. Defaults to None.
 
     Returns:
         float: Annualised spread to benchmark rate.
     """
 
+    curve_cache = curve_cache if curve_cache is not None else DEFAULT_CURVE_CACHE
+
     curve = None
     if interpolation_method == 'ns':
-        curve = construct_ns_curve(pricing_date, benchmark_curve)
+        curve = curve_cache.get(pricing_date, benchmark_curve, "NS", day_count=day_count)
     elif interpolation_method == 'nss':
-        curve = construct_nss_curve(pricing_date, benchmark_curve)
+        curve = curve_cache.get(pricing_date, benchmark_curve, "NSS", day_count=day_count)
 
-    target_tenor = calculate_years_between_dates(pricing_date, workout_date)
+    if day_count is None:
+        target_tenor = calculate_years_between_dates(pricing_date, workout_date)
+    else:
+        target_tenor = year_fraction(pricing_date, workout_date, tenor_day_count(day_count))
     benchmark_rate_at_tenor = curve(target_tenor)
 
     yield_to_workout_date = yield_to_workout(
         pricing_date,
         cashflows,
         present_value,
-        workout_date
+        workout_date,
+        true_yield,
+        guess,
+        day_count
     )
 
     spread = yield_to_workout_date - benchmark_rate_at_tenor
 
-    return spread
\ No newline at end of file
+    return spread
+
+def yields_to_workout(
+    pricing_date: datetime.datetime,
+    cashflow_dates: np.ndarray,
+    cashflow_matrix: np.ndarray,
+    present_values: np.ndarray,
+    workout_dates: np.ndarray,
+    true_yield: bool=False,
+    guess: Optional[Union[float, np.ndarray]]=None,
+    day_count: Optional[str]=None
+) -> np.ndarray:
+    """Vectorised yield_to_workout over many securities.
+
+    Args:
+        pricing_date (datetime.datetime): Date to which cashflows are discounted.
+        cashflow_dates (np.ndarray): Cashflow dates (dates,).
+        cashflow_matrix (np.ndarray): Cashflows (securities x dates), see CashflowSchedule.to_matrix.
+        present_values (np.ndarray): Present values (securities,).
+        workout_dates (np.ndarray): Redemption dates (securities,).
+        true_yield (bool, optional): Solve the yield of the individual cashflows. Defaults to False.
+        guess (Optional[Union[float, np.ndarray]], optional): Starting yields for the true_yield solver.
+        day_count (Optional[str], optional): Day count convention for the years to each cashflow
+            (see day_count.year_fractions), or None for days/365. Defaults to None.
+
+    Returns:
+        np.ndarray: Annualised yields (securities,).
+    """
+    cashflow_dates = np.asarray(cashflow_dates, dtype="datetime64[us]")
+    workout_dates = np.asarray(workout_dates, dtype="datetime64[us]")
+    present_values = np.asarray(present_values, dtype=np.float64)
+    cashflow_matrix = np.asarray(cashflow_matrix, dtype=np.float64)
+    assert cashflow_matrix.shape == (workout_dates.size, cashflow_dates.size), "cashflow_matrix must be (securities x dates)."
+
+    is_before_workout = cashflow_dates[None, :] <= workout_dates[:, None]
+    workout_cashflows = np.where(is_before_workout, cashflow_matrix, 0.0)
+
+    if true_yield:
+        return yields_of_cashflow_matrix(pricing_date, cashflow_dates, workout_cashflows, present_values, guess, day_count=day_count)
+
+    # Sum of cashflows as a single payment at the final cashflow date, as discount_rate_of_cashflows. Zero
+    # entries are dates on which the security has no cashflow, so the final date is the last non-zero one.
+    has_cashflow = workout_cashflows != 0
+    final_index = np.where(
+        has_cashflow.any(axis=1),
+        cashflow_dates.size - 1 - np.argmax(has_cashflow[:, ::-1], axis=1),
+        np.searchsorted(cashflow_dates, workout_dates, side="right") - 1
+    )
+    number_of_years = years_between_date_arrays(pricing_date, cashflow_dates[final_index], day_count=day_count)
+
+    return ((workout_cashflows.sum(axis=1)/present_values)**(1/number_of_years)) - 1
+
+def spreads_to_benchmark(
+    pricing_date: datetime.datetime,
+    cashflow_dates: np.ndarray,
+    cashflow_matrix: np.ndarray,
+    present_values: np.ndarray,
+    workout_dates: np.ndarray,
+    benchmark_curve: List[Dict],
+    interpolation_method: str='ns',
+    true_yield: bool=False,
+    curve_cache: Optional[CurveCache]=None,
+    guess: Optional[Union[float, np.ndarray]]=None,
+    day_count: Optional[str]=None
+) -> np.ndarray:
+    """Vectorised spread_to_benchmark over many securities priced off one benchmark curve.
+
+    The benchmark curve is calibrated once (through the curve cache), all yields are solved
+    together and the curve is evaluated at every workout tenor in a single call.
+
+    Args:
+        pricing_date (datetime.datetime): Date to which cashflows are discounted.
+        cashflow_dates (np.ndarray): Cashflow dates (dates,).
+        cashflow_matrix (np.ndarray): Cashflows (securities x dates), see CashflowSchedule.to_matrix.
+        present_values (np.ndarray): Present values (securities,).
+        workout_dates (np.ndarray): Redemption dates (securities,).
+        benchmark_curve (List[Dict]): Dates and rates of benchmark curve.
+        interpolation_method (str): Method used to interpolate benchmark_curve ('ns' or 'nss').
+        true_yield (bool, optional): Use the true yield to workout (see yield_to_workout).
+        curve_cache (Optional[CurveCache], optional): Cache of calibrated curves. Defaults to
+            DEFAULT_CURVE_CACHE, which is shared process-wide (see curve_cache.clear_curve_cache).
+        guess (Optional[Union[float, np.ndarray]], optional): Starting yields for the true_yield solver.
+        day_count (Optional[str], optional): Day count convention for the benchmark curve, the
+            workout tenor and the yield (see DAY_COUNT_CONVENTIONS), or None for whole years on the
+            curve and days/365 for the yield. Defaults to None.
+
+    Returns:
+        np.ndarray: Annualised spreads to benchmark rate (securities,).
+    """
+    assert interpolation_method in ['ns', 'nss'], "interpolation_method must be 'ns' or 'nss'."
+    curve_cache = curve_cache if curve_cache is not None else DEFAULT_CURVE_CACHE
+
+    curve_type: CurveOption = "NSS" if interpolation_method == 'nss' else "NS"
+    curve = curve_cache.get(pricing_date, benchmark_curve, curve_type, day_count=day_count)
+
+    if day_count is None:
+        target_tenors = calculate_years_between_date_arrays(pricing_date, workout_dates)
+    else:
+        target_tenors = year_fractions(pricing_date, workout_dates, tenor_day_count(day_count))
+    benchmark_rates_at_tenors = curve(target_tenors)
+
+    yields_to_workout_dates = yields_to_workout(
+        pricing_date,
+        cashflow_dates,
+        cashflow_matrix,
+        present_values,
+        workout_dates,
+        true_yield,
+        guess,
+        day_count
+    )
+
+    return yields_to_workout_dates - benchmark_rates_at_tenors
+
+def g_spreads(
+    pricing_date: datetime.datetime,
+    cashflow_dates: np.ndarray,
+    cashflow_matrix: np.ndarray,
+    present_values: np.ndarray,
+    workout_dates: np.ndarray,
+    government_curve: List[Dict],
+    interpolation_method: str='ns',
+    true_yield: bool=False,
+    curve_cache: Optional[CurveCache]=None,
+    guess: Optional[Union[float, np.ndarray]]=None,
+    day_count: Optional[str]=None
+) -> np.ndarray:
+    """Vectorised g_spread, see spreads_to_benchmark."""
+    return spreads_to_benchmark(
+        pricing_date,
+        cashflow_dates,
+        cashflow_matrix,
+        present_values,
+        workout_dates,
+        government_curve,
+        interpolation_method,
+        true_yield,
+        curve_cache,
+        guess,
+        day_count
+    )
+
+def i_spreads(
+    pricing_date: datetime.datetime,
+    cashflow_dates: np.ndarray,
+    cashflow_matrix: np.ndarray,
+    present_values: np.ndarray,
+    workout_dates: np.ndarray,
+    swap_curve: List[Dict],
+    interpolation_method: str='ns',
+    true_yield: bool=False,
+    curve_cache: Optional[CurveCache]=None,
+    guess: Optional[Union[float, np.ndarray]]=None,
+    day_count: Optional[str]=None
+) -> np.ndarray:
+    """Vectorised i_spread, see spreads_to_benchmark."""
+    return spreads_to_benchmark(
+        pricing_date,
+        cashflow_dates,
+        cashflow_matrix,
+        present_values,
+        workout_dates,
+        swap_curve,
+        interpolation_method,
+        true_yield,
+        curve_cache,
+        guess,
+        day_count
+    )
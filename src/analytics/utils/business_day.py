@@ -0,0 +1,150 @@
+import datetime
+from typing import Iterable, Union
+
+import numpy as np
+
+from src.analytics.utils.lookup import BUSINESS_DAY_CONVENTIONS
+
+DateInput = Union[datetime.date, datetime.datetime, np.datetime64, np.ndarray]
+
+# 1970-01-01 was a Thursday; weekday 0 is Monday as in datetime.weekday.
+_EPOCH_WEEKDAY = 3
+
+
+class BusinessDayCalendar:
+    """Business days between 1 January of start_year and 31 December of end_year.
+
+    Days are business days when their weekday is set in weekmask (Monday first, as
+    np.busdaycalendar) and they are not holidays. The calendar is precomputed once as a
+    bitmap of business days and the cumulative count of business days before each day,
+    so checking, counting, adding and rolling business days are array lookups, vectorised
+    over datetime64 arrays.
+    """
+
+    def __init__(
+        self,
+        holidays: Iterable[DateInput] = (),
+        weekmask: str = "1111100",
+        start_year: int = 1950,
+        end_year: int = 2100
+    ) -> None:
+        assert len(weekmask) == 7 and set(weekmask) <= {"0", "1"} and "1" in weekmask, \
+            "weekmask must be seven '0'/'1' characters with at least one business day."
+        assert start_year <= end_year, "start_year must not be after end_year."
+        self.weekmask = weekmask
+        self.start_year = start_year
+        self.end_year = end_year
+        self._first_day = np.datetime64(f"{start_year:04d}-01-01", "D").astype(np.int64)
+        self._end_day = np.datetime64(f"{end_year + 1:04d}-01-01", "D").astype(np.int64)
+
+        days = np.arange(self._first_day, self._end_day)
+        weekday_is_business = np.array([flag == "1" for flag in weekmask])
+        is_business_day = weekday_is_business[(days + _EPOCH_WEEKDAY) % 7]
+
+        holiday_days = np.unique(np.asarray(list(holidays), dtype="datetime64[D]").astype(np.int64))
+        holiday_days = holiday_days[(holiday_days >= self._first_day) & (holiday_days < self._end_day)]
+        is_business_day[holiday_days - self._first_day] = False
+        self.holidays = holiday_days.astype("datetime64[D]")
+
+        self._is_business_day = is_business_day
+        # _business_days_before[i]: business days strictly before day i of the calendar.
+        self._business_days_before = np.concatenate([[0], np.cumsum(is_business_day)])
+        self._business_days = np.flatnonzero(is_business_day)
+        self._month_index = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+    def _offsets(self, dates: DateInput) -> np.ndarray:
+        """Position of date(s) in the calendar, ignoring any time of day."""
+        offsets = np.asarray(dates, dtype="datetime64[D]").astype(np.int64) - self._first_day
+        assert np.all((offsets >= 0) & (offsets < self._is_business_day.size)), \
+            f"Dates must fall in the calendar years {self.start_year} to {self.end_year}."
+        return offsets
+
+    def _business_day_offsets(self, ranks: np.ndarray) -> np.ndarray:
+        """Positions in the calendar of business days by their rank."""
+        assert np.all((ranks >= 0) & (ranks < self._business_days.size)), \
+            f"Business days fall outside the calendar years {self.start_year} to {self.end_year}."
+        return self._business_days[ranks]
+
+    def _dates(self, offsets: np.ndarray) -> np.ndarray:
+        return (offsets + self._first_day).astype("datetime64[D]")
+
+    def is_business_day(self, dates: DateInput) -> np.ndarray:
+        """Whether each date is a business day.
+
+        Args:
+            dates (DateInput): Date(s).
+
+        Returns:
+            np.ndarray: Booleans with the shape of dates.
+        """
+        return self._is_business_day[self._offsets(dates)]
+
+    def business_days_between(self, start_dates: DateInput, end_dates: DateInput) -> np.ndarray:
+        """Business days from start_dates (included) to end_dates (excluded), as np.busday_count.
+            Where end_dates precede start_dates the count is minus the business days from end_dates
+            to start_dates, -np.busday_count(end_dates, start_dates), so swapping the dates only
+            changes the sign.
+
+        Args:
+            start_dates (DateInput): The starting date(s).
+            end_dates (DateInput): The ending date(s).
+
+        Returns:
+            np.ndarray: Business day counts.
+        """
+        return self._business_days_before[self._offsets(end_dates)] - self._business_days_before[self._offsets(start_dates)]
+
+    def add_business_days(self, dates: DateInput, number_of_days: Union[int, np.ndarray]) -> np.ndarray:
+        """Move date(s) by a number of business days, negative to move back. Dates that
+            are not business days first roll to the following business day when moving
+            forward (or by zero days) and to the preceding business day when moving back.
+
+        Args:
+            dates (DateInput): Date(s).
+            number_of_days (Union[int, np.ndarray]): Business days to add.
+
+        Returns:
+            np.ndarray: datetime64[D] dates.
+        """
+        offsets = self._offsets(dates)
+        number_of_days = np.asarray(number_of_days, dtype=np.int64)
+        following_rank = self._business_days_before[offsets]
+        preceding_rank = self._business_days_before[offsets + 1] - 1
+
+        ranks = np.where(number_of_days >= 0, following_rank, preceding_rank) + number_of_days
+
+        return self._dates(self._business_day_offsets(ranks))
+
+    def roll(self, dates: DateInput, convention: str = "following") -> np.ndarray:
+        """Adjust date(s) that are not business days by a business day convention:
+            - following / preceding: the next / previous business day.
+            - modified_following / modified_preceding: as following / preceding, unless
+              that falls in another month, in which case the other direction.
+
+        Args:
+            dates (DateInput): Date(s).
+            convention (str, optional): One of BUSINESS_DAY_CONVENTIONS. Defaults to "following".
+
+        Returns:
+            np.ndarray: datetime64[D] business dates.
+        """
+        assert convention in BUSINESS_DAY_CONVENTIONS, f"Convention must be in {BUSINESS_DAY_CONVENTIONS}"
+        offsets = self._offsets(dates)
+        following_rank = self._business_days_before[offsets]
+        preceding_rank = self._business_days_before[offsets + 1] - 1
+
+        if convention in ("following", "modified_following"):
+            ranks, fallback_ranks = following_rank, preceding_rank
+        else:
+            ranks, fallback_ranks = preceding_rank, following_rank
+
+        if convention.startswith("modified"):
+            # Rolling stays within the month where a business day remains in that direction.
+            rolled = self._business_days[np.clip(ranks, 0, self._business_days.size - 1)]
+            other_month = (self._month_index[rolled] != self._month_index[offsets]) | (ranks < 0) | (ranks >= self._business_days.size)
+            ranks = np.where(other_month, fallback_ranks, ranks)
+
+        return self._dates(self._business_day_offsets(ranks))
+
+
+WEEKEND_CALENDAR = BusinessDayCalendar()
@@ -1,45 +1,95 @@
+import bisect
 import datetime
+from dataclasses import dataclass
 from datetime import time
 from dateutil.relativedelta import relativedelta
-from typing import Dict, List
-
-from src.analytics.utils.date_time import generate_date_range, years_between_dates, get_record_date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.analytics.utils.date_time import (
+    generate_schedule,
+    years_between_dates,
+    years_between_date_arrays,
+    get_record_date,
+    get_record_and_ex_dates,
+    _month_index,
+    _day_of_month,
+    _dates_from_month_index
+)
+from src.analytics.utils.business_day import BusinessDayCalendar, WEEKEND_CALENDAR
+from src.analytics.utils.day_count import year_fractions
 from src.analytics.utils.lookup import (
     TIMESERIES_TIME_PERIODS,
     CURVE_OPTIONS,
-    CURVE_OPTIONS_OBJECTS
+    CURVE_OPTIONS_OBJECTS,
+    CurveObject
 )
 from src.analytics.utils.regression.ns import NelsonSiegelCurve
 
 def match_cashflow_to_discount_curve(
     cashflows: List[Dict],
-    discount_curve: List[Dict]
+    discount_curve: List[Dict],
+    interpolate: bool=False
 ) -> List[Dict]:
     """Match cashflows to discount rates by date.
 
+    The discount curve is indexed by date once, so matching is linear in the number
+    of cashflows and curve points.
+
+    With interpolate, cashflows dated between two curve points are matched to the
+    discount rate linearly interpolated in time between them. Cashflows outside the
+    curve's date range are excluded, as are unmatched cashflows without interpolate.
+
     Args:
         cashflows (List[Dict]): Cashflow series
         discount_curve (List[Dict]): Discount curve series.
+        interpolate (bool, optional): Interpolate rates between curve dates. Defaults to False.
 
     Returns:
         List[Dict]: Combined date, cashflow value and discount rate.
     """
 
+    discount_rates_by_date: Dict = {}
+    for rate in discount_curve:
+        discount_rates_by_date.setdefault(rate['date'], []).append(rate['discount_rate'])
+
+    curve_dates = sorted(discount_rates_by_date) if interpolate else []
+
     matched_list = []
 
     for cashflow in cashflows:
-        for rate in discount_curve:
-            if rate['date'] == cashflow["date"]:
-                matched_list.append(
-                    {
-                        "date": cashflow["date"],
-                        "cashflow_value": cashflow["cashflow_value"],
-                        "discount_rate": rate["discount_rate"]
-                    }
-                )
+        discount_rates = discount_rates_by_date.get(cashflow["date"])
+        if discount_rates is None and interpolate:
+            discount_rates = _interpolate_discount_rate(cashflow["date"], curve_dates, discount_rates_by_date)
+        for discount_rate in discount_rates or []:
+            matched_list.append(
+                {
+                    "date": cashflow["date"],
+                    "cashflow_value": cashflow["cashflow_value"],
+                    "discount_rate": discount_rate
+                }
+            )
 
     return matched_list
 
+def _interpolate_discount_rate(
+    date: datetime.datetime,
+    curve_dates: List[datetime.datetime],
+    discount_rates_by_date: Dict
+) -> List[float]:
+    upper_index = bisect.bisect_left(curve_dates, date)
+    if upper_index == 0 or upper_index == len(curve_dates):
+        return []
+
+    lower_date = curve_dates[upper_index - 1]
+    upper_date = curve_dates[upper_index]
+    lower_rate = discount_rates_by_date[lower_date][0]
+    upper_rate = discount_rates_by_date[upper_date][0]
+    weight = (date - lower_date) / (upper_date - lower_date)
+
+    return [lower_rate + (upper_rate - lower_rate) * weight]
+
 def sum_cashflows(
     cashflows: List[Dict]
 ) -> float:
@@ -82,6 +132,413 @@ def trim_cashflows_after_workout(
 
     return included_cashflows
 
+@dataclass
+class CashflowSchedule:
+    """Columnar cashflow schedule of a single security.
+
+    Each attribute is a NumPy array with one element per cashflow. Dates are
+    datetime64[D] and cashflow components are float64.
+
+    Schedules covering several securities (see generate_cashflow_schedules) also
+    carry a security_id column, with each security's cashflows stored contiguously
+    in payment date order.
+
+    day_count is the schedule's day count convention (see day_count.year_fractions),
+    or None to measure years as days/365 and pay coupons of rate/frequency.
+    """
+
+    payment_date: np.ndarray
+    record_date: np.ndarray
+    ex_date: np.ndarray
+    fixed_coupon_interest_component: np.ndarray
+    variable_coupon_interest_component: np.ndarray
+    redemption_principal: np.ndarray
+    amortising: np.ndarray
+    security_id: Optional[np.ndarray] = None
+    day_count: Optional[str] = None
+
+    def __len__(self) -> int:
+        return self.payment_date.size
+
+    @property
+    def total_coupon_interest(self) -> np.ndarray:
+        return self.fixed_coupon_interest_component + self.variable_coupon_interest_component
+
+    @property
+    def total_principal(self) -> np.ndarray:
+        return self.redemption_principal + self.amortising
+
+    @property
+    def total(self) -> np.ndarray:
+        return self.variable_coupon_interest_component + self.fixed_coupon_interest_component + self.redemption_principal
+
+    def select(self, security_id: Any) -> "CashflowSchedule":
+        """Cashflows of a single security from a multi-security schedule.
+
+        Args:
+            security_id (Any): Identifier of the security to select.
+
+        Returns:
+            CashflowSchedule: The security's cashflows.
+        """
+        assert self.security_id is not None, "Schedule is not security indexed."
+        mask = self.security_id == security_id
+
+        return CashflowSchedule(
+            payment_date=self.payment_date[mask],
+            record_date=self.record_date[mask],
+            ex_date=self.ex_date[mask],
+            fixed_coupon_interest_component=self.fixed_coupon_interest_component[mask],
+            variable_coupon_interest_component=self.variable_coupon_interest_component[mask],
+            redemption_principal=self.redemption_principal[mask],
+            amortising=self.amortising[mask],
+            security_id=self.security_id[mask],
+            day_count=self.day_count
+        )
+
+    def years_to_payment(self, pricing_date: datetime.datetime) -> np.ndarray:
+        """Years from pricing_date to each payment date under the schedule's day count, with
+            ACT/ACT ICMA tenors measured as ACT/ACT (see day_count.tenor_day_count).
+
+        Args:
+            pricing_date (datetime.datetime): Date from which years are measured.
+
+        Returns:
+            np.ndarray: Years to each payment date.
+        """
+        return years_between_date_arrays(pricing_date, self.payment_date, day_count=self.day_count)
+
+    def to_matrix(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Total cashflows as a (securities x payment dates) matrix.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Security ids (rows), sorted
+                unique payment dates (columns) and the cashflow matrix.
+        """
+        security_id = self.security_id if self.security_id is not None else np.zeros(len(self), dtype=np.int64)
+        security_ids, row_index = np.unique(security_id, return_inverse=True)
+        payment_dates, column_index = np.unique(self.payment_date, return_inverse=True)
+
+        matrix = np.zeros((security_ids.size, payment_dates.size))
+        np.add.at(matrix, (row_index.reshape(-1), column_index.reshape(-1)), self.total)
+
+        return security_ids, payment_dates, matrix
+
+    def to_dict_list(self) -> List[Dict]:
+        """Materialise the schedule in the nested dictionary format returned by
+            generate_cashflows.
+
+        Returns:
+            List[Dict]: List of objects containing cashflows(date, cashflow value)
+        """
+        columns = zip(
+            self.payment_date.astype(str).tolist(),
+            self.record_date.astype(str).tolist(),
+            self.ex_date.astype(str).tolist(),
+            self.total.tolist(),
+            self.fixed_coupon_interest_component.tolist(),
+            self.variable_coupon_interest_component.tolist(),
+            self.total_coupon_interest.tolist(),
+            self.redemption_principal.tolist(),
+            self.amortising.tolist(),
+            self.total_principal.tolist()
+        )
+
+        return [
+            {
+                'date': {
+                    "payment_date": payment_date,
+                    "record_date": record_date,
+                    "ex_date": ex_date
+                },
+                'cashflow': {
+                    'total': total,
+                    'coupon_interest': {
+                        'fixed_coupon_interest_component': fixed_coupon,
+                        'variable_coupon_interest_component': variable_coupon,
+                        'total_coupon_interest': total_coupon,
+                    },
+                    'principal': {
+                        'redemption_principal': redemption_principal,
+                        'amortising': amortising,
+                        'total_principal': total_principal
+                    }
+                }
+            }
+            for (
+                payment_date, record_date, ex_date, total, fixed_coupon, variable_coupon,
+                total_coupon, redemption_principal, amortising, total_principal
+            ) in columns
+        ]
+
+def generate_cashflow_schedule(
+    start_date: datetime.datetime,
+    end_date: datetime.datetime,
+    cashflow_freq: str,
+    face_value: float,
+    coupon_rate_or_margin: float,
+    arrears: bool=True,
+    variable_coupon: bool=False,
+    underlying_curve: CurveObject = NelsonSiegelCurve(0,0,0,0),
+    redemption_discount: float=0.00,
+    pricing_date: Optional[datetime.datetime]=None,
+    ex_record_config: Dict={
+        "record_date": {
+            "days_before_payment_date": 8,
+            "record_time": 19,
+            "day_type": "calendar",
+            "time_of_record": time(hour=19)
+        }
+    },
+    day_count: Optional[str]=None,
+    calendar: Optional[BusinessDayCalendar]=None,
+    business_day_convention: Optional[str]=None,
+    end_of_month: bool=False,
+    stub: Optional[str]=None
+) -> CashflowSchedule:
+    """Generates a columnar cashflow schedule from a start_date to end_date.
+
+    Takes the same arguments as generate_cashflows, but computes every cashflow
+    component in a single vectorised pass over the payment dates.
+
+    Args:
+        starting_date (datetime.datetime): Starting date of the first period.
+        ending_date (datetime.datetime): Ending date of the final period/
+        periods_per_year (float): Number of periods per year.
+        face_value (float): The face value of the security.
+        coupon_rate (float): Annual coupon rate of the security.
+        arrears (bool, optional): Payments in arrears or advance. Cashflows are generated in arrears
+            either way, as by generate_cashflows. Defaults to True.
+        variable_coupon (bool, optional): Coupons are variable. Default to False.
+        underlying_curve (List): Underlying benchmark curve to get forward rate forecast.
+        pricing_date (Optional[datetime.datetime], optional): Date from which variable coupon tenors
+            are measured. Defaults to None, for today.
+        day_count (Optional[str], optional): Day count convention of the schedule. When given,
+            coupons accrue the annual rate over each period's year fraction. Defaults to None.
+        calendar (Optional[BusinessDayCalendar], optional): Business day calendar for business day
+            record dates and payment date adjustment. Defaults to WEEKEND_CALENDAR.
+        business_day_convention (Optional[str], optional): Convention rolling payment dates that
+            are not business days (see BusinessDayCalendar.roll), or None to keep them. Defaults to None.
+        end_of_month (bool, optional): Payment dates stay on month ends when start_date is a month
+            end (see generate_schedule). Defaults to False.
+        stub (Optional[str], optional): Stub rule of the payment dates, one of STUB_RULES (see
+            generate_schedule), or None. Defaults to None.
+
+    Returns:
+        CashflowSchedule: Payment, record and ex dates with the cashflow components.
+    """
+    assert all(isinstance(date, (datetime.datetime)) for date in [start_date, end_date]), f"Date arguments must be of type datetime."
+    assert cashflow_freq in TIMESERIES_TIME_PERIODS.keys(), f"'{cashflow_freq}' is not in {TIMESERIES_TIME_PERIODS.keys()}."
+    assert all(isinstance(float_val, float) for float_val in [face_value, coupon_rate_or_margin, redemption_discount]), f"Numeric args must be of float type."
+
+    pricing_date = pricing_date if pricing_date is not None else datetime.datetime.today()
+    annual_frequency = TIMESERIES_TIME_PERIODS[cashflow_freq]['annual_frequency']
+
+    payment_dates = generate_schedule(start_date, end_date, cashflow_freq, end_of_month=end_of_month, stub=stub)
+    if business_day_convention is not None:
+        payment_dates = (calendar if calendar is not None else WEEKEND_CALENDAR).roll(payment_dates, business_day_convention)
+    record_dates, ex_dates = get_record_and_ex_dates(payment_dates, ex_record_config, calendar)
+
+    redemption_principal = np.zeros(payment_dates.size)
+    if payment_dates.size:
+        redemption_principal[-1] = face_value * (1 + redemption_discount)
+    amortising = np.zeros(payment_dates.size)
+
+    accrual_fractions = np.full(payment_dates.size, 1/annual_frequency)
+    if day_count is not None:
+        period_starts = np.concatenate([np.array([start_date], dtype="datetime64[D]"), payment_dates[:-1]])
+        accrual_fractions = _accrual_fractions(period_starts, payment_dates, annual_frequency, day_count)
+
+    variable_coupon_component = np.zeros(payment_dates.size)
+    if (variable_coupon):
+        variable_coupon_component = _get_variable_coupon_components(pricing_date, payment_dates, underlying_curve, day_count) * face_value * accrual_fractions
+    fixed_coupon_component = coupon_rate_or_margin * accrual_fractions * face_value
+
+    return CashflowSchedule(
+        payment_date=payment_dates,
+        record_date=record_dates,
+        ex_date=ex_dates,
+        fixed_coupon_interest_component=fixed_coupon_component,
+        variable_coupon_interest_component=variable_coupon_component,
+        redemption_principal=redemption_principal,
+        amortising=amortising,
+        day_count=day_count
+    )
+
+def generate_cashflow_schedules(
+    security_terms: Any,
+    underlying_curve: CurveObject = NelsonSiegelCurve(0,0,0,0),
+    pricing_date: Optional[datetime.datetime]=None,
+    ex_record_config: Dict={
+        "record_date": {
+            "days_before_payment_date": 8,
+            "record_time": 19,
+            "day_type": "calendar",
+            "time_of_record": time(hour=19)
+        }
+    },
+    day_count: Optional[str]=None,
+    calendar: Optional[BusinessDayCalendar]=None,
+    business_day_convention: Optional[str]=None
+) -> CashflowSchedule:
+    """Generates the cashflows of a universe of securities in one call.
+
+    security_terms is a table (pandas DataFrame or NumPy structured array) with one
+    row per security and the columns:
+        - start_date, end_date: Start of the first period and final cashflow date.
+        - cashflow_freq: Key of TIMESERIES_TIME_PERIODS.
+        - face_value, coupon_rate_or_margin: As in generate_cashflows.
+        - security_id (optional): Defaults to the row position.
+        - variable_coupon (optional): Defaults to False.
+        - redemption_discount (optional): Defaults to 0.00.
+
+    Payment dates follow generate_cashflows (in arrears). Securities sharing a frequency,
+    anchor day and month cycle share one date grid, which each security slices.
+
+    Args:
+        security_terms (Any): Table of security terms.
+        underlying_curve (CurveObject): Underlying benchmark curve for variable coupons.
+        pricing_date (Optional[datetime.datetime], optional): Date from which variable coupon tenors are
+            measured. Defaults to None, for today.
+        ex_record_config (Dict): Record date configuration shared by all securities.
+        day_count (Optional[str], optional): Day count convention shared by all securities, as
+            for generate_cashflow_schedule. Defaults to None.
+        calendar (Optional[BusinessDayCalendar], optional): Business day calendar shared by all
+            securities, as for generate_cashflow_schedule. Defaults to WEEKEND_CALENDAR.
+        business_day_convention (Optional[str], optional): Payment date adjustment, as for
+            generate_cashflow_schedule. Defaults to None.
+
+    Returns:
+        CashflowSchedule: Security indexed schedule of all cashflows.
+    """
+    pricing_date = pricing_date if pricing_date is not None else datetime.datetime.today()
+    columns = security_terms.dtype.names if isinstance(security_terms, np.ndarray) else security_terms.columns
+    required_columns = ["start_date", "end_date", "cashflow_freq", "face_value", "coupon_rate_or_margin"]
+    assert all(column in columns for column in required_columns), f"security_terms must contain the columns {required_columns}."
+
+    start_dates = np.asarray(security_terms["start_date"], dtype="datetime64[D]")
+    end_dates = np.asarray(security_terms["end_date"], dtype="datetime64[D]")
+    cashflow_freqs = np.asarray(security_terms["cashflow_freq"]).astype(str)
+    face_values = np.asarray(security_terms["face_value"], dtype=np.float64)
+    coupon_rates = np.asarray(security_terms["coupon_rate_or_margin"], dtype=np.float64)
+    number_of_securities = start_dates.size
+    security_ids = np.asarray(security_terms["security_id"]) if "security_id" in columns else np.arange(number_of_securities)
+    variable_coupons = np.asarray(security_terms["variable_coupon"], dtype=bool) if "variable_coupon" in columns else np.zeros(number_of_securities, dtype=bool)
+    redemption_discounts = np.asarray(security_terms["redemption_discount"], dtype=np.float64) if "redemption_discount" in columns else np.zeros(number_of_securities)
+
+    assert np.all(start_dates <= end_dates), "start_date is after end_date"
+    assert np.all(np.isin(cashflow_freqs, list(TIMESERIES_TIME_PERIODS.keys()))), f"cashflow_freq values must be in {TIMESERIES_TIME_PERIODS.keys()}."
+
+    annual_frequencies = np.zeros(number_of_securities)
+    for freq, period in TIMESERIES_TIME_PERIODS.items():
+        annual_frequencies[cashflow_freqs == freq] = period['annual_frequency']
+
+    positions = [np.empty(0, dtype=np.int64)]
+    payment_dates = [np.empty(0, dtype="datetime64[D]")]
+
+    for freq in np.unique(cashflow_freqs):
+        is_annual = freq == "A"
+        month_step = int(12/TIMESERIES_TIME_PERIODS[freq]['annual_frequency'])
+        members = np.flatnonzero(cashflow_freqs == freq)
+        member_start_months = _month_index(start_dates[members])
+        member_end_months = _month_index(end_dates[members])
+        anchor_days = _day_of_month(start_dates[members])
+        if is_annual:
+            # Annual dates are rolled from the previous date, so a 29 February anchor sticks at the 28th.
+            anchor_days[(anchor_days == 29) & (member_start_months % 12 == 1)] = 28
+
+        group_keys = np.stack([anchor_days, member_start_months % month_step], axis=1)
+        _, group_inverse = np.unique(group_keys, axis=0, return_inverse=True)
+        group_inverse = group_inverse.reshape(-1)
+
+        for group in range(group_inverse.max() + 1):
+            in_group = group_inverse == group
+            group_members = members[in_group]
+            group_start_months = member_start_months[in_group]
+            group_end_months = member_end_months[in_group]
+
+            grid_start = group_start_months.min()
+            grid_months = np.arange(grid_start, group_end_months.max() + 1, month_step)
+            grid_dates = _dates_from_month_index(grid_months, anchor_days[in_group][0])
+
+            first_index = (group_start_months - grid_start) // month_step
+            if is_annual:
+                last_index = np.searchsorted(grid_dates, end_dates[group_members], side="right") - 1
+            else:
+                last_index = (group_end_months - grid_start) // month_step
+            # In arrears: the first grid date (the start date) is not a cashflow.
+            counts = np.maximum(last_index - first_index, 0)
+
+            positions.append(np.repeat(group_members, counts))
+            payment_dates.append(grid_dates[np.repeat(first_index + 1, counts) + _ragged_arange(counts)])
+
+    row_positions = np.concatenate(positions)
+    row_payment_dates = np.concatenate(payment_dates)
+    order = np.lexsort((row_payment_dates, row_positions))
+    row_positions = row_positions[order]
+    row_payment_dates = row_payment_dates[order]
+    if business_day_convention is not None:
+        row_payment_dates = (calendar if calendar is not None else WEEKEND_CALENDAR).roll(row_payment_dates, business_day_convention)
+
+    row_record_dates, row_ex_dates = get_record_and_ex_dates(row_payment_dates, ex_record_config, calendar)
+
+    row_face_values = face_values[row_positions]
+    row_annual_frequencies = annual_frequencies[row_positions]
+    is_final_cashflow = np.append(row_positions[1:] != row_positions[:-1], True) if row_positions.size else np.empty(0, dtype=bool)
+
+    redemption_principal = np.where(is_final_cashflow, row_face_values * (1 + redemption_discounts[row_positions]), 0.0)
+
+    accrual_fractions = 1/row_annual_frequencies
+    if day_count is not None:
+        is_first_cashflow = np.insert(row_positions[1:] != row_positions[:-1], 0, True) if row_positions.size else np.empty(0, dtype=bool)
+        period_starts = np.where(is_first_cashflow, start_dates[row_positions], np.roll(row_payment_dates, 1))
+        accrual_fractions = _accrual_fractions(period_starts, row_payment_dates, row_annual_frequencies, day_count)
+    fixed_coupon_component = coupon_rates[row_positions]*accrual_fractions*row_face_values
+
+    variable_coupon_component = np.zeros(row_positions.size)
+    is_variable = variable_coupons[row_positions]
+    if is_variable.any():
+        variable_coupon_component[is_variable] = (
+            _get_variable_coupon_components(pricing_date, row_payment_dates[is_variable], underlying_curve, day_count) * row_face_values[is_variable]
+        )*accrual_fractions[is_variable]
+
+    return CashflowSchedule(
+        payment_date=row_payment_dates,
+        record_date=row_record_dates,
+        ex_date=row_ex_dates,
+        fixed_coupon_interest_component=fixed_coupon_component,
+        variable_coupon_interest_component=variable_coupon_component,
+        redemption_principal=redemption_principal,
+        amortising=np.zeros(row_positions.size),
+        security_id=security_ids[row_positions],
+        day_count=day_count
+    )
+
+def _accrual_fractions(
+    period_starts: np.ndarray,
+    period_ends: np.ndarray,
+    annual_frequency: np.ndarray,
+    day_count: str
+) -> np.ndarray:
+    """Year fractions of coupon periods under a day count convention, each period being its
+        own reference period for ACT/ACT ICMA."""
+    return year_fractions(
+        period_starts,
+        period_ends,
+        day_count,
+        period_start=period_starts,
+        period_end=period_ends,
+        frequency=annual_frequency
+    )
+
+def _ragged_arange(
+    counts: np.ndarray
+) -> np.ndarray:
+    """Concatenated ranges [0, count) for each count, e.g. [2, 3] -> [0, 1, 0, 1, 2]."""
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+
+    return np.arange(counts.sum()) - offsets
+
 def generate_cashflows(
     start_date: datetime.datetime,
     end_date: datetime.datetime,
@@ -90,9 +547,9 @@ def generate_cashflows(
     coupon_rate_or_margin: float,
     arrears: bool=True,
     variable_coupon: bool=False,
-    underlying_curve: CURVE_OPTIONS_OBJECTS = NelsonSiegelCurve(0,0,0,0),
+    underlying_curve: CurveObject = NelsonSiegelCurve(0,0,0,0),
     redemption_discount: float=0.00,
-    pricing_date=datetime.datetime.today(),
+    pricing_date: Optional[datetime.datetime]=None,
     ex_record_config: Dict={
         "record_date": {
             "days_before_payment_date": 8,
@@ -100,13 +557,16 @@ def generate_cashflows(
             "day_type": "calendar",
             "time_of_record": time(hour=19)
         }
-    }
+    },
+    calendar: Optional[BusinessDayCalendar]=None
 ) -> List[Dict]:
     """Generates cashflows from a start_date to end_date. 
     
     If in arrears then start_date is not included in the returned cashflows.
 
     *The end_date specifies the final cashflow date. Thus the start of subsequent periods is the day after the cashflow date (in arrears).
+
+    *Built from generate_cashflow_schedule, use it directly when the nested dictionary format is not required.
     
     With variable coupons:
         - Variable coupon can arise from a number of different types of securities.
@@ -119,67 +579,40 @@ def generate_cashflows(
         periods_per_year (float): Number of periods per year.
         face_value (float): The face value of the security.
         coupon_rate (float): Annual coupon rate of the security.
-        arrears (bool, optional): Payments in arrears or advance. Defaults to True.
+        arrears (bool, optional): Payments in arrears or advance. Cashflows are generated in arrears
+            either way. Defaults to True.
         variable_coupon (bool, optional): Coupons are variable. Default to False.
         underlying_curve (List): Underlying benchmark curve to get forward rate forecast.
+        pricing_date (Optional[datetime.datetime], optional): Date from which variable coupon tenors
+            are measured. Defaults to None, for today.
+        calendar (Optional[BusinessDayCalendar], optional): Business day calendar for record dates
+            counted in business days (ex_record_config day_type). Defaults to WEEKEND_CALENDAR.
 
     Returns:
         List[Dict]: List of objects containing cashflows(date, cashflow value)
     """
-    assert all(isinstance(date, (datetime.datetime)) for date in [start_date, end_date]), f"Date arguments must be of type datetime."
-    assert cashflow_freq in TIMESERIES_TIME_PERIODS.keys(), f"'{cashflow_freq}' is not in {TIMESERIES_TIME_PERIODS.keys()}."
-    assert all(isinstance(float_val, float) for float_val in [face_value, coupon_rate_or_margin, redemption_discount]), f"Numeric args must be of float type."
-
-    date_range = generate_date_range(start_date, end_date, freq_input=cashflow_freq)
-    annual_frequency = TIMESERIES_TIME_PERIODS[cashflow_freq]['annual_frequency']
-    cashflows_array = []
-
-    for date in date_range:
-        date_formatted = datetime.datetime.strptime(date, "%Y-%m-%d")
-        record_date = get_record_date(date_formatted, ex_record_config)
-        ex_date = (record_date - datetime.timedelta(days=1))
-        
-        principal_component = face_value * (1 + redemption_discount) if date == date_range[-1] else 0
-        amortising_component = 0
-        total_principal = principal_component + amortising_component
-        
-        variable_coupon_component = 0
-        if (variable_coupon):
-            variable_coupon_component = (_get_variable_coupon_component(pricing_date, date_formatted, underlying_curve) * face_value)/annual_frequency
-        fixed_coupon_component = coupon_rate_or_margin/annual_frequency*face_value
-        total_coupon = fixed_coupon_component + variable_coupon_component
-        
-        total_cashflow = variable_coupon_component + fixed_coupon_component + principal_component
-        
-        cashflows_array.append(
-            {
-                'date': {
-                    "payment_date": date,
-                    "record_date": record_date.strftime("%Y-%m-%d"),
-                    "ex_date": ex_date.strftime("%Y-%m-%d")
-                },
-                'cashflow': {
-                    'total': total_cashflow,
-                    'coupon_interest': {
-                        'fixed_coupon_interest_component': fixed_coupon_component,
-                        'variable_coupon_interest_component': variable_coupon_component,
-                        'total_coupon_interest': total_coupon,
-                    },
-                    'principal': {
-                        'redemption_principal': principal_component,
-                        'amortising': amortising_component,
-                        'total_principal': total_principal
-                    }
-                }
-            }
-        )
-
-    return cashflows_array
+    pricing_date = pricing_date if pricing_date is not None else datetime.datetime.today()
+    cashflow_schedule = generate_cashflow_schedule(
+        start_date,
+        end_date,
+        cashflow_freq,
+        face_value,
+        coupon_rate_or_margin,
+        arrears=arrears,
+        variable_coupon=variable_coupon,
+        underlying_curve=underlying_curve,
+        redemption_discount=redemption_discount,
+        pricing_date=pricing_date,
+        ex_record_config=ex_record_config,
+        calendar=calendar
+    )
+
+    return cashflow_schedule.to_dict_list()
 
 def _get_variable_coupon_component(
     pricing_date: datetime.datetime,
     workout_date: datetime.datetime,
-    underlying_forward_curve: CURVE_OPTIONS_OBJECTS=NelsonSiegelCurve
+    underlying_forward_curve: CurveObject=NelsonSiegelCurve(0,0,0,0)
 ) -> float:
     assert isinstance(pricing_date, datetime.datetime), f"pricing_date must be of type datetime.datetime."
     assert isinstance(workout_date, datetime.datetime), f"workout_date must be of type datetime.datetime."
@@ -188,10 +621,25 @@ def _get_variable_coupon_component(
     
     workout_tenor = years_between_dates(pricing_date, workout_date)
     
-    annual_variable_coupon_component = underlying_forward_curve(workout_tenor)
+    annual_variable_coupon_component = float(underlying_forward_curve(workout_tenor))
     
     return annual_variable_coupon_component/100
 
+def _get_variable_coupon_components(
+    pricing_date: datetime.datetime,
+    payment_dates: np.ndarray,
+    underlying_forward_curve: CurveObject=NelsonSiegelCurve(0,0,0,0),
+    day_count: Optional[str]=None
+) -> np.ndarray:
+    assert isinstance(pricing_date, datetime.datetime), f"pricing_date must be of type datetime.datetime."
+    assert isinstance(underlying_forward_curve, tuple(CURVE_OPTIONS_OBJECTS)), f"underlying_forward_curve must be one of {CURVE_OPTIONS} as objects."
+
+    workout_tenors = years_between_date_arrays(pricing_date, payment_dates, day_count=day_count)
+
+    annual_variable_coupon_components = np.asarray(underlying_forward_curve(workout_tenors))
+
+    return annual_variable_coupon_components/100
+
 
 def get_most_recent_cashflow(
     reference_date: datetime.datetime,
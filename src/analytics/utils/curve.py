@@ -1,49 +1,80 @@
-import math
-from typing import Dict, List
+from collections.abc import Mapping
+from functools import cached_property
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import numpy as np
 import datetime
-from src.analytics.utils.financial import implied_forward_rate
+from src.analytics.utils.curve_snapshot import CurveSnapshot
+from src.analytics.utils.financial import implied_forward_rates
 from src.analytics.utils.lookup import (
     TIMESERIES_TIME_PERIODS, 
     FRACTION_OF_YEAR_TO_PERIOD_STRING,
-    CURVE_OPTIONS
+    CURVE_OPTIONS,
+    CALIBRATION_OPTIONS,
+    CurveOption
 )
 
 from src.analytics.utils.regression.ns import NelsonSiegelCurve
 from src.analytics.utils.regression.nss import NelsonSiegelSvenssonCurve
 
-from src.analytics.utils.regression.calibrate import calibrate_ns_ols, calibrate_nss_ols
+from src.analytics.utils.regression.calibrate import (
+    calibrate_ns_ols,
+    calibrate_nss_ols,
+    calibrate_ns_ols_grid,
+    calibrate_nss_ols_grid,
+    calibrate_ns_ols_gradient,
+    calibrate_nss_ols_gradient
+)
+from src.analytics.utils.regression.incremental import IncrementalCalibrator
 from src.analytics.utils.helper import (
-    convert_date_series_to_years, 
-    convert_date_series_to_years_tenor, 
-    get_dict_from_list
+    convert_date_series_to_arrays,
+    convert_date_series_to_years_tenor
 )
 
 def construct_ns_curve(
     pricing_date: datetime.datetime,
-    market_curve: List[Dict]
+    market_curve: List[Dict],
+    calibration: str = "OLS",
+    day_count: Optional[str] = None,
+    previous_curve: Optional[NelsonSiegelCurve] = None
 ) -> NelsonSiegelCurve:
     """Constructs a Nelson Siegel curve from the market curve to be interpolated.
 
     Args:
         pricing_date (datetime.datetime): Date to which we are pricing curve (t=0).
         market_curve (List[Dict]): List of dictionaries containing date and rate.
+        calibration (str, optional): "OLS" to optimise tau from a starting value, "GRID" to
+            search tau on a grid and polish it, in bounded time, or "GRADIENT" to optimise a
+            bounded tau with the analytic gradient. Defaults to "OLS".
+        day_count (Optional[str], optional): Day count convention for the market curve dates
+            (see DAY_COUNT_CONVENTIONS), or None for whole years. Defaults to None.
+        previous_curve (Optional[NelsonSiegelCurve], optional): Curve whose tau warm starts
+            "GRADIENT" calibration. Defaults to None.
 
     Returns:
         NelsonSiegelCurve: NelsonSiegelCurve object.
     """
 
-    time_series = convert_date_series_to_years(market_curve, pricing_date)
-    time, rate = convert_curve_dict_list_to_lists(time_series)
-
-    time_array = np.array(time)
-    rate_array = np.array(rate)
+    time_array, rate_array = convert_date_series_to_arrays(market_curve, pricing_date, day_count)
     
-    curve, status = calibrate_ns_ols(
-        time_array,
-        rate_array,
-        tau0=1.0
-    )
+    assert calibration in CALIBRATION_OPTIONS, f"Calibration must be in {CALIBRATION_OPTIONS}"
+
+    assert calibration == "GRADIENT" or previous_curve is None, "previous_curve applies to GRADIENT calibration."
+
+    if calibration == "GRID":
+        curve, status = calibrate_ns_ols_grid(time_array, rate_array)
+    elif calibration == "GRADIENT":
+        curve, status = calibrate_ns_ols_gradient(
+            time_array,
+            rate_array,
+            tau0=1.0,
+            previous_curve=previous_curve
+        )
+    else:
+        curve, status = calibrate_ns_ols(
+            time_array,
+            rate_array,
+            tau0=1.0
+        )
 
     assert status.success
 
@@ -58,29 +89,54 @@ def ns_curve_output(
 
 def construct_nss_curve(
     pricing_date: datetime.datetime,
-    market_curve: List[Dict]
+    market_curve: List[Dict],
+    calibration: str = "OLS",
+    day_count: Optional[str] = None,
+    previous_curve: Optional[NelsonSiegelSvenssonCurve] = None,
+    multi_start: int = 0
 ) -> NelsonSiegelSvenssonCurve:
     """Constructs a Nelson Siegel Svensson curve from the market curve to be interpolated.
 
     Args:
         pricing_date (datetime.datetime): Date to which wea re pricing curve (t=0)
         market_curve (List[Dict]): List of dictionaries containing date and rate.
+        calibration (str, optional): "OLS" to optimise tau1 and tau2 from starting values,
+            "GRID" to search them on a grid and polish them, in bounded time, or "GRADIENT" to
+            optimise bounded taus with the analytic gradient. Defaults to "OLS".
+        day_count (Optional[str], optional): Day count convention for the market curve dates
+            (see DAY_COUNT_CONVENTIONS), or None for whole years. Defaults to None.
+        previous_curve (Optional[NelsonSiegelSvenssonCurve], optional): Curve whose taus warm
+            start "GRADIENT" calibration. Defaults to None.
+        multi_start (int, optional): Additional starting points tried by "GRADIENT" calibration
+            (see calibrate_nss_ols_gradient). Defaults to 0.
 
     Returns:
         NelsonSiegelSvenssonCurve: NelsonSiegelSvenssonCurve object.
     """
 
-    time_series = convert_date_series_to_years(market_curve, pricing_date)
-    time, rate = convert_curve_dict_list_to_lists(time_series)
-
-    time_array = np.array(time)
-    rate_array = np.array(rate)
+    time_array, rate_array = convert_date_series_to_arrays(market_curve, pricing_date, day_count)
     
-    curve, status = calibrate_nss_ols(
-        time_array,
-        rate_array,
-        tau0 = np.array([2.2, 3.1])
-    )
+    assert calibration in CALIBRATION_OPTIONS, f"Calibration must be in {CALIBRATION_OPTIONS}"
+
+    assert calibration == "GRADIENT" or (previous_curve is None and multi_start == 0), \
+        "previous_curve and multi_start apply to GRADIENT calibration."
+
+    if calibration == "GRID":
+        curve, status = calibrate_nss_ols_grid(time_array, rate_array)
+    elif calibration == "GRADIENT":
+        curve, status = calibrate_nss_ols_gradient(
+            time_array,
+            rate_array,
+            tau0 = (2.2, 3.1),
+            previous_curve = previous_curve,
+            multi_start = multi_start
+        )
+    else:
+        curve, status = calibrate_nss_ols(
+            time_array,
+            rate_array,
+            tau0 = np.array([2.2, 3.1])
+        )
 
     assert status.success
 
@@ -93,6 +149,37 @@ def nss_curve_output(
     y = NelsonSiegelSvenssonCurve
     return [{'tenor': tenor, 'rate': y(tenor)} for tenor in tenor_range]
 
+def incremental_curve_calibrator(
+    pricing_date: datetime.datetime,
+    market_curve: List[Dict],
+    curve_type: CurveOption = "NS",
+    day_count: Optional[str] = None
+) -> IncrementalCalibrator:
+    """Calibrates a curve to the market curve and keeps it calibrated as single quotes change,
+        without recalibrating from scratch (see IncrementalCalibrator.update_key).
+
+    Args:
+        pricing_date (datetime.datetime): Date to which we are pricing curve (t=0).
+        market_curve (List[Dict]): List of dictionaries containing date and rate.
+        curve_type (CurveOption, optional): "NS" or "NSS". Defaults to "NS".
+        day_count (Optional[str], optional): Day count convention for the market curve dates,
+            or None for whole years. Defaults to None.
+
+    Returns:
+        IncrementalCalibrator: Calibrator whose quotes are keyed by the market curve dates.
+    """
+
+    assert curve_type in CURVE_OPTIONS, f"Curve type must be in {CURVE_OPTIONS}"
+
+    time_array, rate_array = convert_date_series_to_arrays(market_curve, pricing_date, day_count)
+
+    return IncrementalCalibrator(
+        time_array,
+        rate_array,
+        curve_type=curve_type,
+        keys=[point['date'] for point in market_curve]
+    )
+
 def convert_curve_dict_list_to_lists(
     curve_dict_list: List[Dict]
 ) -> List[List]:
@@ -112,7 +199,8 @@ def convert_curve_dict_list_to_lists(
     return [times, rates]
 
 def bootstrap_curve(
-    base_curve: List[Dict]
+    base_curve: List[Dict],
+    round_to: Optional[int]=4
 ) -> List[Dict]:
     """Bootstrapped Curve. Used to create zero curve from market/spot curve.
 
@@ -120,6 +208,7 @@ def bootstrap_curve(
 
     Args:
         base_curve (List[Dict]): List of dictionaries containing tenor and rate as floats.
+        round_to (Optional[int], optional): Decimal places bootstrapped rates are rounded to, None to skip rounding. Defaults to 4.
 
     Returns:
         List[Dict]: _description_
@@ -127,33 +216,76 @@ def bootstrap_curve(
     assert len(base_curve) != 0, f"Provided curve is empty!"
     assert all(isinstance(tenor, float) for tenor in (obj['tenor'] for obj in base_curve)), f"All curve tenors must be of type float!"
 
-    bootstrapped_curve = []
-
-    for tenor_object in base_curve:
-        tenor = tenor_object['tenor']
-        rate = tenor_object['rate']
-        cashflow_sum = 0.0
+    tenors = np.array([obj['tenor'] for obj in base_curve], dtype=np.float64)
+    rates = np.array([obj['rate'] for obj in base_curve], dtype=np.float64)
 
-        if tenor == base_curve[0]['tenor']:
-            bootstrapped_curve.append(base_curve[0])
-            continue
-
-        for i in range(0, len(bootstrapped_curve)):
-            cashflow_sum += rate / (1 + bootstrapped_curve[i]['rate'])**(bootstrapped_curve[i]['tenor'])
-        
-        final = 1 + rate
-
-        bootstrapped_rate = (((final) / (1 - (cashflow_sum)))**(1/tenor)) - 1
+    bootstrapped_rates = bootstrap_zero_rates(tenors, rates, round_to=round_to)
 
+    bootstrapped_curve = [base_curve[0]]
+    for tenor, rate in zip(tenors[1:].tolist(), bootstrapped_rates[1:].tolist()):
         bootstrapped_curve.append(
             {
                 'tenor': tenor,
-                'rate': round(bootstrapped_rate, 4)
+                'rate': rate
             }
         )
 
     return bootstrapped_curve
 
+def bootstrap_zero_rates(
+    tenors: np.ndarray,
+    rates: np.ndarray,
+    round_to: Optional[int]=None
+) -> np.ndarray:
+    """Bootstrap zero rates from evenly spaced market/spot rates (see bootstrap_curve).
+
+    The annuity of discount factors sum(1/(1+z_i)^t_i) is carried forward rather
+    than recomputed for each tenor, so the bootstrap is linear in the number of tenors.
+    Without rounding the annuity follows S_k = (S_{k-1} + 1)/(1 + r_k), which is
+    evaluated in closed form over blocks of tenors.
+
+    Args:
+        tenors (np.ndarray): Evenly spaced tenors in years.
+        rates (np.ndarray): Market rates at the tenors.
+        round_to (Optional[int], optional): Decimal places each bootstrapped rate is rounded
+            to before being used for later tenors. Defaults to None (no rounding).
+
+    Returns:
+        np.ndarray: Zero rates at the tenors. The first rate is the first market rate.
+    """
+    tenors = np.asarray(tenors, dtype=np.float64)
+    rates = np.asarray(rates, dtype=np.float64)
+    assert tenors.size != 0, f"Provided curve is empty!"
+    assert tenors.shape == rates.shape, f"Tenors and rates must have the same shape."
+
+    zero_rates = rates.copy()
+    first_discount_factor = (1 + rates[0])**(-tenors[0])
+
+    if round_to is not None:
+        annuity = first_discount_factor
+        for k in range(1, tenors.size):
+            zero_rate = round((((1 + rates[k]) / (1 - rates[k] * annuity))**(1/tenors[k])) - 1, round_to)
+            zero_rates[k] = zero_rate
+            annuity += (1 + zero_rate)**(-tenors[k])
+        return zero_rates
+
+    previous_annuity = np.empty(tenors.size)
+    previous_annuity[0] = np.nan
+    annuity = first_discount_factor
+    # Blocks keep the cumulative discounting within floating point range.
+    block_size = 256
+    for block_start in range(1, tenors.size, block_size):
+        block = slice(block_start, min(block_start + block_size, tenors.size))
+        log_discount = -np.cumsum(np.log1p(rates[block]))
+        inverse_discount_sum = np.cumsum(np.exp(-np.concatenate(([0.0], log_discount[:-1]))))
+        block_annuity = np.exp(log_discount) * (annuity + inverse_discount_sum)
+        previous_annuity[block] = np.concatenate(([annuity], block_annuity[:-1]))
+        annuity = block_annuity[-1]
+
+    zero_rates[1:] = (((1 + rates[1:]) / (1 - rates[1:] * previous_annuity[1:]))**(1/tenors[1:])) - 1
+
+    return zero_rates
+
 def forward_curve(
     market_curve: List[Dict],
     forward_tenor: float
@@ -171,6 +303,8 @@ def forward_curve(
         9M3M
         etc...
 
+    Dictionary adapter for forward_curve_arrays, with rates rounded to 5 decimal places.
+
     Args:
         market_curve (List[Dict]): Equal monthly (1/12) spaced tenors starting from 1/12. 
         forward_tenor (float): The fraction of a year representing the forward tenor to forecast (a multiple of 1/12).
@@ -184,76 +318,220 @@ def forward_curve(
     rates = [object['rate'] for object in market_curve]
     assert all(isinstance(tenor, float) for tenor in tenors), f"Tenors must be of type float."
     assert all(isinstance(rate, float) for rate in rates), f"Rates must be of type float."
-    
-    forward_curve = []
+
+    settle_tenors, workout_tenors, forward_rates = forward_curve_arrays(
+        np.array(tenors),
+        np.array(rates),
+        forward_tenor
+    )
+
+    return _forward_curve_dict_list(settle_tenors, workout_tenors, forward_rates)
+
+def _forward_curve_dict_list(
+    settle_tenors: np.ndarray,
+    workout_tenors: np.ndarray,
+    forward_rates: np.ndarray
+) -> List[Dict]:
+    return [
+        {
+            "settle_tenor": settle_tenor,
+            "workout_tenor": workout_tenor,
+            "rate": round(rate, 5)
+        }
+        for settle_tenor, workout_tenor, rate
+        in zip(settle_tenors.tolist(), workout_tenors.tolist(), forward_rates.tolist())
+    ]
+
+def forward_curve_arrays(
+    tenors: np.ndarray,
+    rates: np.ndarray,
+    forward_tenor: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Forward curve for one forward tenor on a uniform tenor grid (see forward_curve).
+
+    The workout rate of each settlement tenor is found by shifting the rate array by
+    the number of grid steps in forward_tenor, instead of searching the curve.
+
+    Args:
+        tenors (np.ndarray): Uniformly spaced, increasing tenors.
+        rates (np.ndarray): Rates at the tenors.
+        forward_tenor (float): The fraction of a year representing the forward tenor (a key of FRACTION_OF_YEAR_TO_PERIOD_STRING).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Settlement tenors, workout tenors and forward rates.
+    """
+    tenors = np.asarray(tenors, dtype=np.float64)
+    rates = np.asarray(rates, dtype=np.float64)
+    assert tenors.size > 1, f"Curve input must contain more than one object!"
+    assert tenors.shape == rates.shape, f"Tenors and rates must have the same shape."
+
     freq = FRACTION_OF_YEAR_TO_PERIOD_STRING[forward_tenor]
-    
-    tenor_diff = _get_tenor_diff(market_curve, forward_tenor)
-
-    for k in range(0, len(market_curve) - tenor_diff - 1):
-        settlement_spot_tenor_object = market_curve[k]
-        settlement_tenor = settlement_spot_tenor_object['tenor']
-        settlement_rate = settlement_spot_tenor_object['rate']
-        # Check if there is a corresponding workout spot-tenor object.
-        workout_objects_filter = [
-            object for object in market_curve if math.isclose(object.get('tenor'),(settlement_tenor+forward_tenor), abs_tol=0.040)
-        ]
-        workout_tenor = (settlement_tenor+forward_tenor)
-        workout_object = get_dict_from_list(market_curve, "tenor", workout_tenor)
-        # If there is then calculate and add to the curve.
-        if len(workout_objects_filter) > 0:
-            workout_tenor = workout_object['tenor']
-            workout_rate = workout_object['rate']
-            
-            forward_curve.append(
-                {
-                    "settle_tenor": settlement_tenor,
-                    "workout_tenor": workout_tenor,
-                    "rate": round(implied_forward_rate(settlement_spot_tenor_object, workout_object, freq), 5)
-                }
+    tenor_step = tenors[1] - tenors[0]
+    shift = int(round(forward_tenor / tenor_step))
+
+    number_of_settlements = max(tenors.size - _get_tenor_diff(tenors, forward_tenor) - 1, 0)
+    settle_index = np.arange(min(number_of_settlements, max(tenors.size - shift, 0)))
+    workout_index = settle_index + shift
+
+    matched = np.abs(tenors[workout_index] - (tenors[settle_index] + forward_tenor)) <= 0.040
+    settle_index = settle_index[matched]
+    workout_index = workout_index[matched]
+
+    forward_rates = implied_forward_rates(
+        tenors[settle_index],
+        rates[settle_index],
+        tenors[workout_index],
+        rates[workout_index],
+        freq
+    )
+
+    return tenors[settle_index], tenors[workout_index], forward_rates
+
+def forward_curves(
+    tenors: np.ndarray,
+    rates: np.ndarray,
+    forward_rate_set: List[str]
+) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Forward curves for each forward tenor in forward_rate_set (keys of TIMESERIES_TIME_PERIODS).
+
+    Args:
+        tenors (np.ndarray): Uniformly spaced, increasing tenors.
+        rates (np.ndarray): Rates at the tenors.
+        forward_rate_set (List[str]): Forward tenors, e.g. ["Q", "SA"].
+
+    Returns:
+        Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]: Settlement tenors, workout tenors and forward rates by forward tenor.
+    """
+    return {
+        tenor_string: forward_curve_arrays(
+            tenors,
+            rates,
+            TIMESERIES_TIME_PERIODS[tenor_string]['fraction_of_year']
+        )
+        for tenor_string in forward_rate_set
+    }
+
+CURVE_SET_TENORS = np.linspace(0, 30, num=30*12)
+
+class CurveSet(Mapping):
+    """Curves derived from a market curve, each computed on first access and cached.
+
+    Array backed components:
+        constructed_curve: Calibrated NelsonSiegelCurve or NelsonSiegelSvenssonCurve.
+        interpolated: CurveSnapshot of the constructed curve on CURVE_SET_TENORS.
+        zero_rates: Zero rates bootstrapped from the interpolated rates (rounded as bootstrap_curve).
+        forward_curve(tenor_string): Settlement tenors, workout tenors and forward rates.
+
+    As a mapping it also provides the list of dictionaries forms previously returned by
+    curve_set, under "constructed_curve", "interpolated_market_curve", "zero_curve" and
+    "forward_curves", built from the arrays when first read.
+    """
+
+    _KEYS = ("constructed_curve", "interpolated_market_curve", "zero_curve", "forward_curves")
+
+    def __init__(
+        self,
+        pricing_date: datetime.datetime,
+        market_curve: List[Dict],
+        forward_rate_set: List[str],
+        curve_type: CurveOption="NS",
+        day_count: Optional[str]=None
+    ) -> None:
+        assert curve_type in CURVE_OPTIONS, f"Curve type must be in {CURVE_OPTIONS}"
+        self.pricing_date = pricing_date
+        self.market_curve = market_curve
+        self.forward_rate_set = list(forward_rate_set)
+        self.curve_type = curve_type
+        self.day_count = day_count
+        self._forward_curves: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    @cached_property
+    def constructed_curve(self) -> Any:
+        if self.curve_type == "NSS":
+            return construct_nss_curve(self.pricing_date, self.market_curve, day_count=self.day_count)
+        return construct_ns_curve(self.pricing_date, self.market_curve, day_count=self.day_count)
+
+    @cached_property
+    def interpolated(self) -> CurveSnapshot:
+        return CurveSnapshot.from_curve(self.constructed_curve, CURVE_SET_TENORS)
+
+    @cached_property
+    def zero_rates(self) -> np.ndarray:
+        return bootstrap_zero_rates(self.interpolated.tenors, self.interpolated.rates, round_to=4)
+
+    def forward_curve(self, tenor_string: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Forward curve arrays for a key of TIMESERIES_TIME_PERIODS (see forward_curve_arrays)."""
+        if tenor_string not in self._forward_curves:
+            self._forward_curves[tenor_string] = forward_curve_arrays(
+                self.interpolated.tenors,
+                self.interpolated.rates,
+                TIMESERIES_TIME_PERIODS[tenor_string]['fraction_of_year']
             )
-                
-    return forward_curve
+        return self._forward_curves[tenor_string]
+
+    @cached_property
+    def _interpolated_market_curve(self) -> List[Dict]:
+        return self.interpolated.to_dict_list()
+
+    @cached_property
+    def _zero_curve(self) -> List[Dict]:
+        return [
+            {'tenor': tenor, 'rate': rate}
+            for tenor, rate in zip(self.interpolated.tenors.tolist(), self.zero_rates.tolist())
+        ]
+
+    @cached_property
+    def _forward_curve_dicts(self) -> Dict:
+        return {
+            tenor_string: {tenor_string: _forward_curve_dict_list(*self.forward_curve(tenor_string))}
+            for tenor_string in self.forward_rate_set
+        }
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "constructed_curve":
+            return self.constructed_curve
+        if key == "interpolated_market_curve":
+            return self._interpolated_market_curve
+        if key == "zero_curve":
+            return self._zero_curve
+        if key == "forward_curves":
+            return self._forward_curve_dicts
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def computed(self) -> List[str]:
+        """Names of the components computed so far."""
+        names = ["constructed_curve", "interpolated", "zero_rates"]
+        computed = [name for name in names if name in self.__dict__]
+        return computed + [f"forward_curve:{tenor_string}" for tenor_string in self._forward_curves]
 
 def curve_set(
     pricing_date: datetime.datetime,
     market_curve: List[Dict],
     forward_rate_set: List[str],
-    curve_type: CURVE_OPTIONS="NS"
-) -> Dict:
-    assert curve_type in CURVE_OPTIONS, f"Curve type must be in {CURVE_OPTIONS}"
-    # assert forward_rate_set in FRACTION_OF_YEAR_TO_PERIOD_STRING.keys(), f"Forward rate set"
-    
-    curve_set = {}
-    
-    match curve_type:
-        case "NS":
-            curve_set["constructed_curve"] = construct_ns_curve(pricing_date, market_curve)
-            curve_set["interpolated_market_curve"] = ns_curve_output(
-                curve_set["constructed_curve"], 
-                np.linspace(0, 30, num=30*12).tolist()
-            )
-        case "NSS":
-            curve_set["constructed_curve"] = construct_nss_curve(pricing_date, market_curve)
-            curve_set["interpolated_market_curve"] = nss_curve_output(
-                curve_set["constructed_curve"], 
-                np.linspace(0, 30, num=30*12).tolist()
-            )
-    
-    curve_set["zero_curve"] = bootstrap_curve(curve_set["interpolated_market_curve"])
-        
-    forward_curves = {}
-    for tenor_string in forward_rate_set:
-        forward_curves[tenor_string] = { 
-            tenor_string: forward_curve(
-                curve_set['interpolated_market_curve'], 
-                TIMESERIES_TIME_PERIODS[tenor_string]['fraction_of_year']
-            )
-        }
-    
-    curve_set['forward_curves'] = forward_curves
-    
-    return curve_set    
+    curve_type: CurveOption="NS",
+    day_count: Optional[str]=None
+) -> CurveSet:
+    """Lazily computed set of curves for a market curve (see CurveSet). Nothing is
+    calibrated, interpolated or bootstrapped until it is first read.
+
+    Args:
+        pricing_date (datetime.datetime): Date to which we are pricing curve (t=0).
+        market_curve (List[Dict]): List of dictionaries containing date and rate.
+        forward_rate_set (List[str]): Forward tenors (keys of TIMESERIES_TIME_PERIODS), e.g. ["Q", "SA"].
+        curve_type (CurveOption, optional): Curve model. Defaults to "NS".
+        day_count (Optional[str], optional): Day count convention for the market curve dates
+            (see DAY_COUNT_CONVENTIONS), or None for whole years. Defaults to None.
+
+    Returns:
+        CurveSet: Mapping of the constructed, interpolated, zero and forward curves.
+    """
+    return CurveSet(pricing_date, market_curve, forward_rate_set, curve_type, day_count)
 
 def _clean_curve_tenor_round(
     curve: List[Dict],
@@ -266,10 +544,10 @@ def _clean_curve_tenor_round(
     return curve
 
 def _get_tenor_diff(
-    market_curve: List[Dict],
+    tenors: np.ndarray,
     forward_period: float
 ) -> int:
-    first_element_tenor = market_curve[1]['tenor']
+    first_element_tenor = tenors[1]
     tenor_diff = int(forward_period/first_element_tenor)
     
     return tenor_diff
\ No newline at end of file
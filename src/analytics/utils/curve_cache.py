@@ -0,0 +1,173 @@
+import dataclasses
+import datetime
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.analytics.utils.curve import construct_ns_curve, construct_nss_curve
+from src.analytics.utils.lookup import CALIBRATION_OPTIONS, CURVE_OPTIONS, CurveObject, CurveOption
+
+CURVE_CONSTRUCTORS: Dict[str, Callable[..., CurveObject]] = {
+    "NS": construct_ns_curve,
+    "NSS": construct_nss_curve
+}
+
+
+def market_curve_fingerprint(
+    market_curve: List[Dict]
+) -> str:
+    """Hash of a market curve's dates and rates.
+
+    Args:
+        market_curve (List[Dict]): List of dictionaries containing date and rate.
+
+    Returns:
+        str: Hex digest identifying the curve points.
+    """
+    dates = np.array([point['date'] for point in market_curve], dtype="datetime64[us]")
+    rates = np.array([point['rate'] for point in market_curve], dtype=np.float64)
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(dates.tobytes())
+    digest.update(rates.tobytes())
+
+    return digest.hexdigest()
+
+
+class CurveCache:
+    """Least recently used cache of calibrated curves.
+
+    Curves are keyed by (pricing_date, market curve fingerprint, curve type, calibration, day count,
+    warm start parameters, multi start), so the same market curve is calibrated once however many
+    securities are priced off it.
+    Cached curves are shared and must not be modified by callers.
+    """
+
+    def __init__(self, max_size: int = 128) -> None:
+        assert max_size > 0, "max_size must be greater than zero."
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._curves: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._curves)
+
+    def get(
+        self,
+        pricing_date: datetime.datetime,
+        market_curve: List[Dict],
+        curve_type: CurveOption = "NS",
+        calibration: str = "OLS",
+        day_count: Optional[str] = None,
+        previous_curve: Optional[CurveObject] = None,
+        multi_start: int = 0
+    ) -> CurveObject:
+        """Calibrated curve for the market curve, constructed on a cache miss.
+
+        Args:
+            pricing_date (datetime.datetime): Date to which we are pricing curve (t=0).
+            market_curve (List[Dict]): List of dictionaries containing date and rate.
+            curve_type (CurveOption, optional): Curve model. Defaults to "NS".
+            calibration (str, optional): Calibration method, one of CALIBRATION_OPTIONS. Defaults to "OLS".
+            day_count (Optional[str], optional): Day count convention for the market curve dates,
+                or None for whole years. Defaults to None.
+            previous_curve (Optional[CurveObject], optional): Curve of curve_type warm starting
+                "GRADIENT" calibration. Defaults to None.
+            multi_start (int, optional): Additional starting points for "GRADIENT" calibration of
+                NSS curves. Defaults to 0.
+
+        Returns:
+            CurveObject: NelsonSiegelCurve or NelsonSiegelSvenssonCurve object.
+        """
+        assert curve_type in CURVE_OPTIONS, f"Curve type must be in {CURVE_OPTIONS}"
+        assert calibration in CALIBRATION_OPTIONS, f"Calibration must be in {CALIBRATION_OPTIONS}"
+        assert multi_start == 0 or curve_type == "NSS", "multi_start applies to NSS curves."
+        warm_start = dataclasses.astuple(previous_curve) if previous_curve is not None else None
+        key = (
+            pricing_date, market_curve_fingerprint(market_curve), curve_type, calibration, day_count,
+            warm_start, multi_start
+        )
+
+        with self._lock:
+            if key in self._curves:
+                self.hits += 1
+                self._curves.move_to_end(key)
+                return self._curves[key]
+            self.misses += 1
+
+        options: Dict[str, Any] = {"previous_curve": previous_curve}
+        if multi_start:
+            options["multi_start"] = multi_start
+        curve = CURVE_CONSTRUCTORS[curve_type](pricing_date, market_curve, calibration, day_count, **options)
+
+        with self._lock:
+            self._curves[key] = curve
+            self._curves.move_to_end(key)
+            while len(self._curves) > self.max_size:
+                self._curves.popitem(last=False)
+
+        return curve
+
+    def invalidate(
+        self,
+        pricing_date: Optional[datetime.datetime] = None,
+        market_curve: Optional[List[Dict]] = None,
+        curve_type: Optional[str] = None
+    ) -> int:
+        """Remove cached curves matching all of the given arguments (all curves if none are given).
+
+        Args:
+            pricing_date (Optional[datetime.datetime], optional): Pricing date of the curves to remove.
+            market_curve (Optional[List[Dict]], optional): Market curve of the curves to remove.
+            curve_type (Optional[str], optional): Curve model of the curves to remove.
+
+        Returns:
+            int: Number of curves removed.
+        """
+        fingerprint = market_curve_fingerprint(market_curve) if market_curve is not None else None
+
+        with self._lock:
+            stale_keys = [
+                key for key in self._curves
+                if (pricing_date is None or key[0] == pricing_date)
+                and (fingerprint is None or key[1] == fingerprint)
+                and (curve_type is None or key[2] == curve_type)
+            ]
+            for key in stale_keys:
+                del self._curves[key]
+
+        return len(stale_keys)
+
+    def clear(self) -> None:
+        """Remove all cached curves and reset the hit/miss counters."""
+        with self._lock:
+            self._curves.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        """Cache size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._curves),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+# Process-wide cache used by the security analytics when no curve_cache is passed. Curves stay
+# cached for the life of the process (up to max_size); use clear_curve_cache to release them.
+DEFAULT_CURVE_CACHE = CurveCache()
+
+
+def clear_curve_cache() -> None:
+    """Empty the process-wide DEFAULT_CURVE_CACHE and reset its statistics."""
+    DEFAULT_CURVE_CACHE.clear()
@@ -0,0 +1,219 @@
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.analytics.utils.lookup import CurveObject
+
+INTERPOLATION_OPTIONS = [
+    "linear",
+    "log_linear"
+]
+
+# Shared memory layout: [n, interpolation code, tenors (n), rates (n), discount factors (n)]
+_SHARED_HEADER_SIZE = 2
+
+
+@dataclass
+class CurveSnapshot:
+    """A curve evaluated once on a tenor grid, for fast repeated lookups.
+
+    Tenors, rates and (annually compounded, as financial.present_value) discount
+    factors are held in contiguous float64 arrays. Lookups find the grid interval in
+    O(1) on uniform grids and by binary search otherwise, then interpolate either rates
+    linearly ("linear", flat beyond the grid) or log discount factors linearly
+    ("log_linear", constant forward beyond the grid).
+
+    Snapshots pickle like any dataclass and can be shared between processes without
+    copying through to_shared_memory and from_shared_memory.
+    """
+
+    tenors: np.ndarray
+    rates: np.ndarray
+    discount_factors: Optional[np.ndarray] = None
+    interpolation: str = "linear"
+    _step: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    _log_discount_factors: np.ndarray = field(default_factory=lambda: np.empty(0), init=False, repr=False, compare=False)
+    _shared_memory: Optional[shared_memory.SharedMemory] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        assert self.interpolation in INTERPOLATION_OPTIONS, f"Interpolation must be in {INTERPOLATION_OPTIONS}"
+        self.tenors = np.ascontiguousarray(self.tenors, dtype=np.float64)
+        self.rates = np.ascontiguousarray(self.rates, dtype=np.float64)
+        assert self.tenors.ndim == 1 and self.tenors.size >= 2, "A snapshot needs at least two tenors."
+        assert self.tenors.shape == self.rates.shape, "Mismatching shapes of tenors and rates."
+        assert np.all(np.diff(self.tenors) > 0), "Tenors must be strictly increasing."
+
+        if self.discount_factors is None:
+            self.discount_factors = (1 + self.rates) ** (-self.tenors)
+        self.discount_factors = np.ascontiguousarray(self.discount_factors, dtype=np.float64)
+        self._log_discount_factors = np.log(self.discount_factors)
+
+        steps = np.diff(self.tenors)
+        uniform = np.allclose(steps, steps[0], rtol=1e-9, atol=0)
+        self._step = float(steps[0]) if uniform else None
+
+    def __len__(self) -> int:
+        return self.tenors.size
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state["_shared_memory"] = None
+        return state
+
+    @property
+    def is_uniform(self) -> bool:
+        """Whether the tenors are evenly spaced (O(1) interval lookup)."""
+        return self._step is not None
+
+    @classmethod
+    def from_curve(
+        cls,
+        curve: CurveObject,
+        tenors: np.ndarray,
+        interpolation: str = "linear"
+    ) -> "CurveSnapshot":
+        """Snapshot of a NelsonSiegelCurve or NelsonSiegelSvenssonCurve on a tenor grid.
+
+        Args:
+            curve (CurveObject): Calibrated parametric curve.
+            tenors (np.ndarray): Strictly increasing tenors in years.
+            interpolation (str, optional): "linear" or "log_linear". Defaults to "linear".
+
+        Returns:
+            CurveSnapshot: Snapshot holding the curve's zero rates and discount factors.
+        """
+        zero, _, discount = curve.evaluate(np.asarray(tenors, dtype=np.float64))
+        return cls(tenors, zero, discount, interpolation)
+
+    @classmethod
+    def from_curve_dicts(
+        cls,
+        curve: List[Dict],
+        interpolation: str = "linear"
+    ) -> "CurveSnapshot":
+        """Snapshot of a list of {'tenor', 'rate'} dictionaries (see ns_curve_output).
+
+        Args:
+            curve (List[Dict]): List of dictionaries containing tenor and rate.
+            interpolation (str, optional): "linear" or "log_linear". Defaults to "linear".
+
+        Returns:
+            CurveSnapshot: Snapshot of the curve.
+        """
+        tenors = np.fromiter((point['tenor'] for point in curve), dtype=np.float64, count=len(curve))
+        rates = np.fromiter((point['rate'] for point in curve), dtype=np.float64, count=len(curve))
+        return cls(tenors, rates, interpolation=interpolation)
+
+    def to_dict_list(self) -> List[Dict]:
+        """The snapshot as a list of {'tenor', 'rate'} dictionaries."""
+        return [{'tenor': tenor, 'rate': rate} for tenor, rate in zip(self.tenors.tolist(), self.rates.tolist())]
+
+    def _locate(self, T: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Left grid index of the interval of each time and the (unclipped) position within it."""
+        last_interval = self.tenors.size - 2
+        if self._step is not None:
+            index = np.floor((T - self.tenors[0]) / self._step)
+            index = np.clip(index, 0, last_interval).astype(np.intp)
+        else:
+            index = np.searchsorted(self.tenors, T, side="right") - 1
+            index = np.clip(index, 0, last_interval)
+        left = self.tenors[index]
+        weight = (T - left) / (self.tenors[index + 1] - left)
+        return index, weight
+
+    def _interpolated_rates(self, index: np.ndarray, weight: np.ndarray) -> np.ndarray:
+        weight = np.clip(weight, 0.0, 1.0)
+        left = self.rates[index]
+        return left + weight * (self.rates[index + 1] - left)
+
+    def _interpolated_log_discount_factors(self, index: np.ndarray, weight: np.ndarray) -> np.ndarray:
+        left = self._log_discount_factors[index]
+        return left + weight * (self._log_discount_factors[index + 1] - left)
+
+    def rate(self, T: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """Interpolated annually compounded rate(s) at time(s) T in years.
+
+        Args:
+            T (Union[float, np.ndarray]): Time(s) in years.
+
+        Returns:
+            Union[float, np.ndarray]: Rate(s) with the shape of T.
+        """
+        T_array = np.asarray(T, dtype=np.float64)
+        index, weight = self._locate(T_array)
+        rates = self._interpolated_rates(index, weight)
+        if self.interpolation == "log_linear":
+            positive = T_array > 0
+            log_discount = self._interpolated_log_discount_factors(index, weight)
+            implied = np.expm1(-log_discount / np.where(positive, T_array, 1.0))
+            rates = np.where(positive, implied, rates)
+        return float(rates) if rates.ndim == 0 else rates
+
+    def discount_factor(self, T: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """Interpolated discount factor(s) at time(s) T in years.
+
+        Args:
+            T (Union[float, np.ndarray]): Time(s) in years.
+
+        Returns:
+            Union[float, np.ndarray]: Discount factor(s) with the shape of T.
+        """
+        T_array = np.asarray(T, dtype=np.float64)
+        index, weight = self._locate(T_array)
+        if self.interpolation == "log_linear":
+            discount = np.exp(self._interpolated_log_discount_factors(index, weight))
+        else:
+            discount = (1 + self._interpolated_rates(index, weight)) ** (-T_array)
+        return float(discount) if discount.ndim == 0 else discount
+
+    def to_shared_memory(self, name: Optional[str] = None) -> shared_memory.SharedMemory:
+        """Copy the snapshot into a new shared memory block, to be attached by name in
+        other processes with from_shared_memory. The caller owns the block and must
+        close and unlink it once no process needs it.
+
+        Args:
+            name (Optional[str], optional): Name of the block. Defaults to a generated name.
+
+        Returns:
+            shared_memory.SharedMemory: The shared memory block.
+        """
+        n = self.tenors.size
+        block = shared_memory.SharedMemory(
+            name=name, create=True, size=(_SHARED_HEADER_SIZE + 3 * n) * np.dtype(np.float64).itemsize
+        )
+        buffer: np.ndarray = np.ndarray((_SHARED_HEADER_SIZE + 3 * n,), dtype=np.float64, buffer=block.buf)
+        buffer[0] = n
+        buffer[1] = INTERPOLATION_OPTIONS.index(self.interpolation)
+        buffer[_SHARED_HEADER_SIZE:].reshape(3, n)[:] = (self.tenors, self.rates, self.discount_factors)
+        del buffer
+        return block
+
+    @classmethod
+    def from_shared_memory(cls, name: str) -> "CurveSnapshot":
+        """Attach to a snapshot written by to_shared_memory, without copying its arrays.
+        Call close on the snapshot when done with it.
+
+        Args:
+            name (str): Name of the shared memory block.
+
+        Returns:
+            CurveSnapshot: Snapshot whose arrays are views of the shared block.
+        """
+        block = shared_memory.SharedMemory(name=name)
+        header: np.ndarray = np.ndarray((_SHARED_HEADER_SIZE,), dtype=np.float64, buffer=block.buf)
+        n, interpolation_code = int(header[0]), int(header[1])
+        arrays: np.ndarray = np.ndarray((3, n), dtype=np.float64, buffer=block.buf,
+                                        offset=_SHARED_HEADER_SIZE * header.itemsize)
+        del header
+        snapshot = cls(arrays[0], arrays[1], arrays[2], INTERPOLATION_OPTIONS[interpolation_code])
+        snapshot._shared_memory = block
+        return snapshot
+
+    def close(self) -> None:
+        """Detach a snapshot attached with from_shared_memory from its block, leaving it empty."""
+        if self._shared_memory is not None:
+            self.tenors, self.rates, self.discount_factors, self._log_discount_factors = (np.empty(0) for _ in range(4))
+            self._shared_memory.close()
+            self._shared_memory = None
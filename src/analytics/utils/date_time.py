@@ -1,27 +1,86 @@
 import datetime
-from os import stat
-from queue import Empty
-from typing import Any, List
-import pandas as pd
-from pandas.tseries.offsets import DateOffset
+import functools
+from typing import Any, Dict, List, Optional, Tuple, Union
+import numpy as np
 
-from src.analytics.utils.lookup import TIMESERIES_TIME_PERIODS
+from src.analytics.utils.business_day import BusinessDayCalendar, WEEKEND_CALENDAR
+from src.analytics.utils.day_count import tenor_day_count, year_fraction, year_fractions
+from src.analytics.utils.lookup import DAY_TYPE_OPTIONS, STUB_RULES, TIMESERIES_TIME_PERIODS, TYPED_DATE_FIELDS
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+# Distinct "YYYY-MM-DD" strings kept by the date parsing cache.
+DATE_CACHE_SIZE = 65536
 
 def get_days_before_date(
     start_date: datetime.datetime,
     number_of_days: int,
-    is_calendar_days: bool=True
+    is_calendar_days: bool=True,
+    calendar: Optional[BusinessDayCalendar]=None
 ) -> datetime.datetime:
-    return (start_date - datetime.timedelta(days=number_of_days))
+    """Date a number of calendar or business days before start_date, keeping its time of day.
+
+    Args:
+        start_date (datetime.datetime): Date to count back from.
+        number_of_days (int): Days to count back.
+        is_calendar_days (bool, optional): Count calendar days, else business days. Defaults to True.
+        calendar (Optional[BusinessDayCalendar], optional): Business day calendar. Defaults to
+            WEEKEND_CALENDAR (weekends only).
+
+    Returns:
+        datetime.datetime: The earlier date.
+    """
+    if is_calendar_days:
+        return (start_date - datetime.timedelta(days=number_of_days))
+
+    calendar = calendar if calendar is not None else WEEKEND_CALENDAR
+    start_day = np.datetime64(start_date, "D")
+    shifted_day = calendar.add_business_days(start_day, -number_of_days)
+
+    return start_date + datetime.timedelta(days=int((shifted_day - start_day).astype(np.int64)))
 
 def get_record_date(
     payment_date: datetime.datetime,
-    ex_record_config: dict
+    ex_record_config: dict,
+    calendar: Optional[BusinessDayCalendar]=None
 ) -> datetime.datetime:
     
     num_days = ex_record_config['record_date']['days_before_payment_date']
+    day_type = ex_record_config['record_date'].get('day_type', "calendar")
+    assert day_type in DAY_TYPE_OPTIONS, f"day_type must be in {DAY_TYPE_OPTIONS}"
     
-    return get_days_before_date(payment_date, num_days)
+    return get_days_before_date(payment_date, num_days, day_type == "calendar", calendar)
+
+def get_record_and_ex_dates(
+    payment_dates: np.ndarray,
+    ex_record_config: dict,
+    calendar: Optional[BusinessDayCalendar]=None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorised get_record_date over an array of payment dates, with the ex dates one
+        (calendar or business) day before the record dates.
+
+    Args:
+        payment_dates (np.ndarray): Payment dates.
+        ex_record_config (dict): Record date configuration, counting days_before_payment_date
+            in calendar or business days by its day_type.
+        calendar (Optional[BusinessDayCalendar], optional): Business day calendar. Defaults to
+            WEEKEND_CALENDAR (weekends only).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Record dates and ex dates (datetime64[D]).
+    """
+    payment_dates = np.asarray(payment_dates, dtype="datetime64[D]")
+    num_days = ex_record_config['record_date']['days_before_payment_date']
+    day_type = ex_record_config['record_date'].get('day_type', "calendar")
+    assert day_type in DAY_TYPE_OPTIONS, f"day_type must be in {DAY_TYPE_OPTIONS}"
+
+    if day_type == "calendar":
+        record_dates = payment_dates - np.timedelta64(num_days, "D")
+        return record_dates, record_dates - np.timedelta64(1, "D")
+
+    calendar = calendar if calendar is not None else WEEKEND_CALENDAR
+    record_dates = calendar.add_business_days(payment_dates, -num_days)
+
+    return record_dates, calendar.add_business_days(record_dates, -1)
 
 def days_between_dates(first_date: datetime.datetime, second_date: datetime.datetime) -> float:
     """Time between two dates in days.
@@ -47,141 +106,330 @@ def months_between_dates(first_date: datetime.datetime, second_date: datetime.da
     """
     return ( second_date.year - first_date.year) * 12 + second_date.month - first_date.month
 
-def years_between_dates(first_date: datetime.datetime, second_date: datetime.datetime, days_in_year: int=365) -> float:
+def years_between_dates(
+    first_date: datetime.datetime,
+    second_date: datetime.datetime,
+    days_in_year: int=365,
+    day_count: Optional[str]=None
+) -> float:
     """Time between two dates in years and fractions of years.
 
     Args:
         first_date (datetime.datetime): The earlier date.
         second_date (datetime.datetime): The later date.
+        days_in_year (int, optional): Days per year when no day_count is given. Defaults to 365.
+        day_count (Optional[str], optional): Day count convention (see day_count.year_fractions),
+            or None for whole days divided by days_in_year. ACT/ACT ICMA is measured as ACT/ACT
+            (see day_count.tenor_day_count). Defaults to None.
 
     Returns:
         float: The decimal value representing the number of whole and part years between the dates.
     """
+    if day_count is not None:
+        return year_fraction(first_date, second_date, tenor_day_count(day_count))
+
     return days_between_dates(first_date, second_date)/days_in_year
 
+def years_between_date_arrays(
+    first_date: Union[datetime.date, np.ndarray],
+    second_date: Union[datetime.date, np.ndarray],
+    days_in_year: int=365,
+    day_count: Optional[str]=None
+) -> np.ndarray:
+    """Vectorised years_between_dates over arrays of dates.
+
+    Args:
+        first_date (Union[datetime.date, np.ndarray]): The earlier date(s).
+        second_date (Union[datetime.date, np.ndarray]): The later date(s).
+        days_in_year (int, optional): Days per year when no day_count is given. Defaults to 365.
+        day_count (Optional[str], optional): Day count convention (see day_count.year_fractions),
+            or None for whole days divided by days_in_year. ACT/ACT ICMA is measured as ACT/ACT
+            (see day_count.tenor_day_count). Defaults to None.
+
+    Returns:
+        np.ndarray: Year fractions between the dates.
+    """
+    if day_count is not None:
+        return year_fractions(first_date, second_date, tenor_day_count(day_count))
+
+    # Floor division matches timedelta.days when dates carry a time of day.
+    days = (np.asarray(second_date, dtype="datetime64[us]") - np.asarray(first_date, dtype="datetime64[us]")) // np.timedelta64(1, "D")
+
+    return days / days_in_year
+
 def generate_date_range(
     start_date: datetime.datetime, 
     end_date: datetime.datetime, 
     freq_input: TIMESERIES_TIME_PERIODS.keys()="A",
     arrears: bool = True
     ) -> List:
-    """_summary_
+    """Payment dates from start_date to end_date as "YYYY-MM-DD" strings (see generate_schedule).
 
     Args:
-        start_date (datetime.datetime): _description_
-        end_date (datetime.datetime): _description_
-        freqInput (str): _description_
-        arrears (bool): _description_
+        start_date (datetime.datetime): Anchor date of the schedule.
+        end_date (datetime.datetime): Last date of the schedule.
+        freqInput (str): Key of TIMESERIES_TIME_PERIODS.
+        arrears (bool): Dates in arrears (excluding start_date) or advance (excluding the last date).
 
     Returns:
-        List: _description_
+        List: Dates as strings.
     """
     assert isinstance(start_date, datetime.datetime), f"start_date must be of type datetime.datetime"
     assert isinstance(end_date, datetime.datetime), f"end_date must be of type datetime.datetime"
-    assert start_date <= end_date, f"start_date is after end_date"
-    assert freq_input in TIMESERIES_TIME_PERIODS.keys(), f"'{freq_input}' is not in {TIMESERIES_TIME_PERIODS.keys()}"
 
-    if freq_input == "A":
-        date_range = _annual_range(start_date, end_date)
-    else: 
-        date_range = _n_monthly_range(start_date, end_date, freq_input)
+    return generate_schedule(start_date, end_date, freq_input, arrears).astype(str).tolist()
 
-    range_as_list = date_range.to_native_types().tolist()
+def generate_schedule(
+    start_date: Union[datetime.date, np.datetime64],
+    end_date: Union[datetime.date, np.datetime64],
+    freq_input: TIMESERIES_TIME_PERIODS.keys()="A",
+    arrears: bool=True,
+    end_of_month: bool=False,
+    stub: Optional[str]=None
+) -> np.ndarray:
+    """Schedule of dates every period of freq_input from start_date to end_date, built with
+        datetime64[D] month arithmetic. Times of day are ignored.
+
+        Without a stub rule, dates roll forward from start_date on its day of month (clipped
+        to the last day of shorter months) and an end_date off the schedule is not a date:
+        monthly schedules run to the month of end_date, annual schedules to end_date, and
+        annual dates roll from the previous date, so a 29 February anchor sticks at the 28th.
+        Stub rules make both start_date and end_date schedule dates:
+            - short_back / long_back: dates roll forward from start_date, with a short final
+              period to end_date, or the final stub merged into the previous period.
+            - short_front / long_front: dates roll back from end_date, with a short first
+              period from start_date, or the first stub merged into the next period.
+
+        Schedules are cached per (start_date, end_date, freq_input, arrears, end_of_month, stub),
+        so the returned array is read-only.
 
-    return_list = range_as_list[1:] if arrears else range_as_list[:-1]
+    Args:
+        start_date (Union[datetime.date, np.datetime64]): Anchor date of the schedule.
+        end_date (Union[datetime.date, np.datetime64]): Last date of the schedule.
+        freq_input (str, optional): Key of TIMESERIES_TIME_PERIODS. Defaults to "A".
+        arrears (bool, optional): Dates in arrears (excluding the first date) or advance
+            (excluding the last date). Defaults to True.
+        end_of_month (bool, optional): When the anchor date is the last day of its month,
+            every date is the last day of its month. Defaults to False.
+        stub (Optional[str], optional): One of STUB_RULES, or None. Defaults to None.
 
-    return  return_list
+    Returns:
+        np.ndarray: datetime64[D] dates.
+    """
+    assert freq_input in TIMESERIES_TIME_PERIODS.keys(), f"'{freq_input}' is not in {TIMESERIES_TIME_PERIODS.keys()}"
+    assert stub is None or stub in STUB_RULES, f"stub must be None or in {STUB_RULES}"
+    start_day = int(np.datetime64(start_date, "D").astype(np.int64))
+    end_day = int(np.datetime64(end_date, "D").astype(np.int64))
+    assert start_day <= end_day, f"start_date is after end_date"
 
-def _annual_range(
-    start_date: datetime.datetime,
-    end_date: datetime.datetime
-) -> List:
-    assert isinstance(start_date, datetime.datetime), f"start_date must be of type datetime.datetime"
-    assert isinstance(end_date, datetime.datetime), f"end_date must be of type datetime.datetime"
-    assert start_date <= end_date, f"start_date is after end_date"
+    return _cached_schedule(start_day, end_day, freq_input, bool(arrears), bool(end_of_month), stub)
 
-    return pd.date_range(start_date, end_date, freq=DateOffset(years=1))
+@functools.lru_cache(maxsize=4096)
+def _cached_schedule(
+    start_day: int,
+    end_day: int,
+    freq: str,
+    arrears: bool,
+    end_of_month: bool,
+    stub: Optional[str]
+) -> np.ndarray:
+    start_date = np.datetime64(start_day, "D")
+    end_date = np.datetime64(end_day, "D")
+    month_step = int(12/TIMESERIES_TIME_PERIODS[freq]["annual_frequency"])
+
+    if stub in ("short_front", "long_front"):
+        anchor_date = end_date
+        months = _month_index(end_date) - np.arange(0, _month_index(end_date) - _month_index(start_date) + 1, month_step)[::-1]
+    else:
+        anchor_date = start_date
+        months = np.arange(_month_index(start_date), _month_index(end_date) + 1, month_step)
+
+    anchor_day = int(_day_of_month(anchor_date))
+    if end_of_month and _dates_from_month_index(_month_index(anchor_date), 31) == anchor_date:
+        anchor_day = 31
+    elif freq == "A" and stub is None and anchor_day == 29 and _month_index(anchor_date) % 12 == 1:
+        # Annual dates are rolled from the previous date, so a 29 February anchor sticks at the 28th.
+        anchor_day = 28
+    dates = _dates_from_month_index(months, anchor_day)
+    dates[months == _month_index(anchor_date)] = anchor_date
+
+    if stub is None:
+        if freq == "A":
+            dates = dates[dates <= end_date]
+    elif stub in ("short_back", "long_back"):
+        has_stub = not np.any(dates == end_date)
+        dates = dates[dates < end_date]
+        if stub == "long_back" and has_stub and dates.size > 1:
+            dates = dates[:-1]
+        dates = np.append(dates, end_date)
+    else:
+        has_stub = not np.any(dates == start_date)
+        dates = dates[dates > start_date]
+        if stub == "long_front" and has_stub and dates.size > 1:
+            dates = dates[1:]
+        dates = np.insert(dates, 0, start_date)
+
+    schedule = dates[1:] if arrears else dates[:-1]
+    schedule.flags.writeable = False
+
+    return schedule
 
-def _n_monthly_range(
-    start_date: datetime.datetime,
-    end_date: datetime.datetime,
-    freq: TIMESERIES_TIME_PERIODS.keys()
-) -> List:
-    assert freq in TIMESERIES_TIME_PERIODS.keys(), f"'{freq}' is not in {TIMESERIES_TIME_PERIODS.keys}"
-    assert start_date <= end_date, f"'{start_date}' is after {end_date}"
+def _default_date(
+    date: str
+) -> datetime.datetime:
+    assert isinstance(date, str), f"'{date}' is not of type string."
 
-    monthly_range = _monthly_range(start_date, end_date)
-    n_monthly_range = _get_n_monthly(monthly_range, freq)
+    return _parse_date(date)
 
-    return n_monthly_range
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date(
+    date: str
+) -> datetime.datetime:
+    """Parse a "YYYY-MM-DD" string, memoised: each distinct string is parsed once and later
+        calls return the same (immutable) datetime. The least recently used strings are
+        dropped beyond DATE_CACHE_SIZE, and lru_cache keeps the cache consistent across threads.
+    """
+    return datetime.datetime.strptime(date, "%Y-%m-%d")
 
-def _monthly_range(
-    start_date: datetime.datetime,
-    end_date: datetime.datetime,
-) -> pd.DatetimeIndex:
-    assert isinstance(start_date, datetime.datetime), f"start_date must be of type datetime.datetime"
-    assert isinstance(end_date, datetime.datetime), f"end_date must be of type datetime.datetime"
-    assert start_date <= end_date, f"start_date is after end_date"
-    
-    day_of_month = start_date.day
-    is_start_of_month = day_of_month == 1
+def date_cache_info() -> Dict[str, Optional[float]]:
+    """Statistics of the date parsing cache used by _default_date and to_day_number.
 
-    date_range_month_start = _generate_pd_date_range(
-        (start_date - pd.offsets.MonthBegin()) if not is_start_of_month else start_date,
-        end_date,
-        freq='MS'
-    )
+    Returns:
+        Dict[str, Optional[float]]: hits, misses, size (strings cached), max_size (None when
+            unbounded) and hit_rate (hits over calls).
+    """
+    info = _parse_date.cache_info()
+    calls = info.hits + info.misses
+
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        "hit_rate": info.hits / calls if calls else 0.0
+    }
+
+def clear_date_cache() -> None:
+    """Empty the date parsing cache and reset its statistics."""
+    _parse_date.cache_clear()
+
+def parse_dates(
+    dates: Union[List[str], np.ndarray]
+) -> np.ndarray:
+    """Parse "YYYY-MM-DD" strings in bulk, each distinct string once.
 
-    return_index = date_range_month_start if day_of_month == 1 else _mid_month_adj(start_date, date_range_month_start)
+    Args:
+        dates (Union[List[str], np.ndarray]): Date strings (any shape). datetime64 arrays are
+            returned as datetime64[D].
 
-    return return_index
+    Returns:
+        np.ndarray: datetime64[D] dates with the shape of dates.
+    """
+    dates = np.asarray(dates)
+    if np.issubdtype(dates.dtype, np.datetime64):
+        return dates.astype("datetime64[D]")
 
-def _generate_pd_date_range(
-    start_date: datetime.datetime,
-    end_date: datetime.datetime,
-    freq: str,
-    inclusive: str="both"
-) -> pd.DatetimeIndex:
-    return_index = pd.date_range(
-        start_date,
-        end_date,
-        freq=freq,
-        inclusive=inclusive
-    )
-
-    return return_index
-
-def _mid_month_adj(
-    start_date: datetime.datetime,
-    date_range: pd.DatetimeIndex
-) -> pd.DatetimeIndex:
-    assert isinstance(date_range, pd.DatetimeIndex), f"'{date_range}' is not of type pd.DatetimeIndex."
-    assert isinstance(start_date, datetime.datetime), f"'{start_date}' is not of type datetime.datetime."
-    
-    day_offset: int = pd.Timestamp(start_date).day - 1
-    offset: pd.offsets.Day = pd.offsets.Day(day_offset)
-    date_range_day_adjusted: pd.Series = (date_range + offset).to_series()
-    date_range_day_adjusted.loc[date_range_day_adjusted.dt.month > date_range.month] -= pd.offsets.MonthEnd(1)
+    distinct_dates, inverse = np.unique(dates.astype(str), return_inverse=True)
 
-    return pd.DatetimeIndex(date_range_day_adjusted)
+    return distinct_dates.astype("datetime64[D]")[inverse.reshape(-1)].reshape(dates.shape)
 
-def _get_n_monthly(
-    date_list: List[datetime.datetime],
-    freq: TIMESERIES_TIME_PERIODS.keys()
-) -> List[datetime.datetime]:
-    assert len(date_list) != 0, f"'{date_list}' is empty."
-    assert all(isinstance(date, (datetime.datetime)) for date in date_list), f"{date_list} elements must be of type datetime.datetime."
-    assert freq in TIMESERIES_TIME_PERIODS.keys(), f"{freq} is not in {TIMESERIES_TIME_PERIODS.keys()}"
+def to_day_number(
+    date: Union[str, datetime.date, np.datetime64, int]
+) -> int:
+    """Day number of a date: days since 1970-01-01, the int64 value of datetime64[D], so day
+        numbers compare and subtract as dates. Times of day are ignored.
 
-    date_interval = int(12/TIMESERIES_TIME_PERIODS[freq]["annual_frequency"])
+    Args:
+        date (Union[str, datetime.date, np.datetime64, int]): "YYYY-MM-DD" string (month and day
+            may be unpadded, see _default_date), date, datetime, datetime64 or day number
+            (returned as is).
 
-    filtered_list = date_list[0::date_interval]
+    Returns:
+        int: Day number.
+    """
+    if isinstance(date, str):
+        return _parse_date(date).toordinal() - _EPOCH_ORDINAL
+    elif isinstance(date, (int, np.integer)):
+        return int(date)
+    elif isinstance(date, datetime.date):
+        return date.toordinal() - _EPOCH_ORDINAL
 
-    return filtered_list
+    return int(np.datetime64(date, "D").astype(np.int64))
 
-def _default_date(
-    date: str
+def from_day_number(
+    day_number: int
 ) -> datetime.datetime:
-    assert isinstance(date, str), f"'{date}' is not of type string."
+    """Midnight datetime of a day number (see to_day_number)."""
+    return datetime.datetime.fromordinal(int(day_number) + _EPOCH_ORDINAL)
+
+def _day_number_on_or_after(
+    date: Union[str, datetime.date, np.datetime64, int]
+) -> int:
+    """First day number whose midnight is on or after date, so that day_number >= result
+        is the datetime comparison midnight >= date."""
+    day_number = to_day_number(date)
+    if isinstance(date, datetime.datetime) and date.time() != datetime.time():
+        return day_number + 1
+
+    return day_number
+
+def to_typed_dates(
+    index: Any
+) -> Any:
+    """Copy of a nested index (dictionaries and lists) of holdings, prices or cashflows with
+        its dates as day numbers (see to_day_number): "YYYY-MM-DD" string keys and the values
+        of TYPED_DATE_FIELDS. The portfolio and pricing functions take typed indices in place of
+        string dated ones, comparing day numbers rather than parsing dates.
 
-    return datetime.datetime.strptime(date, "%Y-%m-%d")
+    Args:
+        index (Any): Holdings, price history or cashflow index.
+
+    Returns:
+        Any: The index with day number dates.
+    """
+    if isinstance(index, list):
+        return [to_typed_dates(item) for item in index]
+    if not isinstance(index, dict):
+        return index
+
+    typed_index = {}
+    for key, value in index.items():
+        if _is_iso_date(key):
+            key = to_day_number(key)
+        if key in TYPED_DATE_FIELDS and isinstance(value, (str, datetime.date, np.datetime64)):
+            typed_index[key] = to_day_number(value)
+        else:
+            typed_index[key] = to_typed_dates(value)
+
+    return typed_index
+
+def _is_iso_date(
+    key: Any
+) -> bool:
+    return isinstance(key, str) and len(key) == 10 and key[4] == "-" and key[7] == "-" and key[:4].isdigit()
+
+def _month_index(
+    dates: Union[np.datetime64, np.ndarray]
+) -> np.ndarray:
+    """Months elapsed since 1970-01 for each date in a datetime64 array."""
+    return dates.astype("datetime64[M]").astype(np.int64)
+
+def _day_of_month(
+    dates: Union[np.datetime64, np.ndarray]
+) -> np.ndarray:
+    """Day of month (1-31) for each date in a datetime64 array."""
+    dates = dates.astype("datetime64[D]")
+    return (dates - dates.astype("datetime64[M]").astype("datetime64[D]")).astype(np.int64) + 1
+
+def _dates_from_month_index(
+    month_index: np.ndarray,
+    day: Union[int, np.ndarray]
+) -> np.ndarray:
+    """Dates in the given months (since 1970-01) on the given day of month, with 
+        the day clipped to the last day of shorter months.
+    """
+    month_start = np.asarray(month_index, dtype=np.int64).astype("datetime64[M]")
+    first_day = month_start.astype("datetime64[D]")
+    days_in_month = ((month_start + 1).astype("datetime64[D]") - first_day).astype(np.int64)
+    
+    return first_day + (np.minimum(day, days_in_month) - 1)
@@ -0,0 +1,223 @@
+import datetime
+from typing import Any, Optional, Tuple, Union
+
+import numpy as np
+
+from src.analytics.utils.lookup import DAY_COUNT_CONVENTIONS
+
+THIRTY_360_CONVENTIONS = [
+    "30/360",
+    "30/360 US",
+    "30E/360",
+    "30E/360 ISDA"
+]
+
+DateInput = Union[datetime.date, datetime.datetime, np.datetime64, np.ndarray]
+
+
+def _civil_from_days(
+    days: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Year, month (1-12) and day of month (1-31) of days since 1970-01-01, in integer
+    arithmetic (equivalent to converting through datetime64[M] and datetime64[Y]).
+    """
+    z = days + 719468
+    era = np.floor_divide(z, 146097)
+    day_of_era = z - era * 146097
+    year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096) // 365
+    day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+    shifted_month = (5 * day_of_year + 2) // 153
+    day = day_of_year - (153 * shifted_month + 2) // 5 + 1
+    month = np.where(shifted_month < 10, shifted_month + 3, shifted_month - 9)
+    year = year_of_era + era * 400 + (month <= 2)
+    return year, month, day
+
+def _days_to_year_start(
+    year: np.ndarray
+) -> np.ndarray:
+    """Days since 1970-01-01 of 1 January of each year (inverse of _civil_from_days)."""
+    previous_year = year - 1
+    era = np.floor_divide(previous_year, 400)
+    year_of_era = previous_year - era * 400
+    day_of_era = 365 * year_of_era + year_of_era // 4 - year_of_era // 100 + 306
+    return era * 146097 + day_of_era - 719468
+
+def _is_leap_year(
+    year: np.ndarray
+) -> np.ndarray:
+    return (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+
+def _calendar_arithmetic(
+    days: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    year, month, day = _civil_from_days(days)
+    is_leap_year = _is_leap_year(year)
+    month_serial = 360 * year + 30 * month
+    is_february_end = (month == 2) & (day == np.where(is_leap_year, 29, 28))
+    act_act_position = (year - 1970) + (days - _days_to_year_start(year)) / np.where(is_leap_year, 366, 365)
+    return month_serial, day, is_february_end, act_act_position
+
+def _calendar(
+    days: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Calendar fields of days since 1970-01-01 used by the day count conventions:
+        - 360 x year + 30 x month, the 30/360 count of the start of the month.
+        - Day of month (1-31).
+        - Whether the day is the last day of February.
+        - Years since 1970-01-01 counting each calendar year in its own days (ACT/ACT ISDA).
+
+    Large arrays usually span fewer distinct days than they hold, so the calendar of the
+    span is computed once and looked up.
+    """
+    if days.size > 1:
+        first_day, last_day = days.min(), days.max()
+        if last_day - first_day < days.size:
+            month_serial, day, is_february_end, act_act_position = _calendar_arithmetic(np.arange(first_day, last_day + 1))
+            index = days - first_day
+            return month_serial[index], day[index], is_february_end[index], act_act_position[index]
+    return _calendar_arithmetic(days)
+
+def _as_days(
+    dates: DateInput
+) -> np.ndarray:
+    """Days since 1970-01-01 (int64) of date(s), ignoring any time of day."""
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+
+def _thirty_360_days(
+    start_days: np.ndarray,
+    end_days: np.ndarray,
+    day_count: str,
+    maturity_days: Optional[np.ndarray]
+) -> np.ndarray:
+    start_month_serial, start_day, start_is_february_end, _ = _calendar(start_days)
+    end_month_serial, end_day, end_is_february_end, _ = _calendar(end_days)
+
+    if day_count == "30/360":
+        start_day = np.minimum(start_day, 30)
+        end_day = np.where((start_day == 30) & (end_day == 31), 30, end_day)
+    elif day_count == "30/360 US":
+        end_day = np.where(start_is_february_end & end_is_february_end, 30, end_day)
+        start_day = np.where(start_is_february_end, 30, start_day)
+        end_day = np.where((end_day == 31) & (start_day >= 30), 30, end_day)
+        start_day = np.minimum(start_day, 30)
+    elif day_count == "30E/360":
+        start_day = np.minimum(start_day, 30)
+        end_day = np.minimum(end_day, 30)
+    else:
+        start_day = np.where(start_is_february_end, 30, np.minimum(start_day, 30))
+        if maturity_days is not None:
+            end_is_february_end = end_is_february_end & (end_days != maturity_days)
+        end_day = np.where(end_is_february_end, 30, np.minimum(end_day, 30))
+
+    return (end_month_serial - start_month_serial) + (end_day - start_day)
+
+def day_counts(
+    start_date: DateInput,
+    end_date: DateInput,
+    day_count: str = "ACT/365F",
+    maturity_date: Optional[DateInput] = None
+) -> np.ndarray:
+    """Days between dates as counted by a day count convention, vectorised over datetime64
+        arrays (start and end dates broadcast against each other). Actual days for the ACT
+        conventions, 30 day months for the 30/360 conventions. Times of day are ignored.
+
+    Args:
+        start_date (DateInput): The starting date(s).
+        end_date (DateInput): The ending date(s).
+        day_count (str, optional): One of DAY_COUNT_CONVENTIONS. Defaults to "ACT/365F".
+        maturity_date (Optional[DateInput], optional): Maturity date(s), for "30E/360 ISDA"
+            where an end date on the last day of February is kept if it is the maturity date.
+
+    Returns:
+        np.ndarray: Day counts (int64), negative where end_date precedes start_date.
+    """
+    assert day_count in DAY_COUNT_CONVENTIONS, f"Day count must be in {DAY_COUNT_CONVENTIONS}"
+    start_days = _as_days(start_date)
+    end_days = _as_days(end_date)
+
+    if day_count in THIRTY_360_CONVENTIONS:
+        maturity_days = _as_days(maturity_date) if maturity_date is not None else None
+        return _thirty_360_days(start_days, end_days, day_count, maturity_days)
+
+    return end_days - start_days
+
+def year_fractions(
+    start_date: DateInput,
+    end_date: DateInput,
+    day_count: str = "ACT/365F",
+    period_start: Optional[DateInput] = None,
+    period_end: Optional[DateInput] = None,
+    frequency: Optional[Union[int, np.ndarray]] = None,
+    maturity_date: Optional[DateInput] = None
+) -> np.ndarray:
+    """Year fractions between dates under a day count convention, vectorised over datetime64
+        arrays (all date arguments broadcast against each other). Times of day are ignored.
+
+        - ACT/365F, ACT/360: actual days over 365 or 360.
+        - ACT/ACT (ISDA): days falling in leap years over 366, the others over 365.
+        - ACT/ACT ICMA: actual days over (frequency x days in the coupon period from
+          period_start to period_end), so a full coupon period is 1/frequency.
+        - 30/360 (bond basis), 30/360 US (with the end of February rule), 30E/360 (Eurobond)
+          and 30E/360 ISDA: 30/360 day counts (see day_counts) over 360.
+
+    Args:
+        start_date (DateInput): The starting date(s).
+        end_date (DateInput): The ending date(s).
+        day_count (str, optional): One of DAY_COUNT_CONVENTIONS. Defaults to "ACT/365F".
+        period_start (Optional[DateInput], optional): Coupon period start(s), for ACT/ACT ICMA.
+        period_end (Optional[DateInput], optional): Coupon period end(s), for ACT/ACT ICMA.
+        frequency (Optional[Union[int, np.ndarray]], optional): Coupons per year, for ACT/ACT ICMA.
+        maturity_date (Optional[DateInput], optional): Maturity date(s), for 30E/360 ISDA.
+
+    Returns:
+        np.ndarray: Year fractions, negative where end_date precedes start_date.
+    """
+    assert day_count in DAY_COUNT_CONVENTIONS, f"Day count must be in {DAY_COUNT_CONVENTIONS}"
+
+    if day_count == "ACT/ACT":
+        return _calendar(_as_days(end_date))[3] - _calendar(_as_days(start_date))[3]
+
+    if day_count == "ACT/ACT ICMA":
+        assert period_start is not None and period_end is not None and frequency is not None, \
+            "ACT/ACT ICMA needs the coupon period (period_start, period_end) and frequency."
+        period_days = _as_days(period_end) - _as_days(period_start)
+        return (_as_days(end_date) - _as_days(start_date)) / (frequency * period_days)
+
+    days = day_counts(start_date, end_date, day_count, maturity_date)
+    if day_count == "ACT/365F":
+        return days / 365
+
+    return days / 360
+
+def tenor_day_count(
+    day_count: str
+) -> str:
+    """Convention for tenors measured between a pair of dates. ACT/ACT ICMA needs a coupon
+        period, which a date pair does not carry, so such tenors fall back to ACT/ACT (ISDA).
+
+    Args:
+        day_count (str): One of DAY_COUNT_CONVENTIONS.
+
+    Returns:
+        str: day_count, or "ACT/ACT" for "ACT/ACT ICMA".
+    """
+    return "ACT/ACT" if day_count == "ACT/ACT ICMA" else day_count
+
+def year_fraction(
+    start_date: DateInput,
+    end_date: DateInput,
+    day_count: str = "ACT/365F",
+    **kwargs: Any
+) -> float:
+    """year_fractions for a single pair of dates.
+
+    Args:
+        start_date (DateInput): The starting date.
+        end_date (DateInput): The ending date.
+        day_count (str, optional): One of DAY_COUNT_CONVENTIONS. Defaults to "ACT/365F".
+        **kwargs: period_start, period_end, frequency and maturity_date as for year_fractions.
+
+    Returns:
+        float: Year fraction.
+    """
+    return float(year_fractions(start_date, end_date, day_count, **kwargs))
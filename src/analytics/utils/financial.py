@@ -1,17 +1,20 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple, Union
 import datetime
 
+import numpy as np
+
 from src.analytics.utils.cashflow import match_cashflow_to_discount_curve
 from src.analytics.utils.cashflow import sum_cashflows
 from src.analytics.utils.lookup import TIMESERIES_TIME_PERIODS
 
-from .date_time import years_between_dates
+from .date_time import years_between_dates, years_between_date_arrays
 
 
 def present_value_of_cashflows(
     pricing_date: datetime.date, 
     cashflows: List[Dict],
-    discount_curve: List[Dict]
+    discount_curve: List[Dict],
+    day_count: Optional[str]=None
 ) -> float:
     """Calculate the present value of future cashflows that are discounted
         at distinct discount (interest) rates.
@@ -20,6 +23,8 @@ def present_value_of_cashflows(
         pricing_date (datetime.date): Date to which cashflows are discounted.
         cashflows (List[Dict]): Cashflows between pricing and final cashflow.
         discount_curve (List[Dict]): Curve of discount rates.
+        day_count (Optional[str], optional): Day count convention for the years to each cashflow
+            (see day_count.year_fractions), or None for days/365. Defaults to None.
 
     Returns:
         float: present value.
@@ -34,17 +39,66 @@ def present_value_of_cashflows(
             cashflow_and_discount["date"],
             cashflow_and_discount["cashflow_value"],
             cashflow_and_discount["discount_rate"],
+            day_count
         )
 
         present_value_result += result
 
     return present_value_result
 
+def discount_factors(
+    pricing_date: datetime.date,
+    cashflow_dates: np.ndarray,
+    discount_rates: Union[float, np.ndarray],
+    day_count: Optional[str]=None
+) -> np.ndarray:
+    """Annually compounded discount factors for an array of cashflow dates, as
+        used by present_value.
+
+    Args:
+        pricing_date (datetime.date): Date to which cashflows are discounted.
+        cashflow_dates (np.ndarray): Cashflow dates (dates,).
+        discount_rates (Union[float, np.ndarray]): Discount rates (dates,) or (scenarios x dates).
+        day_count (Optional[str], optional): Day count convention for the years to each cashflow
+            (see day_count.year_fractions), or None for days/365. Defaults to None.
+
+    Returns:
+        np.ndarray: Discount factors with the shape of discount_rates.
+    """
+    number_of_years = years_between_date_arrays(pricing_date, cashflow_dates, day_count=day_count)
+
+    return (1 + np.asarray(discount_rates, dtype=np.float64)) ** (-number_of_years)
+
+def present_value_of_cashflow_matrix(
+    cashflow_matrix: np.ndarray,
+    discount_factors: np.ndarray
+) -> np.ndarray:
+    """Calculate the present values of many securities' cashflows under one or
+        many discount curves in a single matrix product.
+
+    Columns of cashflow_matrix and discount_factors refer to the same cashflow dates
+    (see CashflowSchedule.to_matrix and discount_factors).
+
+    Args:
+        cashflow_matrix (np.ndarray): Cashflows (securities x dates).
+        discount_factors (np.ndarray): Discount factors (dates,) or (scenarios x dates).
+
+    Returns:
+        np.ndarray: Present values (securities,) or (scenarios x securities).
+    """
+    cashflow_matrix = np.asarray(cashflow_matrix, dtype=np.float64)
+    discount_factors = np.asarray(discount_factors, dtype=np.float64)
+    assert cashflow_matrix.ndim == 2, "cashflow_matrix must be two dimensional (securities x dates)."
+    assert discount_factors.shape[-1] == cashflow_matrix.shape[1], "discount_factors and cashflow_matrix must have the same number of dates."
+
+    return discount_factors @ cashflow_matrix.T
+
 def present_value(
     pricing_date: datetime.date,
     cashflow_date: datetime.date,
     future_value: float,
     discount_rate: float,
+    day_count: Optional[str]=None
 ) -> float:
     """Calculate the present value of a cashflow compounded annually at a defined
         discount (interest) rate.
@@ -54,11 +108,13 @@ def present_value(
         cashflow_date (datetime.date): Date of cashflow.
         future_value (float): Future value of cashflow.
         discount_rate (float): Interest rate used to discount.
+        day_count (Optional[str], optional): Day count convention for the years to each cashflow
+            (see day_count.year_fractions), or None for days/365. Defaults to None.
 
     Returns:
         float: _description_
     """
-    number_of_years = years_between_dates(pricing_date, cashflow_date)
+    number_of_years = years_between_dates(pricing_date, cashflow_date, day_count=day_count)
 
     return (future_value) / ((1 + discount_rate) ** (number_of_years))
 
@@ -67,6 +123,7 @@ def future_value(
     cashflow_date: datetime.date,
     present_value: float,
     discount_rate: float,
+    day_count: Optional[str]=None
 ) -> float:
     """Calculate the future value of a cashflow compounded annually at a defined
         discount (interest) rate.
@@ -76,11 +133,13 @@ def future_value(
         cashflow_date (datetime.date): Date of the future cashflow.
         present_value (float): Value at pricing_date.
         discount_rate (float): Interest rate.
+        day_count (Optional[str], optional): Day count convention for the years to each cashflow
+            (see day_count.year_fractions), or None for days/365. Defaults to None.
 
     Returns:
         float: _description_
     """
-    number_of_years = years_between_dates(pricing_date, cashflow_date)
+    number_of_years = years_between_dates(pricing_date, cashflow_date, day_count=day_count)
 
     result = present_value * ((1 + discount_rate) ** number_of_years)
 
@@ -89,7 +148,8 @@ def future_value(
 def discount_rate_of_cashflows(
     pricing_date: datetime.datetime,
     cashflows: List[Dict],
-    present_value: float
+    present_value: float,
+    day_count: Optional[str]=None
 ) -> float:
     """Calculate interest rate (discount rate) that discounts sum of cashflows
         (future value) to present value.
@@ -98,6 +158,8 @@ def discount_rate_of_cashflows(
         pricing_date (datetime.delta): Date to which cashflows are discounted.
         cashflows (List[Dict]): Cashflows between pricing and final cashflow.
         present_value (float): Present value (usually price/pricing value).
+        day_count (Optional[str], optional): Day count convention for the years to each cashflow
+            (see day_count.year_fractions), or None for days/365. Defaults to None.
 
     Returns:
         float: discount rate.
@@ -111,16 +173,141 @@ def discount_rate_of_cashflows(
         pricing_date, 
         final_cashflow_date,
         present_value,
-        future_value
+        future_value,
+        day_count
     )
 
     return discount_interest_rate
 
+def yield_of_cashflows(
+    pricing_date: datetime.datetime,
+    cashflows: List[Dict],
+    present_value: float,
+    guess: Optional[float]=None,
+    day_count: Optional[str]=None
+) -> float:
+    """Calculate the annually compounded yield (internal rate of return) that 
+        discounts each cashflow at its own date to present value.
+
+    Unlike discount_rate_of_cashflows the cashflows are not summed to the final
+    date. See yields_of_cashflow_matrix for the solver.
+
+    Args:
+        pricing_date (datetime.datetime): Date to which cashflows are discounted.
+        cashflows (List[Dict]): Cashflows between pricing and final cashflow.
+        present_value (float): Present value (usually price/pricing value).
+        guess (Optional[float], optional): Starting yield, e.g. the previous day's yield.
+        day_count (Optional[str], optional): Day count convention for the years to each cashflow
+            (see day_count.year_fractions), or None for days/365. Defaults to None.
+
+    Returns:
+        float: Yield.
+    """
+    assert len(cashflows) > 0, "cashflows must not be empty."
+
+    cashflow_dates = np.array([cashflow['date'] for cashflow in cashflows], dtype="datetime64[us]")
+    cashflow_values = np.array([[cashflow['cashflow_value'] for cashflow in cashflows]], dtype=np.float64)
+
+    return float(yields_of_cashflow_matrix(
+        pricing_date, cashflow_dates, cashflow_values, present_value, guess, day_count=day_count
+    )[0])
+
+def yields_of_cashflow_matrix(
+    pricing_date: datetime.datetime,
+    cashflow_dates: np.ndarray,
+    cashflow_matrix: np.ndarray,
+    present_values: Union[float, np.ndarray],
+    guess: Optional[Union[float, np.ndarray]]=None,
+    tolerance: float=1e-12,
+    max_iterations: int=100,
+    day_count: Optional[str]=None
+) -> np.ndarray:
+    """Solve the annually compounded yields of many securities at once.
+
+    Newton's method with the analytic derivative of the price, safeguarded by a 
+    bracket on the yield: steps that leave the bracket fall back to bisection. 
+    Converges in a handful of iterations from a warm start (guess).
+
+    Args:
+        pricing_date (datetime.datetime): Date to which cashflows are discounted.
+        cashflow_dates (np.ndarray): Cashflow dates (dates,).
+        cashflow_matrix (np.ndarray): Cashflows (securities x dates).
+        present_values (Union[float, np.ndarray]): Present values (securities,).
+        guess (Optional[Union[float, np.ndarray]], optional): Starting yields (securities,).
+        tolerance (float, optional): Convergence tolerance on the yield. Defaults to 1e-12.
+        max_iterations (int, optional): Maximum number of iterations. Defaults to 100.
+        day_count (Optional[str], optional): Day count convention for the years to each cashflow
+            (see day_count.year_fractions), or None for days/365. Defaults to None.
+
+    Returns:
+        np.ndarray: Yields (securities,), nan where no yield exists.
+    """
+    cashflow_matrix = np.asarray(cashflow_matrix, dtype=np.float64)
+    assert cashflow_matrix.ndim == 2, "cashflow_matrix must be two dimensional (securities x dates)."
+    number_of_securities = cashflow_matrix.shape[0]
+    present_values = np.broadcast_to(np.asarray(present_values, dtype=np.float64), (number_of_securities,))
+    number_of_years = np.maximum(years_between_date_arrays(pricing_date, cashflow_dates, day_count=day_count), 0.0)
+    assert number_of_years.shape == (cashflow_matrix.shape[1],), "cashflow_dates and cashflow_matrix must have the same number of dates."
+
+    def price_and_derivative(yields: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        discount = np.exp(-np.log1p(yields)[:, None] * number_of_years)
+        weighted = cashflow_matrix[rows] * discount
+        price = weighted.sum(axis=1)
+        derivative = -(weighted @ number_of_years) / (1 + yields)
+        return price - present_values[rows], derivative
+
+    if guess is None:
+        # Single payment at the cashflow weighted average time.
+        cashflow_sum = cashflow_matrix.sum(axis=1)
+        average_years = np.maximum((cashflow_matrix @ number_of_years) / np.where(cashflow_sum == 0, 1, cashflow_sum), 1/365)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            yields = (cashflow_sum / present_values) ** (1 / average_years) - 1
+    else:
+        yields = np.broadcast_to(np.asarray(guess, dtype=np.float64), (number_of_securities,)).copy()
+
+    lower = np.full(number_of_securities, -0.99)
+    upper = np.ones(number_of_securities)
+    all_rows = np.arange(number_of_securities)
+    for _ in range(64):
+        upper_error, _ = price_and_derivative(upper, all_rows)
+        below_upper = upper_error > 0
+        if not below_upper.any():
+            break
+        upper[below_upper] *= 2
+
+    lower_error, _ = price_and_derivative(lower, all_rows)
+    upper_error, _ = price_and_derivative(upper, all_rows)
+    has_root = (lower_error >= 0) & (upper_error <= 0)
+
+    yields = np.where(np.isfinite(yields) & (yields > lower) & (yields < upper), yields, (lower + upper) / 2)
+    active = np.flatnonzero(has_root)
+
+    for _ in range(max_iterations):
+        if active.size == 0:
+            break
+        error, derivative = price_and_derivative(yields[active], active)
+        lower[active] = np.where(error > 0, yields[active], lower[active])
+        upper[active] = np.where(error < 0, yields[active], upper[active])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton_yields = yields[active] - error / derivative
+        outside_bracket = ~np.isfinite(newton_yields) | (newton_yields <= lower[active]) | (newton_yields >= upper[active])
+        next_yields = np.where(outside_bracket, (lower[active] + upper[active]) / 2, newton_yields)
+
+        converged = (np.abs(next_yields - yields[active]) <= tolerance) | (error == 0)
+        yields[active] = next_yields
+        active = active[~converged]
+
+    yields[~has_root] = np.nan
+
+    return yields
+
 def discount_rate(
     pricing_date: datetime.date,
     cashflow_date: datetime.date,
     present_value: float,
-    future_value: float
+    future_value: float,
+    day_count: Optional[str]=None
 ) -> float:
     """Calculate interest rate (discount rate) that discounts a cashflow
         (future value) to present value.
@@ -130,11 +317,13 @@ def discount_rate(
         cashflow_date (datetime.date): Cashflows between pricing and final cashflow.
         present_value (float): Present value (usually price/pricing value).
         future_value (float): Sum of cashflow values.
+        day_count (Optional[str], optional): Day count convention for the years to each cashflow
+            (see day_count.year_fractions), or None for days/365. Defaults to None.
 
     Returns:
         float: discount rate.
     """
-    number_of_years = years_between_dates(pricing_date, cashflow_date)
+    number_of_years = years_between_dates(pricing_date, cashflow_date, day_count=day_count)
 
     result = ((future_value/present_value)**(1/number_of_years)) -1
 
@@ -200,4 +389,34 @@ def implied_forward_rate(
 
     implied_forward_rate = (((((1 + z_B)**(B))/((1 + z_A)**(A)))**(1.00/(B-A))) - 1) * annual_frequency
     
-    return implied_forward_rate
\ No newline at end of file
+    return implied_forward_rate
+
+def implied_forward_rates(
+    settlement_tenors: np.ndarray,
+    settlement_rates: np.ndarray,
+    workout_tenors: np.ndarray,
+    workout_rates: np.ndarray,
+    freq: str
+) -> np.ndarray:
+    """Vectorised implied_forward_rate over arrays of settlement and workout tenors.
+
+    Args:
+        settlement_tenors (np.ndarray): Settlement tenors in years.
+        settlement_rates (np.ndarray): Rates at the settlement tenors.
+        workout_tenors (np.ndarray): Workout tenors in years.
+        workout_rates (np.ndarray): Rates at the workout tenors.
+        freq (str): Compounding frequency of the rates, a key of TIMESERIES_TIME_PERIODS.
+
+    Returns:
+        np.ndarray: Implied forward rates between each settlement and workout tenor.
+    """
+    assert freq in TIMESERIES_TIME_PERIODS.keys(), f"{freq} is not in {TIMESERIES_TIME_PERIODS.keys()}"
+
+    annual_frequency = TIMESERIES_TIME_PERIODS[freq]["annual_frequency"]
+
+    A = np.asarray(settlement_tenors, dtype=np.float64) * annual_frequency
+    B = np.asarray(workout_tenors, dtype=np.float64) * annual_frequency
+    z_A = np.asarray(settlement_rates, dtype=np.float64) / annual_frequency
+    z_B = np.asarray(workout_rates, dtype=np.float64) / annual_frequency
+
+    return (((((1 + z_B)**(B))/((1 + z_A)**(A)))**(1.00/(B-A))) - 1) * annual_frequency
@@ -1,7 +1,11 @@
 import datetime
 import math
 from dateutil.relativedelta import relativedelta
-from typing import  Any, Dict, List
+from typing import  Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.analytics.utils.day_count import tenor_day_count, year_fractions
 
 def calculate_years_between_dates(
     start_date: datetime.datetime,
@@ -18,9 +22,68 @@ def calculate_years_between_dates(
     """
     return float(relativedelta(end_date, start_date).years)
 
+def calculate_years_between_date_arrays(
+    start_date: Union[datetime.datetime, np.ndarray],
+    end_date: Union[datetime.datetime, np.ndarray]
+) -> np.ndarray:
+    """Vectorised calculate_years_between_dates (whole years) over arrays of dates.
+
+    Args:
+        start_date (Union[datetime.datetime, np.ndarray]): The starting date(s).
+        end_date (Union[datetime.datetime, np.ndarray]): The ending date(s).
+
+    Returns:
+        np.ndarray: The number of whole years between the dates.
+    """
+    start_date = np.asarray(start_date, dtype="datetime64[us]")
+    end_date = np.asarray(end_date, dtype="datetime64[us]")
+
+    start_month = start_date.astype("datetime64[M]")
+    end_month = end_date.astype("datetime64[M]")
+    months = end_month.astype(np.int64) - start_month.astype(np.int64)
+
+    # start_date moved into end_date's month, with the day clipped to the month end as
+    # relativedelta does (2004-02-29 + 12 months is 2005-02-28).
+    days_in_end_month = (end_month + 1).astype("datetime64[D]") - end_month.astype("datetime64[D]")
+    start_day = start_date.astype("datetime64[D]") - start_month.astype("datetime64[D]")
+    start_time = start_date - start_date.astype("datetime64[D]")
+    start_into_month = np.minimum(start_day, days_in_end_month - np.timedelta64(1, "D")) + start_time
+    end_into_month = end_date - end_month.astype("datetime64[us]")
+    # Incomplete final month, counted towards zero as relativedelta does.
+    months = months - ((months > 0) & (end_into_month < start_into_month)) + ((months < 0) & (end_into_month > start_into_month))
+
+    return (np.sign(months) * (np.abs(months) // 12)).astype(np.float64)
+
+def convert_date_series_to_arrays(
+    series: List[Dict],
+    relative_date: datetime.datetime,
+    day_count: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Times in years from relative_date and rates of a series (list of dict) of dates and rates.
+
+    Args:
+        series (List[Dict]): List of dictionaries containing date and rate attributes.
+        relative_date (datetime.datetime): Relative start date.
+        day_count (Optional[str], optional): Day count convention for year_fractions, or None
+            for whole years (see calculate_years_between_dates). Defaults to None.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Times in years, rates.
+    """
+    dates = np.array([obj['date'] for obj in series], dtype="datetime64[us]")
+    rates = np.fromiter((obj['rate'] for obj in series), dtype=np.float64, count=len(series))
+
+    if day_count is None:
+        times = calculate_years_between_date_arrays(relative_date, dates)
+    else:
+        times = year_fractions(relative_date, dates, tenor_day_count(day_count))
+
+    return times, rates
+
 def convert_date_series_to_years(
     series: List[Dict],
-    relative_date: datetime.datetime
+    relative_date: datetime.datetime,
+    day_count: Optional[str] = None
 ) -> List[Dict]:
     """Convert the date attribute in a series (list of dict) to a 
         time attribute in years.
@@ -28,22 +91,16 @@ def convert_date_series_to_years(
     Args:
         series (List[Dict]): List of dictionaries containing date attribute.
         relative_date (datetime.datetime): Relative start date.
+        day_count (Optional[str], optional): Day count convention for year_fractions, or None
+            for whole years. Defaults to None.
 
     Returns:
         List[Dict]: List of dictionaries containing time attribute (in years).
     """
 
-    new_series = []
-
-    for obj in series:
-        new_series.append(
-            {
-                'time': calculate_years_between_dates(relative_date, obj['date']),
-                'rate': obj['rate']
-            }
-        )
+    times, rates = convert_date_series_to_arrays(series, relative_date, day_count)
 
-    return new_series
+    return [{'time': time, 'rate': rate} for time, rate in zip(times.tolist(), rates.tolist())]
 
 def convert_date_series_to_years_tenor(
     series: List[Dict],
@@ -1,3 +1,5 @@
+from typing import Literal, Union
+
 import pandas as pd
 from pandas.tseries.offsets import DateOffset
 from src.analytics.utils.regression.ns import NelsonSiegelCurve
@@ -42,8 +44,56 @@ CURVE_OPTIONS = [
     "NSS"
 ]
 
+CurveOption = Literal["NS", "NSS"]
+
+CALIBRATION_OPTIONS = [
+    "OLS",
+    "GRID",
+    "GRADIENT"
+]
+
+DAY_COUNT_CONVENTIONS = [
+    "ACT/365F",
+    "ACT/360",
+    "ACT/ACT",
+    "ACT/ACT ICMA",
+    "30/360",
+    "30/360 US",
+    "30E/360",
+    "30E/360 ISDA"
+]
+
+DAY_TYPE_OPTIONS = [
+    "calendar",
+    "business"
+]
+
+BUSINESS_DAY_CONVENTIONS = [
+    "following",
+    "preceding",
+    "modified_following",
+    "modified_preceding"
+]
+
+STUB_RULES = [
+    "short_front",
+    "long_front",
+    "short_back",
+    "long_back"
+]
+
+TYPED_DATE_FIELDS = [
+    "date",
+    "payment_date",
+    "record_date",
+    "ex_date",
+    "settlement_date"
+]
+
 CURVE_OPTIONS_OBJECTS = [
     NelsonSiegelCurve,
     NelsonSiegelSvenssonCurve
 ]
 
+CurveObject = Union[NelsonSiegelCurve, NelsonSiegelSvenssonCurve]
+
@@ -1,25 +1,70 @@
+import bisect
 import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
 import pandas as pd
 
 from src.analytics.utils.date_time import(
     days_between_dates,
-    _default_date
+    from_day_number,
+    to_day_number,
+    _day_number_on_or_after
 )
+from src.analytics.utils.day_count import day_counts
+
+def _days_between(
+    first_date: datetime.datetime,
+    second_date: datetime.datetime,
+    day_count: Optional[str]=None
+) -> float:
+    """Days between dates, counted by a day count convention (see day_count.day_counts) or
+        actual days when day_count is None."""
+    if day_count is None:
+        return float(days_between_dates(first_date, second_date))
+
+    return float(day_counts(first_date, second_date, day_count))
+
+def _days_between_arrays(
+    first_date: np.ndarray,
+    second_date: np.ndarray,
+    day_count: Optional[str]=None
+) -> np.ndarray:
+    """Vectorised _days_between."""
+    if day_count is None:
+        days = (np.asarray(second_date, dtype="datetime64[us]") - np.asarray(first_date, dtype="datetime64[us]")) // np.timedelta64(1, "D")
+        return days.astype(np.float64)
+
+    return day_counts(first_date, second_date, day_count).astype(np.float64)
 
 def get_accrued_interest(
     pricing_date: datetime.datetime,
     period_start: datetime.datetime,
     period_end: datetime.datetime,
     record_date: datetime.datetime,
-    coupon_payment_amount: float
+    coupon_payment_amount: float,
+    day_count: Optional[str]=None
 ) -> float:
+    """Accrued interest of a coupon period at pricing_date, negative once the security
+        trades ex coupon (after record_date).
+
+    Args:
+        pricing_date (datetime.datetime): Date of the accrued interest.
+        period_start (datetime.datetime): Start of the coupon period.
+        period_end (datetime.datetime): End of the coupon period.
+        record_date (datetime.datetime): Record date of the coupon.
+        coupon_payment_amount (float): Coupon paid for the period.
+        day_count (Optional[str], optional): Day count convention for counting days in the period
+            (see day_count.day_counts), or None for actual days. Defaults to None.
+
+    Returns:
+        float: Accrued interest.
+    """
     assert (period_start <= pricing_date <= period_end), "pricing_date must be >= period_start and <= period_end."
     assert (period_start <= record_date <= period_end), "record_date must be >= period_start and <= period_end."
     
     
-    num_days_in_period = days_between_dates(period_start, period_end)
-    num_days_accrued = days_between_dates(period_start, pricing_date)
+    num_days_in_period = _days_between(period_start, period_end, day_count)
+    num_days_accrued = _days_between(period_start, pricing_date, day_count)
     
     daily_coupon_amount = coupon_payment_amount/num_days_in_period
     
@@ -32,7 +77,8 @@ def get_accrued_interest(
             period_start,
             period_end,
             record_date + datetime.timedelta(days=1),
-            coupon_payment_amount
+            coupon_payment_amount,
+            day_count
         )
     else:
         accrued_interest_amount = num_days_accrued * daily_coupon_amount
@@ -44,60 +90,114 @@ def get_negative_accrued_interest(
     coupon_period_start_date = datetime.datetime,
     coupon_period_end_date = datetime.datetime,
     ex_date = datetime.datetime,
-    coupon_payment_amount = float
+    coupon_payment_amount = float,
+    day_count: Optional[str]=None
 ) -> float:
-    num_days_in_coupon_period = days_between_dates(coupon_period_start_date, coupon_period_end_date) + 1
-    num_days_in_ex_period = days_between_dates(ex_date, coupon_period_end_date) + 1
+    num_days_in_coupon_period = _days_between(coupon_period_start_date, coupon_period_end_date, day_count) + 1
+    num_days_in_ex_period = _days_between(ex_date, coupon_period_end_date, day_count) + 1
     daily_accrual_amount = coupon_payment_amount / (num_days_in_coupon_period)
     total_negative_accrued = -1 * num_days_in_ex_period * daily_accrual_amount
-    num_days_passed_in_ex_period = days_between_dates(ex_date, pricing_date)
+    num_days_passed_in_ex_period = _days_between(ex_date, pricing_date, day_count)
     
     return total_negative_accrued + (daily_accrual_amount * num_days_passed_in_ex_period)
 
+def get_accrued_interest_array(
+    pricing_dates: np.ndarray,
+    period_starts: np.ndarray,
+    period_ends: np.ndarray,
+    record_dates: np.ndarray,
+    coupon_payment_amounts: Union[float, np.ndarray],
+    day_count: Optional[str]=None
+) -> np.ndarray:
+    """Vectorised get_accrued_interest over arrays of pricing dates and coupon periods
+        (arguments broadcast against each other).
+
+    Args:
+        pricing_dates (np.ndarray): Dates of the accrued interest.
+        period_starts (np.ndarray): Starts of the coupon periods.
+        period_ends (np.ndarray): Ends of the coupon periods.
+        record_dates (np.ndarray): Record dates of the coupons.
+        coupon_payment_amounts (Union[float, np.ndarray]): Coupons paid for the periods.
+        day_count (Optional[str], optional): Day count convention for counting days in the periods
+            (see day_count.day_counts), or None for actual days. Defaults to None.
+
+    Returns:
+        np.ndarray: Accrued interest, negative where the security trades ex coupon.
+    """
+    pricing_dates = np.asarray(pricing_dates, dtype="datetime64[us]")
+    period_starts = np.asarray(period_starts, dtype="datetime64[us]")
+    period_ends = np.asarray(period_ends, dtype="datetime64[us]")
+    record_dates = np.asarray(record_dates, dtype="datetime64[us]")
+    coupon_payment_amounts = np.asarray(coupon_payment_amounts, dtype=np.float64)
+    assert np.all((period_starts <= pricing_dates) & (pricing_dates <= period_ends)), "pricing_date must be >= period_start and <= period_end."
+    assert np.all((period_starts <= record_dates) & (record_dates <= period_ends)), "record_date must be >= period_start and <= period_end."
+
+    num_days_in_period = _days_between_arrays(period_starts, period_ends, day_count)
+    num_days_accrued = _days_between_arrays(period_starts, pricing_dates, day_count)
+    accrued_interest = num_days_accrued * (coupon_payment_amounts / num_days_in_period)
+
+    # Ex coupon, as get_negative_accrued_interest.
+    ex_dates = record_dates + np.timedelta64(1, "D")
+    daily_accrual_amount = coupon_payment_amounts / (num_days_in_period + 1)
+    num_days_in_ex_period = _days_between_arrays(ex_dates, period_ends, day_count) + 1
+    num_days_passed_in_ex_period = _days_between_arrays(ex_dates, pricing_dates, day_count)
+    negative_accrued_interest = (num_days_passed_in_ex_period - num_days_in_ex_period) * daily_accrual_amount
+
+    return np.where(pricing_dates > record_dates, negative_accrued_interest, accrued_interest)
+
 def get_pricing_history(
-    issue_date: datetime.datetime,
+    issue_date: Union[str, int],
     dirty_price_history: List[Dict],
-    security_cashflow_input: List[Dict]
+    security_cashflow_input: List[Dict],
+    day_count: Optional[str]=None
 ) -> List[Dict]:
+    """Clean prices with accrued interest over a price history.
+
+    Dates are "YYYY-MM-DD" strings (price dates datetimes), or day numbers for typed inputs (see
+    date_time.to_typed_dates), in which case the history is dated by day number.
+
+    Args:
+        issue_date (Union[str, int]): Start of the first coupon period.
+        dirty_price_history (List[Dict]): Prices ("date", "price") in date order.
+        security_cashflow_input (List[Dict]): Cashflows of the security (see cashflow.generate_cashflows).
+        day_count (Optional[str], optional): Day count convention of the accrued interest (see
+            get_accrued_interest). Defaults to None.
+
+    Returns:
+        List[Dict]: Clean price, accrued interest and dirty price at each price date.
+    """
     assert len(dirty_price_history) > 0, "dirty_price_history input must not be empty."
     assert len(security_cashflow_input) > 0, "security_cashflow_input must not be empty."
     
-    start_of_first_period = issue_date
+    # Coupon periods run from the previous payment date to the day before the payment date.
+    payment_days = [to_day_number(cashflow['date']['payment_date']) for cashflow in security_cashflow_input]
+    period_starts = [to_day_number(issue_date)] + payment_days[:-1]
     
     pricing_history = []
     for price_dict in dirty_price_history:
         price_date = price_dict['date']
         price_value = price_dict['price']
+        price_day = to_day_number(price_date)
         
-        relevant_cashflow = None
-        for i in range(0, len(security_cashflow_input)):
-            if i == 0:
-                cashflow_start = _default_date(start_of_first_period)
-            else:
-                previous_cashflow_payment_date = security_cashflow_input[i-1]['date']['payment_date']
-                cashflow_start = _default_date(previous_cashflow_payment_date)
-            
-            cashflow_end = _default_date(security_cashflow_input[i]['date']['payment_date']) - datetime.timedelta(days=1)
-            
-            if cashflow_start <= price_date <= cashflow_end:
-                relevant_cashflow = security_cashflow_input[i]
-                break
-        
-        assert relevant_cashflow, f"Price date {price_dict} does not fall between {cashflow_start} and {cashflow_end}"
+        i = bisect.bisect_right(payment_days, price_day)
+        assert i < len(payment_days) and period_starts[i] <= price_day, \
+            f"Price date {price_dict} does not fall between {from_day_number(period_starts[0])} and {from_day_number(payment_days[-1] - 1)}"
+        relevant_cashflow = security_cashflow_input[i]
                 
-        cashflow_record_date = _default_date(relevant_cashflow['date']['record_date'])
+        cashflow_record_date = from_day_number(to_day_number(relevant_cashflow['date']['record_date']))
         cashflow_payment_amount = relevant_cashflow['cashflow']['coupon_interest']['total_coupon_interest']
         accrued_interest = get_accrued_interest(
-            price_date,
-            cashflow_start,
-            cashflow_end,
+            from_day_number(price_day) if isinstance(price_date, int) else price_date,
+            from_day_number(period_starts[i]),
+            from_day_number(payment_days[i] - 1),
             cashflow_record_date,
-            cashflow_payment_amount
+            cashflow_payment_amount,
+            day_count
         )
         
         pricing_history.append(
                 {
-                "date": pd.to_datetime(price_date).strftime("%Y-%m-%d"),
+                "date": price_date if isinstance(price_date, int) else pd.to_datetime(price_date).strftime("%Y-%m-%d"),
                 "clean_price": price_value,
                 "accrued_interest": accrued_interest,
                 "dirty_price": price_value + accrued_interest
@@ -114,17 +214,19 @@ def get_period_total_return(
 ) -> float:
     assert all([isinstance(date, datetime.datetime) for date in [start_date, end_date]]), f"{start_date} and {end_date} must be of type datetime."
 
+    first_record_day = _day_number_on_or_after(start_date)
+    start_day, end_day = to_day_number(start_date), to_day_number(end_date)
     cashflows_paid = [
         cashflow for cashflow
         in security_cashflows
-        if start_date <= _default_date(cashflow['date']['record_date']) <= end_date
+        if first_record_day <= to_day_number(cashflow['date']['record_date']) <= end_day
     ]
     cashflow_payment_sum = sum(cashflow['cashflow']['total'] for cashflow in cashflows_paid)
     
     relevant_price_dates = [
         price_dict for price_dict
         in price_history
-        if start_date.date() <= _default_date(price_dict['date']).date() <= end_date.date()
+        if start_day <= to_day_number(price_dict['date']) <= end_day
     ]
     
     assert len(relevant_price_dates) > 1, "price_history must be greater than a single day."
@@ -1,16 +1,22 @@
 '''Calibration methods for Nelson-Siegel(-Svensson) Models.
 See `calibrate_ns_ols` and `calibrate_nss_ols` for ordinary least squares
-(OLS) based methods.
+(OLS) based methods, and `calibrate_ns_ols_gradient` and
+`calibrate_nss_ols_gradient` for the same objectives minimized with
+analytic gradients. `calibrate_ns_ols_grid` and `calibrate_nss_ols_grid`
+search tau on a dense grid with one batched least squares solve and
+polish the best grid point, in a bounded and deterministic time.
 '''
 
-from typing import Tuple, Any
+import time
+from typing import Optional, Tuple, Any
 
 import numpy as np
 from numpy.linalg import lstsq
-from scipy.optimize import minimize
+from scipy.optimize import OptimizeResult, minimize
 
-from .ns import NelsonSiegelCurve
+from .ns import NelsonSiegelCurve, factor_tau_derivatives
 from .nss import NelsonSiegelSvenssonCurve
+from .panel import calibrate_ns_panel, calibrate_nss_panel
 
 
 def _assert_same_shape(t: np.ndarray, y: np.ndarray) -> None:
@@ -100,3 +106,161 @@ def calibrate_nss_ols(t: np.ndarray, y: np.ndarray,
     opt_res = minimize(errorfn_nss_ols, x0=tau0, args=(t, y))
     curve, lstsq_res = betas_nss_ols(opt_res.x, t, y)
     return curve, opt_res
+
+
+NS_TAU_BOUNDS = (0.01, 50.0)
+# Squared rate errors are tiny, so the default L-BFGS-B tolerances stop early.
+GRADIENT_OPTIONS = {'ftol': 1e-15, 'gtol': 1e-15}
+
+
+def errorfn_grad_ns_ols(tau: float, t: np.ndarray, y: np.ndarray) \
+        -> Tuple[float, np.ndarray]:
+    '''Sum of squares error function for a Nelson-Siegel model (see
+       `errorfn_ns_ols`) and its analytic gradient with respect to tau.
+       With the betas solved by least squares, the gradient is
+       -2 r' (dF/dtau) beta for residuals r and factor matrix F.
+    '''
+    _assert_same_shape(t, y)
+    tau = float(np.ravel(tau)[0])
+    factor1, factor2, dfactor1, dfactor2 = factor_tau_derivatives(tau, t)
+    factors = np.stack([np.ones(t.size), factor1, factor2], axis=1)
+    beta = lstsq(factors, y, rcond=None)[0]
+    residuals = y - factors @ beta
+    dfitted = dfactor1 * beta[1] + dfactor2 * beta[2]
+    return float(residuals @ residuals), np.array([-2 * residuals @ dfitted])
+
+
+def errorfn_grad_nss_ols(tau: Tuple[float, float], t: np.ndarray,
+                         y: np.ndarray) -> Tuple[float, np.ndarray]:
+    '''Sum of squares error function for a Nelson-Siegel-Svensson model
+       (see `errorfn_nss_ols`) and its analytic gradient with respect
+       to tau1 and tau2.
+    '''
+    _assert_same_shape(t, y)
+    factor1, factor2, dfactor1, dfactor2 = factor_tau_derivatives(tau[0], t)
+    _, factor3, _, dfactor3 = factor_tau_derivatives(tau[1], t)
+    factors = np.stack([np.ones(t.size), factor1, factor2, factor3], axis=1)
+    beta = lstsq(factors, y, rcond=None)[0]
+    residuals = y - factors @ beta
+    dfitted_tau1 = dfactor1 * beta[1] + dfactor2 * beta[2]
+    dfitted_tau2 = dfactor3 * beta[3]
+    gradient = np.array([-2 * residuals @ dfitted_tau1,
+                         -2 * residuals @ dfitted_tau2])
+    return float(residuals @ residuals), gradient
+
+
+def calibrate_ns_ols_gradient(t: np.ndarray, y: np.ndarray,
+                              tau0: float = 2.0,
+                              previous_curve: Optional[NelsonSiegelCurve] = None,
+                              bounds: Tuple[float, float] = NS_TAU_BOUNDS) \
+        -> Tuple[NelsonSiegelCurve, Any]:
+    '''Calibrate a Nelson-Siegel curve like `calibrate_ns_ols`, minimizing
+       over a bounded tau with the analytic gradient (L-BFGS-B). Starts
+       from previous_curve.tau when given (warm start), otherwise tau0.
+       The optimization result also carries the wall clock time taken
+       (elapsed_seconds) and the number of starts (starts).
+    '''
+    _assert_same_shape(t, y)
+    start_time = time.perf_counter()
+    tau_start = previous_curve.tau if previous_curve is not None else tau0
+    opt_res = minimize(errorfn_grad_ns_ols, x0=np.array([tau_start]),
+                       args=(t, y), jac=True, method='L-BFGS-B',
+                       bounds=[bounds], options=GRADIENT_OPTIONS)
+    curve, lstsq_res = betas_ns_ols(opt_res.x[0], t, y)
+    opt_res.starts = 1
+    opt_res.elapsed_seconds = time.perf_counter() - start_time
+    return curve, opt_res
+
+
+def calibrate_nss_ols_gradient(t: np.ndarray, y: np.ndarray,
+                               tau0: Tuple[float, float] = (2.0, 5.0),
+                               previous_curve: Optional[NelsonSiegelSvenssonCurve] = None,
+                               bounds: Tuple[float, float] = NS_TAU_BOUNDS,
+                               multi_start: int = 0) \
+        -> Tuple[NelsonSiegelSvenssonCurve, Any]:
+    '''Calibrate a Nelson-Siegel-Svensson curve like `calibrate_nss_ols`,
+       minimizing over bounded tau1 and tau2 with the analytic gradient
+       (L-BFGS-B). Starts from previous_curve's taus when given (warm
+       start), otherwise tau0. With multi_start > 0 the minimization is
+       repeated from up to multi_start additional starting points on a
+       log-spaced grid within the bounds, and the best fit is kept, to
+       improve the recovery of the true parameters. The optimization
+       result is that of the best start, with the total number of
+       iterations (nit_total), starts (starts) and wall clock time
+       (elapsed_seconds) of the calibration.
+    '''
+    _assert_same_shape(t, y)
+    start_time = time.perf_counter()
+    if previous_curve is not None:
+        tau0 = (previous_curve.tau1, previous_curve.tau2)
+    starts = [np.array(tau0, dtype=float)]
+    if multi_start > 0:
+        grid = np.geomspace(max(bounds[0], 0.1), min(bounds[1], 20.0), 4)
+        grid_starts = [np.array([tau1, tau2]) for tau1 in grid
+                       for tau2 in grid if tau1 < tau2]
+        starts += grid_starts[:multi_start]
+
+    opt_res = None
+    nit_total = 0
+    for tau_start in starts:
+        start_res = minimize(errorfn_grad_nss_ols, x0=tau_start,
+                             args=(t, y), jac=True, method='L-BFGS-B',
+                             bounds=[bounds, bounds],
+                             options=GRADIENT_OPTIONS)
+        nit_total += start_res.nit
+        if opt_res is None or start_res.fun < opt_res.fun:
+            opt_res = start_res
+    assert opt_res is not None
+    curve, lstsq_res = betas_nss_ols(opt_res.x, t, y)
+    opt_res.nit_total = nit_total
+    opt_res.starts = len(starts)
+    opt_res.elapsed_seconds = time.perf_counter() - start_time
+    return curve, opt_res
+
+
+NS_GRID_TAUS = np.geomspace(0.05, 30.0, 200)
+NSS_GRID_TAUS = np.geomspace(0.05, 30.0, 40)
+GRID_POLISH_ITERATIONS = 30
+
+
+def calibrate_ns_ols_grid(t: np.ndarray, y: np.ndarray,
+                          tau_grid: np.ndarray = NS_GRID_TAUS,
+                          iterations: int = GRID_POLISH_ITERATIONS) \
+        -> Tuple[NelsonSiegelCurve, Any]:
+    '''Calibrate a Nelson-Siegel curve to time-value pairs t and y
+       by solving the least squares betas for every tau of tau_grid in
+       one batched call, then polishing the best grid taus with at most
+       iterations Levenberg-Marquardt steps within the grid range (see
+       `calibrate_ns_panel`). The calibration always succeeds; the
+       optimization result carries the fitted tau (x), the sum of
+       squared errors (fun) and the wall clock time (elapsed_seconds).
+    '''
+    _assert_same_shape(t, y)
+    start_time = time.perf_counter()
+    panel = calibrate_ns_panel(t, y[None, :], tau_grid=tau_grid,
+                               iterations=iterations)
+    opt_res = OptimizeResult(x=panel.tau.copy(), fun=float(panel.sse[0]),
+                             success=True, status=0,
+                             message='Grid search with polishing')
+    opt_res.elapsed_seconds = time.perf_counter() - start_time
+    return panel.curve(0), opt_res
+
+
+def calibrate_nss_ols_grid(t: np.ndarray, y: np.ndarray,
+                           tau_grid: np.ndarray = NSS_GRID_TAUS,
+                           iterations: int = GRID_POLISH_ITERATIONS) \
+        -> Tuple[NelsonSiegelSvenssonCurve, Any]:
+    '''Calibrate a Nelson-Siegel-Svensson curve like
+       `calibrate_ns_ols_grid`, searching every pair tau1 < tau2 of
+       tau_grid in one batched call before polishing (see
+       `calibrate_nss_panel`).
+    '''
+    _assert_same_shape(t, y)
+    start_time = time.perf_counter()
+    panel = calibrate_nss_panel(t, y[None, :], tau_grid=tau_grid,
+                                iterations=iterations)
+    opt_res = OptimizeResult(x=np.array([panel.tau1[0], panel.tau2[0]]),
+                             fun=float(panel.sse[0]), success=True,
+                             status=0, message='Grid search with polishing')
+    opt_res.elapsed_seconds = time.perf_counter() - start_time
+    return panel.curve(0), opt_res
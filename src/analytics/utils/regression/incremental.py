@@ -0,0 +1,195 @@
+'''Incremental re-calibration of Nelson-Siegel(-Svensson) models.
+See `IncrementalCalibrator` for updating a calibrated curve when single
+market quotes change.
+'''
+
+from dataclasses import fields
+from typing import Dict, Hashable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .calibrate import calibrate_ns_ols_grid, calibrate_nss_ols_grid
+from .ns import NelsonSiegelCurve
+from .nss import NelsonSiegelSvenssonCurve
+
+INCREMENTAL_ITERATIONS = 10
+INCREMENTAL_TOLERANCE = 1e-8
+INCREMENTAL_TAU_BOUNDS = (0.05, 30.0)
+# Growth of the root mean squared error (in rate units, 0.025bp) after the
+# rank-one beta update beyond which the taus are re-fitted.
+INCREMENTAL_REFIT_THRESHOLD = 2.5e-6
+
+Curve = Union[NelsonSiegelCurve, NelsonSiegelSvenssonCurve]
+
+
+class IncrementalCalibrator:
+    '''Keeps a Nelson-Siegel ('NS') or Nelson-Siegel-Svensson ('NSS')
+       curve calibrated to quotes y at fixed times t while single
+       quotes change.
+
+       The curve is first calibrated from scratch (see
+       `calibrate_ns_ols_grid`). The factor matrix and its
+       pseudo-inverse at the current taus are kept, so a quote update
+       moves the betas by a rank-one correction. Only when that leaves
+       the root mean squared error more than refit_threshold above the
+       last fit do a few Levenberg-Marquardt steps on betas and taus,
+       warm started from the previous curve, re-fit the taus. Quotes are
+       addressed by position (`update`) or by the keys (e.g. curve
+       dates) given at construction (`update_key`).
+    '''
+
+    def __init__(self, t: np.ndarray, y: np.ndarray, curve_type: str = 'NS',
+                 keys: Optional[Sequence[Hashable]] = None,
+                 iterations: int = INCREMENTAL_ITERATIONS,
+                 tau_bounds: Tuple[float, float] = INCREMENTAL_TAU_BOUNDS,
+                 refit_threshold: float = INCREMENTAL_REFIT_THRESHOLD) -> None:
+        assert curve_type in ('NS', 'NSS'), "curve_type must be 'NS' or 'NSS'"
+        self.t = np.array(t, dtype=float)
+        self.y = np.array(y, dtype=float)
+        assert self.t.shape == self.y.shape, \
+            'Mismatching shapes of time and values'
+        self.curve_type = curve_type
+        self.iterations = iterations
+        self.tau_bounds = tau_bounds
+        self.refit_threshold = refit_threshold
+        self.keys = {key: index for index, key in enumerate(keys)} \
+            if keys is not None else None
+        self._positive = self.t > 0
+        self._t_safe = np.where(self._positive, self.t, 1.0)
+        self.recalibrate()
+
+    def recalibrate(self) -> Curve:
+        '''Calibrate from scratch to the current quotes. Updates only
+           follow the taus locally, so after many large moves a full
+           calibration may find a better fit in another region.
+        '''
+        curve: Curve
+        if self.curve_type == 'NS':
+            curve, _ = calibrate_ns_ols_grid(self.t, self.y)
+            self._taus = np.array([curve.tau])
+        else:
+            curve, _ = calibrate_nss_ols_grid(self.t, self.y)
+            self._taus = np.array([curve.tau1, curve.tau2])
+        self.curve = curve
+        self._factors, self._derivatives = self._evaluate(self._taus)
+        self._pseudo_inverse = np.linalg.pinv(self._factors)
+        self._betas = self._pseudo_inverse @ self.y
+        self._fit_rmse = self._rmse(self.y - self._factors @ self._betas)
+        return curve
+
+    def _rmse(self, residuals: np.ndarray) -> float:
+        return float(np.sqrt(residuals @ residuals / residuals.size))
+
+    def _loadings(self, tau: float) -> Tuple[np.ndarray, np.ndarray,
+                                             np.ndarray, np.ndarray]:
+        '''Slope and curvature loadings at tau and their derivatives
+           with respect to tau (see `factor_tau_derivatives`), for the
+           fixed times of the calibrator.
+        '''
+        x = self._t_safe / tau
+        exp_x = np.exp(-x)
+        factor1 = -np.expm1(-x) / x
+        factor2 = factor1 - exp_x
+        dfactor1 = factor2 / tau
+        dfactor2 = dfactor1 - exp_x * x / tau
+        if not self._positive.all():
+            factor1[~self._positive] = 1.0
+            for loading in (factor2, dfactor1, dfactor2):
+                loading[~self._positive] = 0.0
+        return factor1, factor2, dfactor1, dfactor2
+
+    def _evaluate(self, taus: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        '''Factor matrix (times x betas) at taus and its derivatives with
+           respect to each tau (taus x times x betas).
+        '''
+        factor1, factor2, dfactor1, dfactor2 = self._loadings(taus[0])
+        n_betas = 3 if self.curve_type == 'NS' else 4
+        factors = np.ones((self.t.size, n_betas))
+        derivatives = np.zeros((taus.size, self.t.size, n_betas))
+        factors[:, 1], factors[:, 2] = factor1, factor2
+        derivatives[0, :, 1], derivatives[0, :, 2] = dfactor1, dfactor2
+        if self.curve_type == 'NSS':
+            _, factors[:, 3], _, derivatives[1, :, 3] = self._loadings(taus[1])
+        return factors, derivatives
+
+    def _make_curve(self) -> Curve:
+        if self.curve_type == 'NS':
+            beta0, beta1, beta2 = self._betas.tolist()
+            return NelsonSiegelCurve(beta0, beta1, beta2, float(self._taus[0]))
+        return NelsonSiegelSvenssonCurve(*self._betas.tolist(),
+                                         *self._taus.tolist())
+
+    def _refit(self, residuals: np.ndarray) -> None:
+        '''Levenberg-Marquardt steps on betas and taus from the current
+           values and residuals. The cached factors follow accepted taus
+           and their pseudo-inverse is recomputed once, if the taus moved.
+        '''
+        n_betas = self._betas.size
+        sse = float(residuals @ residuals)
+        damping = 1e-3
+        moved = False
+        for _ in range(self.iterations):
+            if sse == 0:
+                break
+            tau_columns = (self._derivatives @ self._betas).T
+            jacobian = np.concatenate([self._factors, tau_columns], axis=1)
+            normal = jacobian.T @ jacobian
+            diagonal = np.maximum(np.diagonal(normal), 1e-12)
+            step = np.linalg.solve(normal + damping * np.diag(diagonal),
+                                   jacobian.T @ residuals)
+            new_taus = np.clip(self._taus + step[n_betas:], *self.tau_bounds)
+            factors, derivatives = self._evaluate(new_taus)
+            try:
+                new_betas = np.linalg.solve(factors.T @ factors,
+                                            factors.T @ self.y)
+            except np.linalg.LinAlgError:
+                new_betas = np.linalg.lstsq(factors, self.y, rcond=None)[0]
+            new_residuals: np.ndarray = self.y - factors @ new_betas
+            new_sse = float(new_residuals @ new_residuals)
+            if new_sse < sse:
+                improvement = sse - new_sse
+                self._taus, self._betas = new_taus, new_betas
+                self._factors, self._derivatives = factors, derivatives
+                residuals, sse = new_residuals, new_sse
+                moved = True
+                damping /= 3
+                if improvement <= INCREMENTAL_TOLERANCE * sse:
+                    break
+            else:
+                damping *= 3
+        if moved:
+            self._pseudo_inverse = np.linalg.pinv(self._factors)
+            self._betas = self._pseudo_inverse @ self.y
+            residuals = self.y - self._factors @ self._betas
+        self._fit_rmse = self._rmse(residuals)
+
+    def update_key(self, key: Hashable, rate: float) \
+            -> Tuple[Curve, Dict[str, float]]:
+        '''Set the quote with a key given at construction to rate and
+           re-calibrate (see `update`).
+        '''
+        assert self.keys is not None and key in self.keys, \
+            'key must be one of the keys given at construction'
+        return self.update(self.keys[key], rate)
+
+    def update(self, index: int, rate: float) \
+            -> Tuple[Curve, Dict[str, float]]:
+        '''Set the quote at position index to rate and re-calibrate.
+           Returns the new curve and the change of each of its
+           parameters.
+        '''
+        assert isinstance(index, (int, np.integer)), \
+            'index must be a position, use update_key for keys'
+        change = rate - self.y[index]
+        self.y[index] = rate
+        self._betas = self._betas + self._pseudo_inverse[:, index] * change
+        residuals = self.y - self._factors @ self._betas
+        if self._rmse(residuals) > self._fit_rmse + self.refit_threshold:
+            self._refit(residuals)
+        previous_curve, self.curve = self.curve, self._make_curve()
+        deltas = {
+            field.name: getattr(self.curve, field.name)
+            - getattr(previous_curve, field.name)
+            for field in fields(self.curve)
+        }
+        return self.curve, deltas
@@ -1,6 +1,6 @@
-from numbers import Real
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Union, Tuple
+from typing import Optional, Union, Tuple
 
 import numpy as np
 from numpy import exp
@@ -8,8 +8,133 @@ from numpy import exp
 EPS = np.finfo(float).eps
 
 
+def factor_tau_derivatives(tau: Union[float, np.ndarray], t: np.ndarray) \
+        -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    '''Nelson-Siegel factor loadings (slope, curvature) for times t and
+       their derivatives with respect to tau, broadcasting tau against
+       t and without modifying t. Loadings at t <= 0 are 1 and 0 with
+       zero derivatives.
+    '''
+    t, tau = np.broadcast_arrays(t, tau)
+    positive = t > 0
+    t_safe = np.where(positive, t, 1.0)
+    exp_tt0 = np.exp(-t_safe/tau)
+    factor1 = (1 - exp_tt0) / (t_safe / tau)
+    factor2 = factor1 - exp_tt0
+    dfactor1 = factor2 / tau
+    dfactor2 = dfactor1 - exp_tt0 * t_safe / tau**2
+    return (np.where(positive, factor1, 1.0), np.where(positive, factor2, 0.0),
+            np.where(positive, dfactor1, 0.0), np.where(positive, dfactor2, 0.0))
+
+
+def slope_loading_into(T: np.ndarray, tau: float, out: np.ndarray,
+                       work: np.ndarray) -> None:
+    '''Write the Nelson-Siegel slope loading (1 - exp(-T/tau)) / (T/tau)
+       for times T into out, and the shared term exp(-T/tau) - 1 into
+       work, without modifying T or allocating temporary arrays (apart
+       from a mask when some T <= 0, where the loading is 1).
+    '''
+    np.divide(T, tau, out=out)
+    np.negative(out, out=work)
+    np.expm1(work, out=work)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(work, out, out=out)
+    np.negative(out, out=out)
+    if T.size and T.min() <= 0:
+        np.copyto(out, 1.0, where=T <= 0)
+
+
+COMPOUNDING_OPTIONS = ['annual', 'continuous']
+
+
+def discount_factor_into(zero: np.ndarray, T: np.ndarray, compounding: str,
+                         out: np.ndarray) -> np.ndarray:
+    '''Write the discount factors for zero rates at times T into out
+       (which may be zero itself): (1 + zero)^-T with annual compounding,
+       as `financial.present_value`, or exp(-zero T) with continuous.
+    '''
+    assert compounding in COMPOUNDING_OPTIONS, \
+        f'Compounding must be in {COMPOUNDING_OPTIONS}'
+    if compounding == 'annual':
+        np.log1p(zero, out=out)
+    else:
+        np.copyto(out, zero)
+    out *= T
+    np.negative(out, out=out)
+    return np.exp(out, out=out)
+
+
+class DiscountingMixin(ABC):
+    '''Discount factors, forward rates and par rates of a curve model
+       with `zero` and `forward` methods, for scalar or array times.
+    '''
+
+    @abstractmethod
+    def zero(self, T: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        '''Zero rate(s) of this curve at time(s) T.'''
+
+    @abstractmethod
+    def forward(self, T: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        '''Instantaneous forward rate(s) of this curve at time(s) T.'''
+
+    def discount_factor(self, T: Union[float, np.ndarray],
+                        compounding: str = 'annual') \
+            -> Union[float, np.ndarray]:
+        '''Discount factor(s) at time(s) T (see `discount_factor_into`).'''
+        T_array = np.asarray(T, dtype=float)
+        zero = np.asarray(self.zero(T_array), dtype=float)
+        discount = discount_factor_into(zero, T_array, compounding, zero)
+        return float(discount) if np.ndim(T) == 0 else discount
+
+    def forward_rate(self, T1: Union[float, np.ndarray],
+                     T2: Union[float, np.ndarray],
+                     compounding: str = 'annual') -> Union[float, np.ndarray]:
+        '''Forward rate(s) between times T1 and T2 >= T1, compounded
+           like the discount factors. Where T1 == T2 this is the
+           instantaneous forward rate.
+        '''
+        T1_array, T2_array = np.broadcast_arrays(np.asarray(T1, dtype=float),
+                                                 np.asarray(T2, dtype=float))
+        period = T2_array - T1_array
+        assert np.all(period >= 0), 'T2 must not be before T1'
+        log_growth = np.log(self.discount_factor(T1_array, compounding)) \
+            - np.log(self.discount_factor(T2_array, compounding))
+        # Instantaneous continuously compounded forward, the limit T2 -> T1
+        instantaneous = self.forward(T1_array)
+        if compounding == 'annual':
+            zero = self.zero(T1_array)
+            instantaneous = np.log1p(zero) + (instantaneous - zero) / (1 + zero)
+        has_period = period > 0
+        rate = np.where(has_period,
+                        log_growth / np.where(has_period, period, 1.0),
+                        instantaneous)
+        if compounding == 'annual':
+            rate = np.expm1(rate)
+        return float(rate) if rate.ndim == 0 else rate
+
+    def par_rate(self, T: Union[float, np.ndarray], freq: int = 2,
+                 compounding: str = 'annual') -> Union[float, np.ndarray]:
+        '''Par coupon rate(s) of bonds maturing at time(s) T > 0 paying
+           freq coupons a year (the annual_frequency of a
+           TIMESERIES_TIME_PERIODS entry), on dates stepping back from
+           maturity: (1 - DF(T)) / sum of DF(t_i) / freq.
+        '''
+        T_array = np.atleast_1d(np.asarray(T, dtype=float))
+        assert np.all(T_array > 0), 'Par rates need positive maturities'
+        coupon_counts = np.maximum(np.ceil(T_array * freq - 1e-9), 1)
+        periods_back = np.arange(coupon_counts.max()) / freq
+        coupon_times = T_array[:, None] - periods_back[None, :]
+        is_coupon = periods_back[None, :] < T_array[:, None] - 1e-9
+        coupon_discount = np.asarray(self.discount_factor(
+            np.where(is_coupon, coupon_times, 0.0).reshape(-1), compounding))
+        annuity = np.where(is_coupon, coupon_discount.reshape(coupon_times.shape),
+                           0.0).sum(axis=1) / freq
+        rate = (1 - self.discount_factor(T_array, compounding)) / annuity
+        return float(rate[0]) if np.ndim(T) == 0 else rate
+
+
 @dataclass
-class NelsonSiegelCurve:
+class NelsonSiegelCurve(DiscountingMixin):
     '''Implementation of a Nelson-Siegel interest rate curve model.
        This curve can be interpreted as a factor model with three
        factors (including a constant).
@@ -21,51 +146,90 @@ class NelsonSiegelCurve:
     tau: float
 
     def factors(
-        self, 
-        T: Union[Real, np.ndarray]
-    ) -> Union[Tuple[Real, Real], Tuple[np.ndarray, np.ndarray]]:
-        """Factor loadings for time(s) T, exluding constant.
+        self,
+        T: Union[float, np.ndarray],
+        out: Optional[np.ndarray] = None
+    ) -> Union[Tuple[float, float], Tuple[np.ndarray, np.ndarray]]:
+        """Factor loadings for time(s) T, exluding constant. T is not modified.
 
         Args:
-            T (Union[Real, np.ndarray]): Tme(s)
+            T (Union[float, np.ndarray]): Tme(s)
+            out (Optional[np.ndarray], optional): Buffer of shape (2,) + T.shape
+                for the loadings of array T, which are then returned as its rows.
 
         Returns:
-            Union[Tuple[Real, Real], Tuple[np.ndarray, np.ndarray]]: _description_
+            Union[Tuple[float, float], Tuple[np.ndarray, np.ndarray]]: Slope and curvature loadings.
         """
         tau = self.tau
-        if isinstance(T, Real) and T <= 0:
-            return 1, 0
-        elif isinstance(T, np.ndarray):
-            zero_idx = T <= 0
-            T[zero_idx] = EPS  # avoid warnings in calculations
-        exp_tt0 = exp(-T/tau)
-        factor1 = (1 - exp_tt0) / (T / tau)
-        factor2 = factor1 - exp_tt0
-        if isinstance(T, np.ndarray):
-            T[zero_idx] = 0
-            factor1[zero_idx] = 1
-            factor2[zero_idx] = 0
+        if not isinstance(T, np.ndarray):
+            if T <= 0:
+                return 1.0, 0.0
+            exp_tt0 = exp(-T/tau)
+            factor1 = (1 - exp_tt0) / (T / tau)
+            return factor1, factor1 - exp_tt0
+        if out is None:
+            out = np.empty((2,) + T.shape)
+        factor1, factor2 = out[0, ...], out[1, ...]
+        slope_loading_into(T, tau, factor1, factor2)
+        # factor2 = factor1 - exp(-T/tau) with factor2 holding exp(-T/tau) - 1
+        np.subtract(factor1, factor2, out=factor2)
+        factor2 -= 1
+        if T.size and T.min() <= 0:
+            np.copyto(factor2, 0.0, where=T <= 0)
         return factor1, factor2
 
-    def factor_matrix(self, T: Union[Real, np.ndarray]) \
-            -> Union[Real, np.ndarray]:
+    def factor_matrix(self, T: Union[float, np.ndarray],
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
         '''Factor loadings for time(s) T as matrix columns,
-           including constant column (=1.0).
+           including constant column (=1.0). For array T the matrix
+           is written into out (T.size x 3) when given.
         '''
-        factor1, factor2 = self.factors(T)
-        constant = np.ones(T.size) if isinstance(T, np.ndarray) else 1
-        return np.stack([constant, factor1, factor2]).transpose()
+        if not isinstance(T, np.ndarray):
+            factor1, factor2 = self.factors(T)
+            return np.stack([1, factor1, factor2]).transpose()
+        if out is None:
+            out = np.empty((T.size, 3))
+        out[:, 0] = 1.0
+        self.factors(T.reshape(-1), out=out[:, 1:].T)
+        return out
+
+    def evaluate(self, T: np.ndarray, out: Optional[np.ndarray] = None,
+                 compounding: str = 'annual') \
+            -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        '''Zero rates, instantaneous forward rates and discount factors
+           (see `discount_factor_into`) at times T in one pass, sharing
+           the exp(-T/tau) term. They are written into the rows of out
+           (3,) + T.shape when given, without further allocations.
+        '''
+        T = np.asarray(T, dtype=float)
+        if out is None:
+            out = np.empty((3,) + T.shape)
+        zero, forward, discount = out[0, ...], out[1, ...], out[2, ...]
+        slope_loading_into(T, self.tau, zero, forward)
+        forward += 1  # exp(-T/tau)
+        np.divide(T, self.tau, out=discount)
+        discount *= self.beta2
+        discount += self.beta1
+        discount *= forward
+        discount += self.beta0
+        zero *= self.beta1 + self.beta2
+        zero += self.beta0
+        forward *= -self.beta2
+        zero += forward
+        np.copyto(forward, discount)
+        discount_factor_into(zero, T, compounding, discount)
+        return zero, forward, discount
 
-    def zero(self, T: Union[Real, np.ndarray]) -> Union[Real, np.ndarray]:
+    def zero(self, T: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         '''Zero rate(s) of this curve at time(s) T.'''
         factor1, factor2 = self.factors(T)
         return self.beta0 + self.beta1*factor1 + self.beta2*factor2
 
-    def __call__(self, T: Union[Real, np.ndarray]) -> Union[Real, np.ndarray]:
+    def __call__(self, T: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         '''Zero rate(s) of this curve at time(s) T.'''
         return self.zero(T)
 
-    def forward(self, T: Union[Real, np.ndarray]) -> Union[Real, np.ndarray]:
+    def forward(self, T: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         '''Instantaneous forward rate(s) of this curve at time(s) T.'''
         exp_tt0 = exp(-T/self.tau)
         return self.beta0 + self.beta1*exp_tt0 + self.beta2*exp_tt0*T/self.tau
@@ -4,18 +4,19 @@
 See `NelsonSiegelSvenssonCurve` class for details.
 '''
 
-from numbers import Real
 from dataclasses import dataclass
-from typing import Union, Tuple
+from typing import Optional, Union, Tuple
 
 import numpy as np
 from numpy import exp
 
+from .ns import DiscountingMixin, discount_factor_into, slope_loading_into
+
 EPS = np.finfo(float).eps
 
 
 @dataclass
-class NelsonSiegelSvenssonCurve:
+class NelsonSiegelSvenssonCurve(DiscountingMixin):
     '''Implementation of a Nelson-Siegel-Svensson interest rate curve model.
        This curve can be interpreted as a factor model with four
        factors (including a constant).
@@ -28,39 +29,95 @@ class NelsonSiegelSvenssonCurve:
     tau1: float
     tau2: float
 
-    def factors(self, T: Union[Real, np.ndarray]) \
-            -> Union[Tuple[Real, Real, Real],
+    def factors(self, T: Union[float, np.ndarray],
+                out: Optional[np.ndarray] = None) \
+            -> Union[Tuple[float, float, float],
                      Tuple[np.ndarray, np.ndarray, np.ndarray]]:
-        '''Factor loadings for time(s) T, excluding constant.'''
+        '''Factor loadings for time(s) T, excluding constant. T is not
+           modified. For array T the loadings are written into the rows
+           of out (3,) + T.shape when given.
+        '''
         tau1 = self.tau1
         tau2 = self.tau2
-        if isinstance(T, Real) and T <= 0:
-            return 1, 0, 0
-        elif isinstance(T, np.ndarray):
-            zero_idx = T <= 0
-            T[zero_idx] = EPS  # avoid warnings in calculations
-        exp_tt1 = exp(-T/tau1)
-        exp_tt2 = exp(-T/tau2)
-        factor1 = (1 - exp_tt1) / (T / tau1)
-        factor2 = factor1 - exp_tt1
-        factor3 = (1 - exp_tt2) / (T / tau2) - exp_tt2
-        if isinstance(T, np.ndarray):
-            T[zero_idx] = 0
-            factor1[zero_idx] = 1
-            factor2[zero_idx] = 0
-            factor3[zero_idx] = 0
+        if not isinstance(T, np.ndarray):
+            if T <= 0:
+                return 1.0, 0.0, 0.0
+            exp_tt1 = exp(-T/tau1)
+            exp_tt2 = exp(-T/tau2)
+            factor1 = (1 - exp_tt1) / (T / tau1)
+            factor3 = (1 - exp_tt2) / (T / tau2) - exp_tt2
+            return factor1, factor1 - exp_tt1, factor3
+        if out is None:
+            out = np.empty((3,) + T.shape)
+        factor1, factor2, factor3 = out[0, ...], out[1, ...], out[2, ...]
+        # factor3 first, using factor1 as the exp(-T/tau2) - 1 work row
+        slope_loading_into(T, tau2, factor3, factor1)
+        np.subtract(factor3, factor1, out=factor3)
+        factor3 -= 1
+        slope_loading_into(T, tau1, factor1, factor2)
+        np.subtract(factor1, factor2, out=factor2)
+        factor2 -= 1
+        if T.size and T.min() <= 0:
+            non_positive = T <= 0
+            np.copyto(factor2, 0.0, where=non_positive)
+            np.copyto(factor3, 0.0, where=non_positive)
         return factor1, factor2, factor3
 
-    def factor_matrix(self, T: Union[Real, np.ndarray]) \
-            -> Union[Real, np.ndarray]:
+    def factor_matrix(self, T: Union[float, np.ndarray],
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
         '''Factor loadings for time(s) T as matrix columns,
-           including constant column (=1.0).
+           including constant column (=1.0). For array T the matrix
+           is written into out (T.size x 4) when given.
         '''
-        factor1, factor2, factor3 = self.factors(T)
-        constant = np.ones(T.size) if isinstance(T, np.ndarray) else 1
-        return np.stack([constant, factor1, factor2, factor3]).transpose()
+        if not isinstance(T, np.ndarray):
+            factor1, factor2, factor3 = self.factors(T)
+            return np.stack([1, factor1, factor2, factor3]).transpose()
+        if out is None:
+            out = np.empty((T.size, 4))
+        out[:, 0] = 1.0
+        self.factors(T.reshape(-1), out=out[:, 1:].T)
+        return out
+
+    def evaluate(self, T: np.ndarray, out: Optional[np.ndarray] = None,
+                 compounding: str = 'annual') \
+            -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        '''Zero rates, instantaneous forward rates and discount factors
+           (see `discount_factor_into`) at times T in one pass, sharing
+           the exp(-T/tau1) and exp(-T/tau2) terms. They are written into
+           the rows of out (3,) + T.shape when given; one work row is
+           allocated.
+        '''
+        T = np.asarray(T, dtype=float)
+        if out is None:
+            out = np.empty((3,) + T.shape)
+        zero, forward, discount = out[0, ...], out[1, ...], out[2, ...]
+        work = np.empty_like(zero)
+        # tau2 terms: beta3 * factor3 and beta3 * exp(-T/tau2) * T/tau2
+        slope_loading_into(T, self.tau2, zero, forward)
+        forward += 1
+        zero -= forward
+        zero *= self.beta3
+        np.divide(T, self.tau2, out=discount)
+        forward *= discount
+        forward *= self.beta3
+        # tau1 terms, as for a Nelson-Siegel curve
+        slope_loading_into(T, self.tau1, discount, work)
+        work += 1
+        discount *= self.beta1 + self.beta2
+        zero += discount
+        np.multiply(work, -self.beta2, out=discount)
+        zero += discount
+        zero += self.beta0
+        np.divide(T, self.tau1, out=discount)
+        discount *= self.beta2
+        discount += self.beta1
+        discount *= work
+        forward += discount
+        forward += self.beta0
+        discount_factor_into(zero, T, compounding, discount)
+        return zero, forward, discount
 
-    def zero(self, T: Union[Real, np.ndarray]) -> Union[Real, np.ndarray]:
+    def zero(self, T: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         '''Zero rate(s) of this curve at time(s) T.'''
         beta0 = self.beta0
         beta1 = self.beta1
@@ -70,11 +127,11 @@ class NelsonSiegelSvenssonCurve:
         res = beta0 + beta1*factor1 + beta2*factor2 + beta3*factor3
         return res
 
-    def __call__(self, T: Union[Real, np.ndarray]) -> Union[Real, np.ndarray]:
+    def __call__(self, T: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         '''Zero rate(s) of this curve at time(s) T.'''
         return self.zero(T)
 
-    def forward(self, T: Union[Real, np.ndarray]) -> Union[Real, np.ndarray]:
+    def forward(self, T: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
         '''Instantaneous forward rate(s) of this curve at time(s) T.'''
         exp_tt0 = exp(-T/self.tau1)
         exp_tt1 = exp(-T/self.tau2)
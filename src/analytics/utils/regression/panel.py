@@ -0,0 +1,332 @@
+'''Panel calibration of Nelson-Siegel(-Svensson) models.
+See `calibrate_ns_panel` and `calibrate_nss_panel` for fitting one
+curve per row of a (days x tenors) rate matrix in a single vectorized
+pass.
+'''
+
+from dataclasses import dataclass
+from typing import Callable, Tuple, Union
+
+import numpy as np
+
+from .ns import NelsonSiegelCurve, factor_tau_derivatives
+from .nss import NelsonSiegelSvenssonCurve
+
+DEFAULT_NS_TAU_GRID = np.geomspace(0.1, 20.0, 60)
+DEFAULT_NSS_TAU_GRID = np.geomspace(0.1, 20.0, 25)
+LM_ITERATIONS = 50
+# Keeps the damped normal equations solvable when a tau has no effect.
+LM_DIAGONAL_FLOOR = 1e-12
+LM_TOLERANCE = 1e-12
+LM_MAX_DAMPING = 1e8
+# Number of days fitted together on the tau grid, bounding memory use.
+GRID_CHUNK_SIZE = 2048
+
+
+@dataclass
+class NelsonSiegelCurvePanel:
+    '''Nelson-Siegel parameters of many curves as arrays, one element
+       per curve, with the sum of squared errors of each fit.
+    '''
+
+    beta0: np.ndarray
+    beta1: np.ndarray
+    beta2: np.ndarray
+    tau: np.ndarray
+    sse: np.ndarray
+
+    def __len__(self) -> int:
+        return self.tau.size
+
+    def curve(self, i: int) -> NelsonSiegelCurve:
+        '''Nelson-Siegel curve of the i-th row.'''
+        return NelsonSiegelCurve(float(self.beta0[i]), float(self.beta1[i]),
+                                 float(self.beta2[i]), float(self.tau[i]))
+
+    def zero(self, T: Union[float, np.ndarray]) -> np.ndarray:
+        '''Zero rates of every curve at time(s) T, as (curves x times).'''
+        times = np.atleast_1d(np.asarray(T, dtype=float))
+        factor1, factor2 = factor_tau_derivatives(self.tau[:, None], times)[:2]
+        return self.beta0[:, None] + self.beta1[:, None]*factor1 \
+            + self.beta2[:, None]*factor2
+
+
+@dataclass
+class NelsonSiegelSvenssonCurvePanel:
+    '''Nelson-Siegel-Svensson parameters of many curves as arrays, one
+       element per curve, with the sum of squared errors of each fit.
+    '''
+
+    beta0: np.ndarray
+    beta1: np.ndarray
+    beta2: np.ndarray
+    beta3: np.ndarray
+    tau1: np.ndarray
+    tau2: np.ndarray
+    sse: np.ndarray
+
+    def __len__(self) -> int:
+        return self.tau1.size
+
+    def curve(self, i: int) -> NelsonSiegelSvenssonCurve:
+        '''Nelson-Siegel-Svensson curve of the i-th row.'''
+        return NelsonSiegelSvenssonCurve(
+            float(self.beta0[i]), float(self.beta1[i]), float(self.beta2[i]),
+            float(self.beta3[i]), float(self.tau1[i]), float(self.tau2[i]))
+
+    def zero(self, T: Union[float, np.ndarray]) -> np.ndarray:
+        '''Zero rates of every curve at time(s) T, as (curves x times).'''
+        times = np.atleast_1d(np.asarray(T, dtype=float))
+        factor1, factor2 = factor_tau_derivatives(self.tau1[:, None],
+                                                  times)[:2]
+        factor3 = factor_tau_derivatives(self.tau2[:, None], times)[1]
+        return self.beta0[:, None] + self.beta1[:, None]*factor1 \
+            + self.beta2[:, None]*factor2 + self.beta3[:, None]*factor3
+
+
+def ns_factor_matrices(t: np.ndarray, taus: np.ndarray) -> np.ndarray:
+    '''Nelson-Siegel factor matrices (see `NelsonSiegelCurve.factor_matrix`)
+       for times t and each tau in taus, as (taus x times x 3).
+    '''
+    taus = np.asarray(taus, dtype=float)
+    factor1, factor2 = factor_tau_derivatives(taus[:, None], t)[:2]
+    return np.stack([np.ones_like(factor1), factor1, factor2], axis=-1)
+
+
+def nss_factor_matrices(t: np.ndarray, tau1s: np.ndarray,
+                        tau2s: np.ndarray) -> np.ndarray:
+    '''Nelson-Siegel-Svensson factor matrices for times t and each pair
+       of tau1s and tau2s, as (pairs x times x 4).
+    '''
+    tau1s = np.asarray(tau1s, dtype=float)
+    tau2s = np.asarray(tau2s, dtype=float)
+    factor1, factor2 = factor_tau_derivatives(tau1s[:, None], t)[:2]
+    factor3 = factor_tau_derivatives(tau2s[:, None], t)[1]
+    return np.stack([np.ones_like(factor1), factor1, factor2, factor3],
+                    axis=-1)
+
+
+def nss_tau_pairs(tau_grid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    '''All pairs tau1 < tau2 of a 1D tau grid, as two arrays.'''
+    tau1_index, tau2_index = np.triu_indices(tau_grid.size, k=1)
+    return tau_grid[tau1_index], tau_grid[tau2_index]
+
+
+def grid_lstsq(factor_matrices: np.ndarray, rates: np.ndarray) \
+        -> Tuple[np.ndarray, np.ndarray]:
+    '''Least squares betas and sums of squared errors of every row of
+       rates (days x times) under every factor matrix (grid x times x
+       factors), solved as one batched product with the pseudo-inverses
+       of the factor matrices. Returns betas (grid x factors x days) and
+       sse (grid x days).
+    '''
+    pseudo_inverses = np.linalg.pinv(factor_matrices)
+    betas = pseudo_inverses @ rates.T
+    residuals = rates.T[None, :, :] - factor_matrices @ betas
+    return betas, np.einsum('gtd,gtd->gd', residuals, residuals)
+
+
+def rowwise_lstsq(factor_matrices: np.ndarray, rates: np.ndarray) \
+        -> Tuple[np.ndarray, np.ndarray]:
+    '''Least squares betas (days x factors) and sums of squared errors
+       (days,) of each row of rates (days x times) under its own factor
+       matrix (days x times x factors).
+    '''
+    betas = (np.linalg.pinv(factor_matrices) @ rates[:, :, None])[:, :, 0]
+    residuals = rates - (factor_matrices @ betas[:, :, None])[:, :, 0]
+    return betas, np.einsum('dt,dt->d', residuals, residuals)
+
+
+def ns_factors_and_derivatives(t: np.ndarray, taus: np.ndarray) \
+        -> Tuple[np.ndarray, np.ndarray]:
+    '''Nelson-Siegel factor matrices (days x times x 3) for each day's
+       tau in taus (days x 1) and their derivatives with respect to
+       tau (days x 1 x times x 3).
+    '''
+    factor1, factor2, dfactor1, dfactor2 = factor_tau_derivatives(
+        taus[:, 0:1], t)
+    zeros = np.zeros_like(factor1)
+    factors = np.stack([np.ones_like(factor1), factor1, factor2], axis=-1)
+    derivatives = np.stack([zeros, dfactor1, dfactor2], axis=-1)
+    return factors, derivatives[:, None]
+
+
+def nss_factors_and_derivatives(t: np.ndarray, taus: np.ndarray) \
+        -> Tuple[np.ndarray, np.ndarray]:
+    '''Nelson-Siegel-Svensson factor matrices (days x times x 4) for
+       each day's tau1 and tau2 in taus (days x 2) and their derivatives
+       with respect to tau1 and tau2 (days x 2 x times x 4).
+    '''
+    factor1, factor2, dfactor1, dfactor2 = factor_tau_derivatives(
+        taus[:, 0:1], t)
+    _, factor3, _, dfactor3 = factor_tau_derivatives(taus[:, 1:2], t)
+    zeros = np.zeros_like(factor1)
+    factors = np.stack([np.ones_like(factor1), factor1, factor2, factor3],
+                       axis=-1)
+    derivatives = np.stack([
+        np.stack([zeros, dfactor1, dfactor2, zeros], axis=-1),
+        np.stack([zeros, zeros, zeros, dfactor3], axis=-1)
+    ], axis=1)
+    return factors, derivatives
+
+
+def _levenberg_marquardt(
+        model: Callable[[np.ndarray, np.ndarray],
+                        Tuple[np.ndarray, np.ndarray]],
+        t: np.ndarray, rates: np.ndarray, taus: np.ndarray,
+        tau_bounds: Tuple[float, float], iterations: int) -> np.ndarray:
+    '''Refine each day's taus (days x taus) by Levenberg-Marquardt
+       steps on betas and taus jointly, solving the damped normal
+       equations of all days still improving as one batch. Steps are
+       only taken where they reduce the day's sum of squared errors.
+       Returns the refined taus.
+    '''
+    taus = taus.copy()
+    factors, _ = model(t, taus)
+    betas, sse = rowwise_lstsq(factors, rates)
+    n_betas = betas.shape[1]
+    damping = np.full(rates.shape[0], 1e-3)
+    active = np.arange(rates.shape[0])
+    for _ in range(iterations):
+        if active.size == 0:
+            break
+        factors, derivatives = model(t, taus[active])
+        active_betas = betas[active]
+        residuals = rates[active] - (factors @ active_betas[:, :, None])[:, :, 0]
+        tau_columns = (derivatives @ active_betas[:, None, :, None])[..., 0]
+        jacobian = np.concatenate(
+            [factors, tau_columns.transpose(0, 2, 1)], axis=2)
+        normal = jacobian.transpose(0, 2, 1) @ jacobian
+        gradient = jacobian.transpose(0, 2, 1) @ residuals[:, :, None]
+        diagonal = np.maximum(np.diagonal(normal, axis1=1, axis2=2),
+                              LM_DIAGONAL_FLOOR)
+        step = np.linalg.solve(
+            normal + damping[active, None, None] * diagonal[:, None, :]
+            * np.eye(diagonal.shape[1]), gradient)[:, :, 0]
+        new_betas = active_betas + step[:, :n_betas]
+        new_taus = np.clip(taus[active] + step[:, n_betas:], *tau_bounds)
+        new_factors, _ = model(t, new_taus)
+        new_residuals = rates[active] \
+            - (new_factors @ new_betas[:, :, None])[:, :, 0]
+        new_sse = np.sum(new_residuals**2, axis=1)
+        accept = new_sse < sse[active]
+        converged = np.where(accept,
+                             sse[active] - new_sse <= LM_TOLERANCE * sse[active],
+                             damping[active] >= LM_MAX_DAMPING)
+        accepted = active[accept]
+        betas[accepted] = new_betas[accept]
+        taus[accepted] = new_taus[accept]
+        sse[accepted] = new_sse[accept]
+        damping[active] = np.where(accept, damping[active] / 3,
+                                   damping[active] * 3)
+        active = active[~converged]
+    return taus
+
+
+def _assert_panel_shapes(t: np.ndarray, rates: np.ndarray) -> None:
+    assert rates.ndim == 2, 'rates must be a (days x tenors) matrix'
+    assert t.shape == (rates.shape[1],), \
+        'Mismatching shapes of time and rate columns'
+    assert np.all(np.isfinite(rates)), 'rates must be finite'
+
+
+def _grid_candidates(factor_grid: np.ndarray, rates: np.ndarray,
+                     candidates: int) -> np.ndarray:
+    '''Indices (days x candidates) of the best fitting grid factor
+       matrices for each day, best first, fitting GRID_CHUNK_SIZE days
+       at a time.
+    '''
+    candidates = min(candidates, factor_grid.shape[0])
+    best_index = np.empty((rates.shape[0], candidates), dtype=int)
+    for start in range(0, rates.shape[0], GRID_CHUNK_SIZE):
+        chunk = slice(start, start + GRID_CHUNK_SIZE)
+        _, sse = grid_lstsq(factor_grid, rates[chunk])
+        best_index[chunk] = np.argsort(sse, axis=0)[:candidates].T
+    return best_index
+
+
+def _refine_candidates(model: Callable[[np.ndarray, np.ndarray],
+                                       Tuple[np.ndarray, np.ndarray]],
+                       t: np.ndarray, rates: np.ndarray, taus: np.ndarray,
+                       tau_bounds: Tuple[float, float],
+                       iterations: int) -> np.ndarray:
+    '''Refine every candidate taus (days x candidates x taus) of each
+       day and return the best refined taus of each day (days x taus).
+    '''
+    days, candidates, n_taus = taus.shape
+    candidate_rates = np.repeat(rates, candidates, axis=0)
+    refined = _levenberg_marquardt(model, t, candidate_rates,
+                                   taus.reshape(-1, n_taus), tau_bounds,
+                                   iterations)
+    sse = rowwise_lstsq(model(t, refined)[0], candidate_rates)[1]
+    best = np.argmin(sse.reshape(days, candidates), axis=1)
+    return refined.reshape(days, candidates, n_taus)[np.arange(days), best]
+
+
+def calibrate_ns_panel(t: np.ndarray, rates: np.ndarray,
+                       tau_grid: np.ndarray = DEFAULT_NS_TAU_GRID,
+                       refine: bool = True,
+                       candidates: int = 3,
+                       iterations: int = LM_ITERATIONS) \
+        -> NelsonSiegelCurvePanel:
+    '''Calibrate a Nelson-Siegel curve to each row of rates (days x
+       tenors) at times t. Every day is first fitted at every tau of
+       tau_grid with one batched least squares solve. Without refine the
+       best grid tau is kept; with refine, the best candidates grid taus
+       of each day are refined by batched Levenberg-Marquardt steps,
+       bounded to the grid range, and the best refined tau is kept.
+    '''
+    t = np.asarray(t, dtype=float)
+    rates = np.asarray(rates, dtype=float)
+    _assert_panel_shapes(t, rates)
+    tau_grid = np.sort(np.asarray(tau_grid, dtype=float))
+    best_index = _grid_candidates(ns_factor_matrices(t, tau_grid), rates,
+                                  candidates if refine else 1)
+    taus = tau_grid[best_index[:, 0]]
+
+    if refine:
+        taus = _refine_candidates(
+            ns_factors_and_derivatives, t, rates, tau_grid[best_index][:, :, None],
+            (tau_grid[0], tau_grid[-1]), iterations)[:, 0]
+
+    betas, sse = rowwise_lstsq(ns_factors_and_derivatives(t, taus[:, None])[0],
+                               rates)
+    return NelsonSiegelCurvePanel(betas[:, 0], betas[:, 1], betas[:, 2],
+                                  taus, sse)
+
+
+def calibrate_nss_panel(t: np.ndarray, rates: np.ndarray,
+                        tau_grid: np.ndarray = DEFAULT_NSS_TAU_GRID,
+                        refine: bool = True,
+                        candidates: int = 3,
+                        iterations: int = LM_ITERATIONS) \
+        -> NelsonSiegelSvenssonCurvePanel:
+    '''Calibrate a Nelson-Siegel-Svensson curve to each row of rates
+       (days x tenors) at times t. Every day is first fitted at every
+       pair tau1 < tau2 of tau_grid with one batched least squares
+       solve. Without refine the best pair is kept; with refine, the
+       best candidates pairs of each day are refined by batched
+       Levenberg-Marquardt steps, bounded to the grid range, and the
+       best refined pair is kept.
+    '''
+    t = np.asarray(t, dtype=float)
+    rates = np.asarray(rates, dtype=float)
+    _assert_panel_shapes(t, rates)
+    tau_grid = np.sort(np.asarray(tau_grid, dtype=float))
+    tau1_grid, tau2_grid = nss_tau_pairs(tau_grid)
+    best_index = _grid_candidates(
+        nss_factor_matrices(t, tau1_grid, tau2_grid), rates,
+        candidates if refine else 1)
+    taus = np.stack([tau1_grid[best_index], tau2_grid[best_index]], axis=-1)
+
+    if refine:
+        taus = _refine_candidates(
+            nss_factors_and_derivatives, t, rates, taus,
+            (tau_grid[0], tau_grid[-1]), iterations)
+    else:
+        taus = taus[:, 0]
+
+    betas, sse = rowwise_lstsq(nss_factors_and_derivatives(t, taus)[0], rates)
+    return NelsonSiegelSvenssonCurvePanel(betas[:, 0], betas[:, 1],
+                                          betas[:, 2], betas[:, 3],
+                                          taus[:, 0], taus[:, 1], sse)
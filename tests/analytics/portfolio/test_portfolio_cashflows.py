@@ -1,6 +1,12 @@
+import copy
 import unittest
 
+from src.analytics.utils.cashflow import (
+    generate_cashflows
+)
+
 from src.analytics.utils.date_time import (
+    to_typed_dates,
     _default_date
 )
 
@@ -237,9 +243,56 @@ class PortfolioFutureCashflowsTest(unittest.TestCase):
         }
     
         result = get_portfolio_future_cashflows(portfolio_holdings, security_lifetime_cashflow_object)
-    
+
         self.assertDictEqual(result, expected_result)
-        
+
+    def test_get_portfolio_future_cashflows_unpadded_dates(self):
+
+        portfolio_holdings = {
+            "date": "2000-1-1",
+            "holdings": {
+                "XS12345678901": {
+                    "volume": 100000.0
+                }
+            }
+        }
+
+        def cashflow(payment_date, record_date, ex_date):
+            return {
+                'date': {
+                    "payment_date": payment_date,
+                    "record_date": record_date,
+                    "ex_date": ex_date
+                },
+                'cashflow': {
+                    'total': 1.0,
+                    'coupon_interest': {
+                        'fixed_coupon_interest_component': 1.0,
+                        'variable_coupon_interest_component': 0.0,
+                        'total_coupon_interest': 1.0,
+                    },
+                    'principal': {
+                        'redemption_principal': 0.0,
+                        'amortising': 0.0,
+                        'total_principal': 0.0
+                    }
+                }
+            }
+
+        security_lifetime_cashflow_object = {
+            "XS12345678901": {
+                "2000-10-1": cashflow("2000-10-1", "2000-9-23", "2000-9-22"),
+                "2000-2-1": cashflow("2000-2-1", "2000-1-24", "2000-1-23"),
+                "1999-12-1": cashflow("1999-12-1", "1999-11-23", "1999-11-22")
+            }
+        }
+
+        result = get_portfolio_future_cashflows(portfolio_holdings, security_lifetime_cashflow_object)
+
+        # Dates are ordered as dates, not strings, and past cashflows are dropped.
+        self.assertEqual(list(result.keys()), ["2000-2-1", "2000-10-1"])
+        self.assertEqual(result["2000-2-1"]["XS12345678901"]['cashflow']['total'], 1000.0)
+
     def test_get_portfolio_future_cashflows_in_ex_date(self):
             
         portfolio_holdings = {
@@ -1003,6 +1056,41 @@ class PortfolioHistoricalCashflowsTest(unittest.TestCase):
         
         self.assertEqual(result, expected_result)
 
+class PortfolioCashflowsTypedDatesTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.security_cashflows = {
+            security_id: {
+                cashflow['date']['payment_date']: cashflow
+                for cashflow in generate_cashflows(_default_date(start_date), _default_date("2002-01-01"), "Q", 100.00, 0.05)
+            }
+            for security_id, start_date in [("XS12345678901", "2000-01-01"), ("XS12345678902", "2000-02-15")]
+        }
+        self.portfolio_holdings_index = {
+            "2000-01-03": {"date": "2000-01-03", "holdings": {"XS12345678901": {"volume": 100000}}},
+            "2000-05-20": {"date": "2000-05-20", "holdings": {"XS12345678901": {"volume": 50000}, "XS12345678902": {"volume": 20000}}},
+            "2001-03-10": {"date": "2001-03-10", "holdings": {"XS12345678901": {"volume": 0}, "XS12345678902": {"volume": 80000}}}
+        }
+    
+    def test_get_portfolio_future_cashflows_typed_dates(self):
+        portfolio_holdings = self.portfolio_holdings_index["2000-05-20"]
+        
+        expected = get_portfolio_future_cashflows(copy.deepcopy(portfolio_holdings), copy.deepcopy(self.security_cashflows))
+        result = get_portfolio_future_cashflows(to_typed_dates(portfolio_holdings), to_typed_dates(self.security_cashflows))
+        
+        self.assertTrue(expected)
+        self.assertEqual(result, to_typed_dates(expected))
+        self.assertEqual(list(result.keys()), sorted(result.keys()))
+    
+    def test_get_portfolio_historical_cashflows_typed_dates(self):
+        pricing_date = _default_date("2001-08-01")
+        
+        expected = get_portfolio_historical_cashflows(pricing_date, copy.deepcopy(self.portfolio_holdings_index), copy.deepcopy(self.security_cashflows))
+        result = get_portfolio_historical_cashflows(pricing_date, to_typed_dates(self.portfolio_holdings_index), to_typed_dates(self.security_cashflows))
+        
+        self.assertTrue(expected)
+        self.assertEqual(result, to_typed_dates(expected))
+
 class PortfolioCashflowGivenHoldingsTest(unittest.TestCase):
     
     def test_get_cashflow_given_holdings(self):
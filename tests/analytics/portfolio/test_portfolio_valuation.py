@@ -1,13 +1,24 @@
 import datetime
 import unittest
 
+import numpy as np
+
 from src.analytics.portfolio.portfolio_valuation import (
+    AsOfPriceIndex,
+    NO_PRICE_AVAILABLE,
+    get_holdings_matrix,
+    get_portfolio_valuation_matrix,
     get_portfolio_valuation_index,
     get_position_valuation,
     get_portfolio_valuation,
     _get_prices_on_date
 )
 
+from src.analytics.utils.date_time import (
+    to_typed_dates,
+    _default_date
+)
+
 from ..helper.testConstants import (
     MOCK_TRADES_INDEX
 )
@@ -100,6 +111,129 @@ class FilterPriceHistoryTestCase(unittest.TestCase):
         
         self.assertEqual(result,expected)
 
+class AsOfPriceIndexTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.price_history_index = {
+            security: {
+                date: {
+                    "date": _default_date(date),
+                    "per_original_face_value": 100,
+                    "currency": "AUD",
+                    "base_currency_conversion_rate": 1.00,
+                    "value": value
+                }
+                for date, value in prices
+            }
+            for security, prices in [
+                ("XS1234567890", [("2000-03-31", 102.50), ("2000-01-01", 100.50), ("2000-02-01", 101.50)]),
+                ("XS1234567891", [("2000-02-15", 99.00)]),
+                ("XS1234567892", [])
+            ]
+        }
+    
+    def test_prices_on_date(self):
+        price_index = AsOfPriceIndex(self.price_history_index)
+        pricing_dates = ["1999-12-31", "2000-01-01", "2000-02-14", "2000-02-15", "2000-03-30", "2000-12-31"]
+        
+        positions = price_index.positions(pricing_dates)
+        
+        self.assertEqual(positions.shape, (6, 3))
+        for date, date_positions in zip(pricing_dates, positions):
+            expected = {}
+            for security, prices in self.price_history_index.items():
+                price_dates = [price_date for price_date in prices if price_date <= date]
+                expected[security] = prices[max(price_dates)] if price_dates else {}
+            self.assertEqual(price_index.prices_at(date_positions), expected)
+            self.assertEqual(price_index.prices_on_date(_default_date(date)), expected)
+        
+        self.assertEqual(price_index.prices_on_date(datetime.datetime(2000, 2, 1, 18))["XS1234567890"]["value"], 101.50)
+        self.assertEqual(
+            AsOfPriceIndex(to_typed_dates(self.price_history_index)).prices_on_date(to_typed_dates({"date": "2000-02-15"})["date"]),
+            to_typed_dates(price_index.prices_on_date("2000-02-15"))
+        )
+        self.assertEqual(AsOfPriceIndex({}).positions(["2000-01-01"]).shape, (1, 0))
+    
+    def test_validation_on_build(self):
+        del self.price_history_index["XS1234567890"]["2000-02-01"]["currency"]
+        
+        with self.assertRaises(AssertionError):
+            AsOfPriceIndex(self.price_history_index)
+    
+    def test_valuation_index_with_price_index(self):
+        portfolio_holdings_index = {
+            "2000-01-15": {"date": "2000-01-15", "holdings": {"XS1234567890": {"volume": 1000}}},
+            "2000-03-01": {"date": "2000-03-01", "holdings": {"XS1234567890": {"volume": 1000}, "XS1234567891": {"volume": 500}}}
+        }
+        
+        result = get_portfolio_valuation_index(portfolio_holdings_index, AsOfPriceIndex(self.price_history_index))
+        
+        self.assertEqual(result, get_portfolio_valuation_index(portfolio_holdings_index, self.price_history_index))
+        self.assertEqual(result["2000-03-01"]["valuation"]["total_valuation"]["AUD"], 1000 * 101.50 / 100 + 500 * 99.00 / 100)
+
+class PortfolioValuationMatrixTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.price_history_index = {
+            "XS1234567890": {
+                "2000-01-01": {"date": datetime.datetime(2000,1,1), "per_original_face_value": 100, "currency": "AUD", "base_currency_conversion_rate": 1.00, "value": 100.50},
+                "2000-02-01": {"date": datetime.datetime(2000,2,1), "per_original_face_value": 100, "currency": "AUD", "base_currency_conversion_rate": 1.00, "value": 101.50}
+            },
+            "US1234567891": {
+                "2000-01-20": {"date": datetime.datetime(2000,1,20), "per_original_face_value": 1000, "currency": "USD", "base_currency_conversion_rate": 1.50, "value": 990.00}
+            }
+        }
+        self.portfolio_holdings_index = {
+            "2000-01-15": {"date": "2000-01-15", "holdings": {"XS1234567890": {"volume": 1000}, "US1234567891": {"volume": 200}}},
+            "2000-02-15": {"date": "2000-02-15", "holdings": {"US1234567891": {"volume": 400}, "XS1234567899": {"volume": 300}}},
+            "2000-03-15": {"date": "2000-03-15", "holdings": {"XS1234567890": {"volume": 0}, "US1234567891": {"volume": 400}}}
+        }
+    
+    def test_get_holdings_matrix(self):
+        dates, securities, is_held, volume = get_holdings_matrix(self.portfolio_holdings_index)
+        
+        self.assertEqual(dates, ["2000-01-15", "2000-02-15", "2000-03-15"])
+        self.assertEqual(securities, ["XS1234567890", "US1234567891", "XS1234567899"])
+        np.testing.assert_array_equal(is_held, [[True, True, False], [False, True, True], [True, True, False]])
+        np.testing.assert_array_equal(volume, [[1000, 200, 0], [0, 400, 300], [0, 400, 0]])
+    
+    def test_get_portfolio_valuation_matrix(self):
+        dates, securities, is_held, volume = get_holdings_matrix(self.portfolio_holdings_index)
+        
+        result = get_portfolio_valuation_matrix(dates, securities, volume, self.price_history_index, is_held)
+        
+        np.testing.assert_array_equal(result.value, [[100.50, 0, 0], [101.50, 990.00, 0], [101.50, 990.00, 0]])
+        np.testing.assert_array_equal(result.position_valuation, [[1005.0, -0.0, 0], [0, 396.0, -0.0], [0.0, 396.0, 0]])
+        self.assertEqual(result.currencies, ["AUD", "N/A", "USD"])
+        np.testing.assert_array_equal(result.total_valuation, [[1005.0, 0, 0], [0, 0, 396.0], [0, 0, 396.0]])
+        np.testing.assert_array_equal(result.base_currency_valuation, [1005.0, 594.0, 594.0])
+        
+        # Positions default to those with a volume.
+        np.testing.assert_array_equal(
+            get_portfolio_valuation_matrix(dates, securities, volume, AsOfPriceIndex(self.price_history_index)).is_held,
+            volume != 0
+        )
+    
+    def test_to_valuation_index(self):
+        result = get_portfolio_valuation_index(self.portfolio_holdings_index, self.price_history_index)
+        
+        self.assertEqual(set(result["2000-02-15"]["valuation"]["position_valuation"].keys()), {"US1234567891", "XS1234567899"})
+        self.assertEqual(result["2000-02-15"]["valuation"]["total_valuation"], {"USD": 396.0, "N/A": 0.0})
+        self.assertEqual(result["2000-02-15"]["valuation"]["position_valuation"]["XS1234567899"]["price"], NO_PRICE_AVAILABLE)
+        # No USD price yet on 15 January.
+        self.assertEqual(result["2000-01-15"]["valuation"]["position_valuation"]["US1234567891"]["currency"], "N/A")
+        self.assertEqual(result["2000-03-15"]["valuation"]["total_valuation"], {"AUD": 0.0, "USD": 396.0})
+        # Volumes are reported as held, not converted to float.
+        self.assertIs(type(result["2000-01-15"]["valuation"]["position_valuation"]["XS1234567890"]["volume"]), int)
+        
+        for date, holdings in self.portfolio_holdings_index.items():
+            expected = get_portfolio_valuation(
+                _default_date(date),
+                holdings["holdings"],
+                {security: price for security, price in _get_prices_on_date(_default_date(date), self.price_history_index).items() if price}
+            )
+            self.assertEqual(result[date], expected)
+
 class PortfolioValuationIndexTestCase(unittest.TestCase):
     
     def test_get_portfolio_valuation_index_holdings_type_incorrect(self):
@@ -386,6 +520,16 @@ class PortfolioValuationIndexTestCase(unittest.TestCase):
             expected
         )
         
+        typed_result = get_portfolio_valuation_index(
+            to_typed_dates(portfolio_holdings),
+            to_typed_dates(price_history_index)
+        )
+        
+        self.assertEqual(
+            typed_result,
+            to_typed_dates(expected)
+        )
+        
 class PortfolioValuationTestCase(unittest.TestCase):
     
     def test_get_portfolio_valuation_pricing_date_input_type_incorrect(self):
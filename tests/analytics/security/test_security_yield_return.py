@@ -1,11 +1,21 @@
 import unittest
 import datetime
 
+import numpy as np
+
 from src.analytics.security.security_yield_return import (
     yield_to_workout, 
     current_yield,
-    spread_to_benchmark
+    spread_to_benchmark,
+    spreads_to_benchmark,
+    yields_to_workout,
+    g_spread,
+    i_spread,
+    g_spreads,
+    i_spreads
 )
+from src.analytics.utils.curve import construct_ns_curve
+from src.analytics.utils.curve_cache import CurveCache
 
 from ..helper.testConstants import MOCK_BENCHMARK_CURVE, MOCK_SECURITY_CASHFLOW_ARRAY
 
@@ -26,6 +36,23 @@ class SecurityAnalysisTestCase(unittest.TestCase):
 
         self.assertEqual(round(result, 6), 0.860418)
 
+    def test_yield_to_workout_true_yield(self):
+
+        pricing_date = datetime.datetime(2000, 1, 1)
+        cashflows = MOCK_SECURITY_CASHFLOW_ARRAY
+        present_value = 15033.82
+        workout_date = MOCK_SECURITY_CASHFLOW_ARRAY[-1]["date"]
+
+        result = yield_to_workout(
+            pricing_date,
+            cashflows,
+            present_value,
+            workout_date,
+            true_yield=True
+        )
+
+        self.assertEqual(round(result, 6), 0.05)
+
     def test_current_yield(self):
 
         face_value = 100
@@ -60,3 +87,191 @@ class SecurityAnalysisTestCase(unittest.TestCase):
 
         self.assertAlmostEqual(round(result, 6), 0.825989)
 
+    def test_spread_to_benchmark_day_count(self):
+
+        cache = CurveCache()
+        pricing_date = datetime.datetime(2000, 1, 1)
+        workout_date = MOCK_SECURITY_CASHFLOW_ARRAY[-2]["date"]
+        args = (pricing_date, MOCK_SECURITY_CASHFLOW_ARRAY, 1000, workout_date, MOCK_BENCHMARK_CURVE, 'ns')
+
+        spread_to_benchmark(*args, curve_cache=cache)
+        result = spread_to_benchmark(*args, curve_cache=cache, day_count="ACT/360")
+
+        # The yield and the benchmark rate are both measured under the day count.
+        curve = construct_ns_curve(pricing_date, MOCK_BENCHMARK_CURVE, day_count="ACT/360")
+        expected = yield_to_workout(pricing_date, MOCK_SECURITY_CASHFLOW_ARRAY, 1000, workout_date, day_count="ACT/360") \
+            - curve((workout_date - pricing_date).days / 360)
+        self.assertAlmostEqual(result, expected, places=12)
+        self.assertNotAlmostEqual(
+            yield_to_workout(pricing_date, MOCK_SECURITY_CASHFLOW_ARRAY, 1000, workout_date, day_count="ACT/360"),
+            yield_to_workout(pricing_date, MOCK_SECURITY_CASHFLOW_ARRAY, 1000, workout_date),
+            places=6
+        )
+        self.assertEqual(cache.misses, 2)
+
+        vectorised = spreads_to_benchmark(
+            pricing_date,
+            np.array([cashflow['date'] for cashflow in MOCK_SECURITY_CASHFLOW_ARRAY], dtype="datetime64[D]"),
+            np.array([[cashflow['cashflow_value'] for cashflow in MOCK_SECURITY_CASHFLOW_ARRAY]]),
+            np.array([1000.0]),
+            np.array([workout_date], dtype="datetime64[D]"),
+            MOCK_BENCHMARK_CURVE,
+            'ns',
+            curve_cache=cache,
+            day_count="ACT/360"
+        )
+        self.assertAlmostEqual(vectorised[0], expected, places=10)
+        self.assertEqual(cache.misses, 2)
+
+        for true_yield in [False, True]:
+            self.assertAlmostEqual(
+                yields_to_workout(
+                    pricing_date,
+                    np.array([cashflow['date'] for cashflow in MOCK_SECURITY_CASHFLOW_ARRAY], dtype="datetime64[D]"),
+                    np.array([[cashflow['cashflow_value'] for cashflow in MOCK_SECURITY_CASHFLOW_ARRAY]]),
+                    np.array([1000.0]),
+                    np.array([workout_date], dtype="datetime64[D]"),
+                    true_yield,
+                    day_count="ACT/360"
+                )[0],
+                yield_to_workout(pricing_date, MOCK_SECURITY_CASHFLOW_ARRAY, 1000, workout_date, true_yield, day_count="ACT/360"),
+                places=10
+            )
+
+    def test_spread_to_benchmark_act_act_icma(self):
+
+        pricing_date = datetime.datetime(2000, 1, 1)
+        workout_date = MOCK_SECURITY_CASHFLOW_ARRAY[-2]["date"]
+        args = (pricing_date, MOCK_SECURITY_CASHFLOW_ARRAY, 1000, workout_date)
+
+        # Tenors between a pair of dates have no coupon period and are measured ACT/ACT.
+        self.assertEqual(
+            yield_to_workout(*args, day_count="ACT/ACT ICMA"),
+            yield_to_workout(*args, day_count="ACT/ACT")
+        )
+        self.assertEqual(
+            g_spread(*args, MOCK_BENCHMARK_CURVE, 'ns', curve_cache=CurveCache(), day_count="ACT/ACT ICMA"),
+            g_spread(*args, MOCK_BENCHMARK_CURVE, 'ns', curve_cache=CurveCache(), day_count="ACT/ACT")
+        )
+
+        cashflow_dates = np.array([cashflow['date'] for cashflow in MOCK_SECURITY_CASHFLOW_ARRAY], dtype="datetime64[D]")
+        cashflow_matrix = np.array([[cashflow['cashflow_value'] for cashflow in MOCK_SECURITY_CASHFLOW_ARRAY]])
+        batch_args = (pricing_date, cashflow_dates, cashflow_matrix, np.array([1000.0]), np.array([workout_date], dtype="datetime64[D]"))
+        np.testing.assert_array_equal(
+            g_spreads(*batch_args, MOCK_BENCHMARK_CURVE, 'ns', curve_cache=CurveCache(), day_count="ACT/ACT ICMA"),
+            g_spreads(*batch_args, MOCK_BENCHMARK_CURVE, 'ns', curve_cache=CurveCache(), day_count="ACT/ACT")
+        )
+
+    def test_spread_to_benchmark_guess(self):
+
+        pricing_date = datetime.datetime(2000, 1, 1)
+        workout_date = MOCK_SECURITY_CASHFLOW_ARRAY[-1]["date"]
+        arguments = (pricing_date, MOCK_SECURITY_CASHFLOW_ARRAY, 15033.82, workout_date, MOCK_BENCHMARK_CURVE, 'ns', True, CurveCache())
+
+        expected = spread_to_benchmark(*arguments)
+
+        self.assertAlmostEqual(spread_to_benchmark(*arguments, guess=0.049), expected, 12)
+        self.assertAlmostEqual(g_spread(*arguments, guess=0.049), expected, 12)
+        self.assertAlmostEqual(i_spread(*arguments, guess=0.049), expected, 12)
+
+
+class SpreadsToBenchmarkTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.pricing_date = datetime.datetime(2000, 1, 1)
+        self.cashflow_dates = np.array([cashflow['date'] for cashflow in MOCK_SECURITY_CASHFLOW_ARRAY], dtype="datetime64[D]")
+        self.cashflow_matrix = np.array([
+            [cashflow['cashflow_value'] for cashflow in MOCK_SECURITY_CASHFLOW_ARRAY],
+            [5.00, 5.00, 105.00, 0.00, 0.00],
+        ])
+        self.present_values = np.array([1000.00, 98.00])
+        self.workout_dates = np.array([MOCK_SECURITY_CASHFLOW_ARRAY[-2]["date"], MOCK_SECURITY_CASHFLOW_ARRAY[2]["date"]], dtype="datetime64[D]")
+        self.cashflow_lists = [
+            [
+                {"date": cashflow['date'], "cashflow_value": value}
+                for cashflow, value in zip(MOCK_SECURITY_CASHFLOW_ARRAY, row)
+                if value != 0
+            ]
+            for row in self.cashflow_matrix
+        ]
+
+    def test_spreads_to_benchmark_matches_spread_to_benchmark(self):
+
+        for true_yield in [False, True]:
+            result = spreads_to_benchmark(
+                self.pricing_date,
+                self.cashflow_dates,
+                self.cashflow_matrix,
+                self.present_values,
+                self.workout_dates,
+                MOCK_BENCHMARK_CURVE,
+                'ns',
+                true_yield=true_yield,
+                curve_cache=CurveCache()
+            )
+
+            expected = [
+                spread_to_benchmark(
+                    self.pricing_date,
+                    cashflows,
+                    present_value,
+                    workout_date,
+                    MOCK_BENCHMARK_CURVE,
+                    'ns',
+                    true_yield
+                )
+                for cashflows, present_value, workout_date
+                in zip(self.cashflow_lists, self.present_values, self.workout_dates.astype("datetime64[us]").astype(datetime.datetime))
+            ]
+
+            self.assertTrue(np.allclose(result, expected, rtol=0, atol=1e-10))
+
+    def test_yields_to_workout_trailing_zero_cashflows(self):
+
+        # Zero entries of the matrix are dates without a cashflow for that security.
+        workout_dates = np.repeat(self.cashflow_dates[-1], 2)
+
+        result = yields_to_workout(self.pricing_date, self.cashflow_dates, self.cashflow_matrix, self.present_values, workout_dates)
+
+        expected = [
+            yield_to_workout(self.pricing_date, cashflows, present_value, MOCK_SECURITY_CASHFLOW_ARRAY[-1]["date"])
+            for cashflows, present_value in zip(self.cashflow_lists, self.present_values)
+        ]
+
+        self.assertTrue(np.allclose(result, expected, rtol=0, atol=1e-12))
+
+    def test_g_spreads_and_i_spreads(self):
+
+        cache = CurveCache()
+        args = (self.pricing_date, self.cashflow_dates, self.cashflow_matrix, self.present_values, self.workout_dates)
+
+        g_spread_result = g_spreads(*args, MOCK_BENCHMARK_CURVE, 'ns', curve_cache=cache)
+        i_spread_result = i_spreads(*args, MOCK_BENCHMARK_CURVE, 'ns', curve_cache=cache)
+
+        self.assertEqual(g_spread_result.shape, (2,))
+        self.assertTrue(np.array_equal(g_spread_result, i_spread_result))
+        self.assertAlmostEqual(round(g_spread_result[0], 6), 0.825989)
+        self.assertEqual(cache.misses, 1)
+
+    def test_spreads_positional_arguments_match_spread(self):
+
+        cache = CurveCache()
+        args = (self.pricing_date, self.cashflow_dates, self.cashflow_matrix, self.present_values, self.workout_dates)
+
+        for spreads, spread in [(g_spreads, g_spread), (i_spreads, i_spread), (spreads_to_benchmark, spread_to_benchmark)]:
+            result = spreads(*args, MOCK_BENCHMARK_CURVE, 'ns', True, cache, 0.05, None)
+
+            expected = spread(
+                self.pricing_date,
+                self.cashflow_lists[0],
+                self.present_values[0],
+                self.workout_dates[0].astype("datetime64[us]").astype(datetime.datetime),
+                MOCK_BENCHMARK_CURVE,
+                'ns',
+                True,
+                cache,
+                0.05,
+                None
+            )
+            self.assertAlmostEqual(result[0], expected, places=10)
+        self.assertEqual(cache.misses, 1)
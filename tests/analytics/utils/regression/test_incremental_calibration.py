@@ -0,0 +1,108 @@
+import unittest
+
+import numpy as np
+
+from src.analytics.utils.regression.ns import NelsonSiegelCurve
+from src.analytics.utils.regression.nss import NelsonSiegelSvenssonCurve
+from src.analytics.utils.regression.calibrate import (
+    calibrate_ns_ols_grid,
+    calibrate_nss_ols_grid
+)
+from src.analytics.utils.regression.incremental import IncrementalCalibrator
+
+
+class TestIncrementalCalibration(unittest.TestCase):
+    '''Tests for re-calibration after single quote updates.'''
+
+    def setUp(self):
+        self.t = np.array([0.25, 0.5, 1, 2, 3, 5, 7, 10, 15, 20, 30.0])
+        self.y = NelsonSiegelSvenssonCurve(0.04, -0.02, 0.01, -0.015, 1.5, 6.0)(self.t)
+        self.keys = [f'T{i}' for i in range(self.t.size)]
+
+    def rmse(self, curve, y):
+        return np.sqrt(np.mean((curve(self.t) - y)**2))
+
+    def test_update_matches_full_calibration(self):
+        '''Test incremental updates fit within a tenth of a basis point
+           of calibrating from scratch.'''
+        for curve_type, calibrate in (('NS', calibrate_ns_ols_grid),
+                                      ('NSS', calibrate_nss_ols_grid)):
+            calibrator = IncrementalCalibrator(self.t, self.y, curve_type)
+            y = self.y.copy()
+            for index, change in ((3, 0.0002), (9, -0.0003), (0, 0.0001)):
+                y[index] += change
+                curve, _ = calibrator.update(index, y[index])
+                expected, _ = calibrate(self.t, y)
+                self.assertLessEqual(self.rmse(curve, y),
+                                     self.rmse(expected, y) + 1e-5)
+            np.testing.assert_array_equal(calibrator.y, y)
+
+    def test_recalibrate(self):
+        '''Test recalibrating from scratch to the updated quotes.'''
+        calibrator = IncrementalCalibrator(self.t, self.y, 'NSS')
+        y = self.y.copy()
+        y[9] = 0.045
+        calibrator.update(9, y[9])
+        expected, _ = calibrate_nss_ols_grid(self.t, y)
+        curve = calibrator.recalibrate()
+        self.assertEqual(curve, expected)
+        self.assertIs(calibrator.curve, curve)
+
+    def test_update_by_key_and_deltas(self):
+        '''Test updates addressed by key and the returned parameter deltas.'''
+        calibrator = IncrementalCalibrator(self.t, self.y, 'NS', keys=self.keys)
+        previous = calibrator.curve
+        curve, deltas = calibrator.update_key('T5', self.y[5] + 0.001)
+
+        self.assertIsInstance(curve, NelsonSiegelCurve)
+        self.assertIs(calibrator.curve, curve)
+        self.assertEqual(set(deltas), {'beta0', 'beta1', 'beta2', 'tau'})
+        for name, delta in deltas.items():
+            self.assertAlmostEqual(delta, getattr(curve, name) - getattr(previous, name))
+        self.assertEqual(calibrator.y[5], self.y[5] + 0.001)
+
+    def test_integer_keys_and_positions(self):
+        '''Test integer keys (e.g. tenor days) are never read as positions.'''
+        keys = list(range(self.t.size))[::-1]
+        calibrator = IncrementalCalibrator(self.t, self.y, 'NS', keys=keys)
+
+        calibrator.update_key(0, self.y[-1] + 0.001)
+        self.assertEqual(calibrator.y[-1], self.y[-1] + 0.001)
+        self.assertEqual(calibrator.y[0], self.y[0])
+
+        calibrator.update(0, self.y[0] + 0.001)
+        self.assertEqual(calibrator.y[0], self.y[0] + 0.001)
+
+        with self.assertRaises(AssertionError):
+            calibrator.update_key(self.t.size, self.y[0])
+        with self.assertRaises(AssertionError):
+            calibrator.update('T0', self.y[0])
+
+    def test_unchanged_quote(self):
+        '''Test re-submitting the current quote leaves the curve in place.'''
+        calibrator = IncrementalCalibrator(self.t, self.y, 'NSS', keys=self.keys)
+        _, deltas = calibrator.update_key('T2', self.y[2])
+        for delta in deltas.values():
+            self.assertAlmostEqual(delta, 0, places=6)
+
+    def test_small_update_keeps_taus(self):
+        '''Test an update within the refit threshold moves only the
+           betas, to the least squares fit at the previous taus.'''
+        calibrator = IncrementalCalibrator(self.t, self.y, 'NSS')
+        previous = calibrator.curve
+        y = self.y.copy()
+        y[4] += 1e-6
+        curve, _ = calibrator.update(4, y[4])
+
+        self.assertEqual((curve.tau1, curve.tau2), (previous.tau1, previous.tau2))
+        betas = np.linalg.lstsq(curve.factor_matrix(self.t), y, rcond=None)[0]
+        np.testing.assert_allclose([curve.beta0, curve.beta1, curve.beta2, curve.beta3],
+                                   betas, rtol=0, atol=1e-12)
+
+    def test_invalid_curve_type(self):
+        with self.assertRaises(AssertionError):
+            IncrementalCalibrator(self.t, self.y, 'SPLINE')
+
+
+if __name__ == '__main__':
+    unittest.main()
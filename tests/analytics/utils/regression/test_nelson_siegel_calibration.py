@@ -6,7 +6,10 @@ from src.analytics.utils.regression.ns import NelsonSiegelCurve
 from src.analytics.utils.regression.calibrate import (
     betas_ns_ols, 
     errorfn_ns_ols,
-    calibrate_ns_ols
+    calibrate_ns_ols,
+    errorfn_grad_ns_ols,
+    calibrate_ns_ols_gradient,
+    calibrate_ns_ols_grid
 )
 
 
@@ -75,3 +78,59 @@ class TestNelsonSiegelCurveCalibration(unittest.TestCase):
         self.assertAlmostEqual(self.y.beta1, y_hat.beta1, places=places_beta)
         self.assertAlmostEqual(self.y.beta2, y_hat.beta2, places=places_beta)
         self.assertAlmostEqual(self.y.tau, y_hat.tau, places=places_tau)
+
+    def test_nelson_siegel_ols_errorfn_gradient(self):
+        '''Test analytic gradient of the ols based error function
+           against central finite differences.
+        '''
+        t = np.linspace(0, 30)
+        y_target = self.y(t) + 0.001 * np.sin(t)
+        h = 1e-6
+        for tau in [0.5, 2.0, 7.0]:
+            error, gradient = errorfn_grad_ns_ols(tau, t, y_target)
+            numerical = (errorfn_ns_ols(tau + h, t, y_target)
+                         - errorfn_ns_ols(tau - h, t, y_target)) / (2 * h)
+            self.assertAlmostEqual(error, errorfn_ns_ols(tau, t, y_target), places=15)
+            self.assertAlmostEqual(gradient[0], numerical, places=9)
+
+    def test_nelson_siegel_ols_gradient_calibration(self):
+        '''Test gradient based calibration of Nelson-Siegel model,
+           including a warm start from a previous calibration.
+        '''
+        t = np.linspace(0, 30)
+        y_target = self.y(t)
+        places_beta = 6
+        places_tau = 6
+        for tau0 in [0.5, 2.0, 5, 10, 20]:
+            y_hat, opt_res = calibrate_ns_ols_gradient(t, y_target, tau0=tau0)
+            self.assertTrue(opt_res.success)
+            self.assertAlmostEqual(self.y.beta0, y_hat.beta0, places=places_beta)
+            self.assertAlmostEqual(self.y.beta1, y_hat.beta1, places=places_beta)
+            self.assertAlmostEqual(self.y.beta2, y_hat.beta2, places=places_beta)
+            self.assertAlmostEqual(self.y.tau, y_hat.tau, places=places_tau)
+        y_warm, opt_res_warm = calibrate_ns_ols_gradient(
+            t, y_target * 1.001, previous_curve=y_hat)
+        self.assertAlmostEqual(self.y.tau, y_warm.tau, places=places_tau)
+        self.assertLessEqual(opt_res_warm.nit, opt_res.nit)
+        self.assertEqual(opt_res_warm.starts, 1)
+        self.assertGreater(opt_res_warm.elapsed_seconds, 0)
+
+    def test_nelson_siegel_ols_grid_calibration(self):
+        '''Test grid search based calibration of Nelson-Siegel model,
+           which needs no start value and always succeeds.
+        '''
+        t = np.linspace(0, 30)
+        y_target = self.y(t)
+        y_hat, opt_res = calibrate_ns_ols_grid(t, y_target)
+        self.assertTrue(opt_res.success)
+        self.assertAlmostEqual(self.y.beta0, y_hat.beta0, places=10)
+        self.assertAlmostEqual(self.y.beta1, y_hat.beta1, places=10)
+        self.assertAlmostEqual(self.y.beta2, y_hat.beta2, places=10)
+        self.assertAlmostEqual(self.y.tau, y_hat.tau, places=10)
+        self.assertAlmostEqual(opt_res.x[0], y_hat.tau, places=15)
+        # Without polishing the fit is the best grid point.
+        tau_grid = np.array([1.0, 2.0, 3.0])
+        y_grid, opt_res = calibrate_ns_ols_grid(t, y_target, tau_grid=tau_grid,
+                                                iterations=0)
+        self.assertEqual(y_grid.tau, 2.0)
+
@@ -6,7 +6,10 @@ from src.analytics.utils.regression.nss import NelsonSiegelSvenssonCurve
 from src.analytics.utils.regression.calibrate import (
     betas_nss_ols, 
     errorfn_nss_ols,
-    calibrate_nss_ols
+    calibrate_nss_ols,
+    errorfn_grad_nss_ols,
+    calibrate_nss_ols_gradient,
+    calibrate_nss_ols_grid
 )
 
 class TestNelsonSiegelSvenssonCurveCalibration(unittest.TestCase):
@@ -64,3 +67,54 @@ class TestNelsonSiegelSvenssonCurveCalibration(unittest.TestCase):
         self.assertAlmostEqual(self.y.beta3, y_hat.beta3, places=places_beta)
         self.assertAlmostEqual(self.y.tau1, y_hat.tau1, places=places_tau)
         self.assertAlmostEqual(self.y.tau2, y_hat.tau2, places=places_tau)
+
+    def test_nelson_siegel_svensson_ols_errorfn_gradient(self):
+        '''Test analytic gradient of the ols based error function
+           against central finite differences.
+        '''
+        t = np.linspace(0, 30)
+        y_target = self.y(t) + 0.001 * np.cos(t)
+        tau = np.array([1.5, 4.0])
+        h = 1e-6
+        error, gradient = errorfn_grad_nss_ols(tau, t, y_target)
+        self.assertAlmostEqual(error, errorfn_nss_ols(tau, t, y_target), places=15)
+        for i, step in enumerate(np.eye(2) * h):
+            numerical = (errorfn_nss_ols(tau + step, t, y_target)
+                         - errorfn_nss_ols(tau - step, t, y_target)) / (2 * h)
+            self.assertAlmostEqual(gradient[i], numerical, places=9)
+
+    def test_nelson_siegel_svensson_ols_gradient_calibration(self):
+        '''Test gradient based calibration of Nelson-Siegel-Svensson
+           model from the default start value, with multiple starts and
+           warm started from the result.
+        '''
+        t = np.linspace(0, 30)
+        y_target = self.y(t)
+        places = 5
+        for multi_start in [0, 6]:
+            y_hat, opt_res = calibrate_nss_ols_gradient(
+                t, y_target, multi_start=multi_start)
+            self.assertEqual(opt_res.starts, 1 + multi_start)
+            self.assertGreaterEqual(opt_res.nit_total, opt_res.nit)
+            self.assertAlmostEqual(self.y.beta0, y_hat.beta0, places=places)
+            self.assertAlmostEqual(self.y.beta3, y_hat.beta3, places=places)
+            self.assertAlmostEqual(self.y.tau1, y_hat.tau1, places=places)
+            self.assertAlmostEqual(self.y.tau2, y_hat.tau2, places=places)
+        y_warm, opt_res_warm = calibrate_nss_ols_gradient(
+            t, y_target, previous_curve=self.y)
+        self.assertEqual(opt_res_warm.nit, 0)
+        self.assertAlmostEqual(self.y.tau1, y_warm.tau1, places=12)
+
+    def test_nelson_siegel_svensson_ols_grid_calibration(self):
+        '''Test grid search based calibration of Nelson-Siegel-Svensson
+           model, which needs no start values and always succeeds.
+        '''
+        t = np.linspace(0, 30)
+        y_target = self.y(t)
+        y_hat, opt_res = calibrate_nss_ols_grid(t, y_target)
+        self.assertTrue(opt_res.success)
+        self.assertLess(opt_res.fun, 1e-20)
+        self.assertAlmostEqual(self.y.beta0, y_hat.beta0, places=8)
+        self.assertAlmostEqual(self.y.tau1, y_hat.tau1, places=6)
+        self.assertAlmostEqual(self.y.tau2, y_hat.tau2, places=6)
+
@@ -89,3 +89,76 @@ class TestNelsonSiegelSvenssonCurveImplementation(unittest.TestCase):
         fmat = self.y.factor_matrix(t)
         self.assertEqual((n, 4), fmat.shape)
         self.assertEqual((4,), self.y.factor_matrix(0.123).shape)
+
+    def test_factors_do_not_modify_input(self):
+        '''Test that array evaluation leaves the input times untouched'''
+        t = np.linspace(0, 25, 11)
+        t_before = t.copy()
+        self.y.factors(t)
+        self.y.factor_matrix(t)
+        self.y.evaluate(t)
+        np.testing.assert_array_equal(t, t_before)
+
+    def test_factors_into_buffer(self):
+        '''Test factor loadings and matrix written into given buffers'''
+        t = np.linspace(0, 25, 11)
+        out = np.empty((3, t.size))
+        factors = self.y.factors(t, out=out)
+        for factor, expected in zip(factors, self.y.factors(t)):
+            self.assertTrue(np.shares_memory(factor, out))
+            np.testing.assert_allclose(factor, expected)
+        matrix_out = np.empty((t.size, 4))
+        matrix = self.y.factor_matrix(t, out=matrix_out)
+        self.assertIs(matrix, matrix_out)
+        np.testing.assert_allclose(matrix[1], self.y.factor_matrix(t[1]))
+
+    def test_evaluate(self):
+        '''Test one pass evaluation of zero, forward and discount factors'''
+        t = np.linspace(0, 30, 10001)
+        out = np.empty((3, t.size))
+        zero, forward, discount = self.y.evaluate(t, out=out)
+        self.assertTrue(np.shares_memory(zero, out))
+        np.testing.assert_allclose(zero, self.y.zero(t), rtol=0, atol=1e-15)
+        np.testing.assert_allclose(forward, self.y.forward(t), rtol=0, atol=1e-15)
+        np.testing.assert_allclose(discount, (1 + self.y.zero(t)) ** -t)
+        discount = self.y.evaluate(t, compounding='continuous')[2]
+        np.testing.assert_allclose(discount, np.exp(-self.y.zero(t) * t))
+
+    def test_discount_factor(self):
+        '''Test discount factors for scalar and array times'''
+        t = np.linspace(0, 30, 31)
+        np.testing.assert_allclose(self.y.discount_factor(t),
+                                   (1 + self.y.zero(t)) ** -t)
+        np.testing.assert_allclose(self.y.discount_factor(t, 'continuous'),
+                                   np.exp(-self.y.zero(t) * t))
+        self.assertAlmostEqual(self.y.discount_factor(5.0),
+                               self.y.discount_factor(t)[5], places=15)
+        self.assertEqual(self.y.discount_factor(0.0), 1.0)
+
+    def test_forward_and_par_rates_of_flat_curve(self):
+        '''Test forward and par rates of a flat curve against the rate'''
+        flat = NelsonSiegelSvenssonCurve(0.05, 0, 0, 0, 2.0, 5.0)
+        t = np.array([1.0, 2.5, 10.0])
+        np.testing.assert_allclose(flat.forward_rate(t, t + 1), 0.05)
+        np.testing.assert_allclose(flat.forward_rate(t, t), 0.05)
+        np.testing.assert_allclose(flat.par_rate(t[[0, 2]], freq=1), 0.05)
+        self.assertAlmostEqual(flat.par_rate(5.0, freq=2), 2 * (1.05 ** 0.5 - 1),
+                               places=14)
+
+    def test_forward_rate_limit_and_par_bond_price(self):
+        '''Test the forward rate over a vanishing period and that a bond
+           paying the par rate is priced at par
+        '''
+        for compounding in ['annual', 'continuous']:
+            self.assertAlmostEqual(
+                self.y.forward_rate(3.0, 3.0, compounding),
+                self.y.forward_rate(3.0, 3.0 + 1e-7, compounding), places=7)
+        maturity = 7.25
+        coupon = self.y.par_rate(maturity, freq=2)
+        coupon_times = maturity - np.arange(15) / 2
+        price = coupon / 2 * self.y.discount_factor(coupon_times).sum() \
+            + self.y.discount_factor(maturity)
+        self.assertAlmostEqual(price, 1.0, places=14)
+        with self.assertRaises(AssertionError):
+            self.y.par_rate(0.0)
+
@@ -0,0 +1,91 @@
+import unittest
+
+import numpy as np
+
+from src.analytics.utils.regression.ns import NelsonSiegelCurve
+from src.analytics.utils.regression.nss import NelsonSiegelSvenssonCurve
+from src.analytics.utils.regression.calibrate import calibrate_ns_ols
+from src.analytics.utils.regression.panel import (
+    calibrate_ns_panel,
+    calibrate_nss_panel,
+    grid_lstsq,
+    ns_factor_matrices
+)
+
+
+class TestPanelCalibration(unittest.TestCase):
+    '''Tests for vectorized calibration of a panel of curves.'''
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.t = np.array([0.25, 0.5, 1, 2, 3, 5, 7, 10, 15, 20, 30.0])
+        days = 40
+        self.ns_params = np.column_stack([
+            rng.uniform(0.02, 0.05, days),
+            rng.uniform(-0.03, 0.01, days),
+            rng.uniform(-0.02, 0.03, days),
+            rng.uniform(0.5, 8.0, days)
+        ])
+        self.ns_rates = np.array([
+            NelsonSiegelCurve(*params)(self.t.copy())
+            for params in self.ns_params
+        ])
+
+    def test_grid_lstsq_matches_factor_matrix(self):
+        '''Test batched grid betas against single curve factor matrices.'''
+        taus = np.array([0.5, 2.0, 6.0])
+        factor_grid = ns_factor_matrices(self.t, taus)
+        for i, tau in enumerate(taus):
+            expected = NelsonSiegelCurve(0, 0, 0, tau).factor_matrix(self.t.copy())
+            np.testing.assert_allclose(factor_grid[i], expected)
+        betas, sse = grid_lstsq(factor_grid, self.ns_rates)
+        self.assertEqual(betas.shape, (3, 3, len(self.ns_rates)))
+        self.assertEqual(sse.shape, (3, len(self.ns_rates)))
+
+    def test_ns_panel_recovery(self):
+        '''Test recovery of Nelson-Siegel parameters for every day.'''
+        panel = calibrate_ns_panel(self.t, self.ns_rates)
+        self.assertEqual(len(panel), len(self.ns_rates))
+        np.testing.assert_allclose(panel.tau, self.ns_params[:, 3], rtol=1e-4)
+        np.testing.assert_allclose(panel.beta0, self.ns_params[:, 0], atol=1e-6)
+        np.testing.assert_allclose(panel.zero(self.t), self.ns_rates, atol=1e-8)
+        self.assertTrue(np.all(panel.sse < 1e-14))
+
+    def test_ns_panel_matches_single_calibration(self):
+        '''Test panel fit of noisy curves is as good as one by one fits.'''
+        rng = np.random.default_rng(11)
+        noisy_rates = self.ns_rates + rng.normal(0, 1e-4, self.ns_rates.shape)
+        panel = calibrate_ns_panel(self.t, noisy_rates)
+        for i in range(0, len(noisy_rates), 10):
+            curve, _ = calibrate_ns_ols(self.t, noisy_rates[i], tau0=panel.tau[i])
+            single_sse = np.sum((curve(self.t.copy()) - noisy_rates[i])**2)
+            self.assertLessEqual(panel.sse[i], single_sse * (1 + 1e-6))
+            self.assertIsInstance(panel.curve(i), NelsonSiegelCurve)
+
+    def test_ns_panel_without_refinement_uses_grid(self):
+        '''Test that without refinement taus are grid points.'''
+        tau_grid = np.geomspace(0.1, 20.0, 30)
+        panel = calibrate_ns_panel(self.t, self.ns_rates, tau_grid=tau_grid,
+                                   refine=False)
+        self.assertTrue(np.all(np.isin(panel.tau, tau_grid)))
+
+    def test_nss_panel_fit(self):
+        '''Test Nelson-Siegel-Svensson panel fits generated curves.'''
+        curves = [
+            NelsonSiegelSvenssonCurve(0.04, -0.01, 0.02, -0.015, 1.2, 6.0),
+            NelsonSiegelSvenssonCurve(0.03, 0.01, -0.02, 0.01, 0.8, 4.0),
+            NelsonSiegelSvenssonCurve(0.05, -0.02, 0.01, 0.02, 2.5, 12.0)
+        ]
+        rates = np.array([curve(self.t.copy()) for curve in curves])
+        panel = calibrate_nss_panel(self.t, rates)
+        np.testing.assert_allclose(panel.zero(self.t), rates, atol=1e-6)
+        self.assertIsInstance(panel.curve(0), NelsonSiegelSvenssonCurve)
+
+    def test_panel_shape_mismatch(self):
+        '''Test that mismatching tenors and rate columns are rejected.'''
+        with self.assertRaises(AssertionError):
+            calibrate_ns_panel(self.t[:-1], self.ns_rates)
+
+
+if __name__ == '__main__':
+    unittest.main()
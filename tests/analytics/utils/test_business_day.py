@@ -0,0 +1,88 @@
+import unittest
+import datetime
+
+import numpy as np
+
+from src.analytics.utils.business_day import BusinessDayCalendar, WEEKEND_CALENDAR
+
+
+class BusinessDayCalendarTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.holidays = ["2020-12-25", "2020-12-28", "2021-01-01", "2021-04-02", "2021-04-05"]
+        self.calendar = BusinessDayCalendar(self.holidays)
+        self.numpy_calendar = np.busdaycalendar(holidays=self.holidays)
+        rng = np.random.default_rng(5)
+        self.dates = np.datetime64("2015-01-01") + rng.integers(0, 4000, 20000)
+        self.number_of_days = rng.integers(-25, 25, self.dates.size)
+
+    def test_is_business_day(self):
+        self.assertEqual(
+            self.calendar.is_business_day(np.array(["2020-12-24", "2020-12-25", "2020-12-26", "2020-12-29"], dtype="datetime64[D]")).tolist(),
+            [True, False, False, True]
+        )
+        self.assertFalse(self.calendar.is_business_day(datetime.datetime(2021, 4, 2, 15)))
+        np.testing.assert_array_equal(
+            self.calendar.is_business_day(self.dates), np.is_busday(self.dates, busdaycal=self.numpy_calendar)
+        )
+
+    def test_add_business_days(self):
+        self.assertEqual(self.calendar.add_business_days(np.datetime64("2020-12-24"), 1), np.datetime64("2020-12-29"))
+        self.assertEqual(self.calendar.add_business_days(np.datetime64("2021-01-04"), -3), np.datetime64("2020-12-29"))
+        # Non business days roll towards the move first.
+        self.assertEqual(self.calendar.add_business_days(np.datetime64("2020-12-26"), 0), np.datetime64("2020-12-29"))
+        self.assertEqual(self.calendar.add_business_days(np.datetime64("2020-12-26"), -1), np.datetime64("2020-12-23"))
+
+        expected = np.where(
+            self.number_of_days >= 0,
+            np.busday_offset(self.dates, self.number_of_days, roll="forward", busdaycal=self.numpy_calendar),
+            np.busday_offset(self.dates, self.number_of_days, roll="backward", busdaycal=self.numpy_calendar)
+        )
+        np.testing.assert_array_equal(self.calendar.add_business_days(self.dates, self.number_of_days), expected)
+
+    def test_business_days_between(self):
+        end_dates = self.dates + np.abs(self.number_of_days) * 3
+
+        result = self.calendar.business_days_between(self.dates, end_dates)
+
+        np.testing.assert_array_equal(result, np.busday_count(self.dates, end_dates, busdaycal=self.numpy_calendar))
+        np.testing.assert_array_equal(self.calendar.business_days_between(end_dates, self.dates), -result)
+        self.assertEqual(self.calendar.business_days_between(np.datetime64("2020-12-24"), np.datetime64("2021-01-04")), 4)
+
+    def test_business_days_between_reversed(self):
+        end_dates = np.arange("2021-01-01", "2021-02-01", dtype="datetime64[D]")
+        start_dates = end_dates + 10
+
+        result = self.calendar.business_days_between(start_dates, end_dates)
+
+        np.testing.assert_array_equal(result, -np.busday_count(end_dates, start_dates, busdaycal=self.numpy_calendar))
+        self.assertEqual(self.calendar.business_days_between(np.datetime64("2021-01-17"), np.datetime64("2021-01-15")), -1)
+
+    def test_roll(self):
+        numpy_rolls = {
+            "following": "forward",
+            "preceding": "backward",
+            "modified_following": "modifiedfollowing",
+            "modified_preceding": "modifiedpreceding"
+        }
+        for convention, numpy_roll in numpy_rolls.items():
+            np.testing.assert_array_equal(
+                self.calendar.roll(self.dates, convention),
+                np.busday_offset(self.dates, 0, roll=numpy_roll, busdaycal=self.numpy_calendar)
+            )
+
+        # 31 July 2021 is a Saturday: modified following stays in July.
+        self.assertEqual(WEEKEND_CALENDAR.roll(np.datetime64("2021-07-31"), "following"), np.datetime64("2021-08-02"))
+        self.assertEqual(WEEKEND_CALENDAR.roll(np.datetime64("2021-07-31"), "modified_following"), np.datetime64("2021-07-30"))
+
+    def test_invalid_inputs(self):
+        with self.assertRaises(AssertionError):
+            self.calendar.roll(self.dates, "nearest")
+        with self.assertRaises(AssertionError):
+            self.calendar.is_business_day(np.datetime64("2200-01-01"))
+        with self.assertRaises(AssertionError):
+            BusinessDayCalendar(weekmask="0000000")
+
+
+if __name__ == '__main__':
+    unittest.main()
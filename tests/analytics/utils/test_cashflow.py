@@ -1,9 +1,13 @@
 import unittest
 import datetime
 from datetime import ( time )
+from unittest import mock
 import numpy as np
 from src.analytics.utils.cashflow import (
+    CashflowSchedule,
     generate_cashflows, 
+    generate_cashflow_schedule,
+    generate_cashflow_schedules,
     get_most_recent_cashflow,
     match_cashflow_to_discount_curve, 
     sum_cashflows, 
@@ -35,6 +39,30 @@ class CashflowTestCase(unittest.TestCase):
 
         self.assertEqual(result, MOCK_CASHFLOW_AND_DISCOUNT_CURVE)
 
+    def test_match_cashflow_to_discount_curve_interpolate(self):
+
+        cashflows = [
+            {"date": datetime.datetime(2000, 6, 1), "cashflow_value": 500},
+            {"date": datetime.datetime(2001, 1, 1), "cashflow_value": 1000},
+            {"date": datetime.datetime(2001, 7, 2, 12), "cashflow_value": 1500},
+            {"date": datetime.datetime(2006, 1, 1), "cashflow_value": 2000},
+        ]
+        discount_curve = [
+            {"date": datetime.datetime(2002, 1, 1), "discount_rate": 0.06},
+            {"date": datetime.datetime(2001, 1, 1), "discount_rate": 0.04},
+        ]
+
+        self.assertEqual(
+            match_cashflow_to_discount_curve(cashflows, discount_curve),
+            [{"date": datetime.datetime(2001, 1, 1), "cashflow_value": 1000, "discount_rate": 0.04}]
+        )
+
+        result = match_cashflow_to_discount_curve(cashflows, discount_curve, interpolate=True)
+
+        self.assertEqual([obj["date"] for obj in result], [datetime.datetime(2001, 1, 1), datetime.datetime(2001, 7, 2, 12)])
+        self.assertEqual(result[0]["discount_rate"], 0.04)
+        self.assertAlmostEqual(result[1]["discount_rate"], 0.05)
+
     def test_sum_cashflows(self):
 
         result = sum_cashflows(MOCK_SECURITY_CASHFLOW_ARRAY)
@@ -605,7 +633,41 @@ class GenerateCashflowTestCase(unittest.TestCase):
         self.assertTrue(np.allclose(result_total_fixed_cashflows, expected_total_fixed_cashflows, atol=1e-03))
         self.assertTrue(np.allclose(result_total_variable_cashflows, expected_total_variable_cashflows, atol=1e-03))
         self.assertEqual(result_dates, expected_dates)
-    
+
+    def test_generate_cashflows_pricing_date_defaults_to_today(self):
+
+        class FixedToday(datetime.datetime):
+            @classmethod
+            def today(cls):
+                return cls(2000, 1, 1)
+
+        nss_params = MOCK_NSS_CURVE_PARAMETERS
+        underlying_curve = NelsonSiegelSvenssonCurve(*nss_params)
+
+        expected = generate_cashflows(
+            start_date = datetime.datetime(2000, 1, 1),
+            end_date = datetime.datetime(2002, 1, 1),
+            cashflow_freq = "A",
+            face_value = 100.00,
+            coupon_rate_or_margin = 0.03,
+            variable_coupon=True,
+            underlying_curve=underlying_curve,
+            pricing_date=datetime.datetime(2000, 1, 1)
+        )
+        # A default evaluated at import would be a plain datetime of the real date.
+        with mock.patch("datetime.datetime", FixedToday):
+            result = generate_cashflows(
+                start_date = FixedToday(2000, 1, 1),
+                end_date = FixedToday(2002, 1, 1),
+                cashflow_freq = "A",
+                face_value = 100.00,
+                coupon_rate_or_margin = 0.03,
+                variable_coupon=True,
+                underlying_curve=underlying_curve
+            )
+
+        self.assertEqual(result, expected)
+
 class GenerateVariableCouponComponent(unittest.TestCase):
     
     def test_get_variable_coupon_component_input_type_pricing_date(self):
@@ -722,4 +784,265 @@ class GenerateVariableCouponComponent(unittest.TestCase):
         )
         
         self.assertAlmostEqual(result, expected/100, 5)
-        
+
+
+class CashflowScheduleTestCase(unittest.TestCase):
+
+    def test_generate_cashflow_schedule_columns(self):
+
+        result = generate_cashflow_schedule(
+            start_date = datetime.datetime(2000, 1, 1),
+            end_date = datetime.datetime(2002, 1, 1),
+            cashflow_freq = "SA",
+            face_value = 100.00,
+            coupon_rate_or_margin = 0.05
+        )
+
+        self.assertIsInstance(result, CashflowSchedule)
+        self.assertEqual(len(result), 4)
+        self.assertEqual(result.payment_date.dtype, np.dtype("datetime64[D]"))
+        self.assertEqual(result.record_date.dtype, np.dtype("datetime64[D]"))
+        self.assertEqual(result.ex_date.dtype, np.dtype("datetime64[D]"))
+        self.assertEqual(result.total.dtype, np.dtype("float64"))
+        self.assertEqual(result.payment_date.astype(str).tolist(), ["2000-07-01", "2001-01-01", "2001-07-01", "2002-01-01"])
+        self.assertEqual(result.record_date.astype(str).tolist(), ["2000-06-23", "2000-12-24", "2001-06-23", "2001-12-24"])
+        self.assertEqual(result.ex_date.astype(str).tolist(), ["2000-06-22", "2000-12-23", "2001-06-22", "2001-12-23"])
+        self.assertEqual(result.total_coupon_interest.tolist(), [2.5, 2.5, 2.5, 2.5])
+        self.assertEqual(result.total_principal.tolist(), [0.0, 0.0, 0.0, 100.0])
+        self.assertEqual(result.total.tolist(), [2.5, 2.5, 2.5, 102.5])
+
+    def test_generate_cashflow_schedule_day_count(self):
+
+        kwargs = dict(
+            start_date = datetime.datetime(2000, 1, 1),
+            end_date = datetime.datetime(2002, 1, 1),
+            cashflow_freq = "SA",
+            face_value = 100.00,
+            coupon_rate_or_margin = 0.05
+        )
+        act_360 = generate_cashflow_schedule(**kwargs, day_count="ACT/360")
+        thirty_360 = generate_cashflow_schedule(**kwargs, day_count="30/360")
+        act_act_icma = generate_cashflow_schedule(**kwargs, day_count="ACT/ACT ICMA")
+
+        self.assertEqual(act_360.day_count, "ACT/360")
+        np.testing.assert_allclose(act_360.total_coupon_interest, np.array([182, 184, 181, 184]) / 360 * 5.0)
+        np.testing.assert_allclose(thirty_360.total_coupon_interest, [2.5, 2.5, 2.5, 2.5])
+        np.testing.assert_allclose(act_act_icma.total_coupon_interest, [2.5, 2.5, 2.5, 2.5])
+        np.testing.assert_allclose(
+            act_360.years_to_payment(datetime.datetime(2000, 1, 1)), np.array([182, 366, 547, 731]) / 360
+        )
+
+    def test_generate_cashflow_schedule_act_act_icma(self):
+
+        kwargs = dict(
+            start_date = datetime.datetime(2000, 1, 1),
+            end_date = datetime.datetime(2002, 1, 1),
+            cashflow_freq = "SA",
+            face_value = 100.00,
+            coupon_rate_or_margin = 0.01,
+            pricing_date = datetime.datetime(2000, 1, 1)
+        )
+        underlying_curve = NelsonSiegelCurve(5.0, -1.0, 0.0, 2.0)
+        fixed = generate_cashflow_schedule(**kwargs, day_count="ACT/ACT ICMA")
+        variable = generate_cashflow_schedule(**kwargs, variable_coupon=True, underlying_curve=underlying_curve, day_count="ACT/ACT ICMA")
+        act_act = generate_cashflow_schedule(**kwargs, variable_coupon=True, underlying_curve=underlying_curve, day_count="ACT/ACT")
+
+        # Tenors between a pair of dates have no coupon period and are measured ACT/ACT.
+        np.testing.assert_allclose(
+            fixed.years_to_payment(datetime.datetime(2000, 1, 1)), [182/366, 1.0, 1 + 181/365, 2.0]
+        )
+        np.testing.assert_allclose(
+            variable.variable_coupon_interest_component,
+            np.asarray(underlying_curve(fixed.years_to_payment(datetime.datetime(2000, 1, 1)))) / 100 * 100.00 * 0.5
+        )
+        np.testing.assert_allclose(variable.fixed_coupon_interest_component, [0.5, 0.5, 0.5, 0.5])
+        # Same forward rates as ACT/ACT, accrued over ICMA coupon periods of 1/frequency.
+        np.testing.assert_allclose(
+            variable.variable_coupon_interest_component / 0.5,
+            act_act.variable_coupon_interest_component / act_act.fixed_coupon_interest_component * 0.01 * 100.00
+        )
+
+    def test_generate_cashflows_arrears_false(self):
+
+        kwargs = dict(
+            start_date = datetime.datetime(2020, 1, 15),
+            end_date = datetime.datetime(2022, 1, 15),
+            cashflow_freq = "SA",
+            face_value = 100.00,
+            coupon_rate_or_margin = 0.05
+        )
+
+        # Cashflows are generated in arrears whatever the arrears flag.
+        result = generate_cashflows(**kwargs, arrears=False)
+
+        self.assertEqual(
+            [cashflow['date']['payment_date'] for cashflow in result],
+            ["2020-07-15", "2021-01-15", "2021-07-15", "2022-01-15"]
+        )
+        self.assertEqual([cashflow['cashflow']['total'] for cashflow in result], [2.5, 2.5, 2.5, 102.5])
+        self.assertEqual(result, generate_cashflows(**kwargs, arrears=True))
+
+    def test_generate_cashflow_schedule_business_days(self):
+
+        ex_record_config = {
+            "record_date": {
+                "days_before_payment_date": 8,
+                "record_time": 19,
+                "day_type": "business",
+                "time_of_record": time(hour=19)
+            }
+        }
+
+        result = generate_cashflow_schedule(
+            start_date = datetime.datetime(2021, 1, 31),
+            end_date = datetime.datetime(2021, 7, 31),
+            cashflow_freq = "Q",
+            face_value = 100.00,
+            coupon_rate_or_margin = 0.04,
+            ex_record_config = ex_record_config,
+            business_day_convention = "modified_following"
+        )
+
+        # 31 July 2021 is a Saturday, modified following keeps it in July.
+        self.assertEqual(result.payment_date.astype(str).tolist(), ["2021-04-30", "2021-07-30"])
+        self.assertEqual(result.record_date.astype(str).tolist(), ["2021-04-20", "2021-07-20"])
+        self.assertEqual(result.ex_date.astype(str).tolist(), ["2021-04-19", "2021-07-19"])
+
+    def test_generate_cashflow_schedule_stub(self):
+
+        result = generate_cashflow_schedule(
+            start_date = datetime.datetime(2021, 1, 31),
+            end_date = datetime.datetime(2021, 8, 15),
+            cashflow_freq = "Q",
+            face_value = 100.00,
+            coupon_rate_or_margin = 0.04,
+            end_of_month = True,
+            stub = "short_back",
+            day_count = "ACT/365F"
+        )
+
+        self.assertEqual(result.payment_date.astype(str).tolist(), ["2021-04-30", "2021-07-31", "2021-08-15"])
+        np.testing.assert_allclose(result.fixed_coupon_interest_component, 0.04 * 100 * np.array([89, 92, 15]) / 365)
+        self.assertEqual(result.redemption_principal.tolist(), [0.0, 0.0, 100.0])
+
+    def test_cashflow_schedule_to_dict_list(self):
+
+        nss_params = MOCK_NSS_CURVE_PARAMETERS
+        curve = NelsonSiegelSvenssonCurve(
+            nss_params[0], 
+            nss_params[1], 
+            nss_params[2], 
+            nss_params[3],
+            nss_params[4],
+            nss_params[5]
+        )
+        pricing_date = datetime.datetime(2000, 1, 1)
+
+        schedule = generate_cashflow_schedule(
+            start_date = datetime.datetime(2000, 1, 1),
+            end_date = datetime.datetime(2002, 1, 1),
+            cashflow_freq = "A",
+            face_value = 100.00,
+            coupon_rate_or_margin = 0.03,
+            variable_coupon=True,
+            underlying_curve = curve,
+            pricing_date = pricing_date
+        )
+        result = schedule.to_dict_list()
+
+        self.assertEqual(result[0]['date'], {"payment_date": "2001-01-01", "record_date": "2000-12-24", "ex_date": "2000-12-23"})
+        for cashflow in result:
+            expected_variable = _get_variable_coupon_component(
+                pricing_date,
+                datetime.datetime.strptime(cashflow['date']['payment_date'], "%Y-%m-%d"),
+                curve
+            ) * 100.00
+            self.assertAlmostEqual(cashflow['cashflow']['coupon_interest']['variable_coupon_interest_component'], expected_variable, 12)
+        self.assertAlmostEqual(result[-1]['cashflow']['principal']['total_principal'], 100.00)
+
+
+class GenerateCashflowSchedulesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.security_terms = np.array(
+            [
+                ("BOND_A", "2000-01-01", "2002-01-01", "SA", 100.00, 0.05),
+                ("BOND_B", "2000-01-31", "2000-06-30", "M", 1000.00, 0.06),
+                ("BOND_C", "2000-07-01", "2002-01-01", "SA", 100.00, 0.04),
+                ("BOND_D", "2000-02-29", "2003-03-01", "A", 100.00, 0.03),
+            ],
+            dtype=[
+                ("security_id", "U6"),
+                ("start_date", "datetime64[D]"),
+                ("end_date", "datetime64[D]"),
+                ("cashflow_freq", "U2"),
+                ("face_value", "f8"),
+                ("coupon_rate_or_margin", "f8"),
+            ]
+        )
+
+    def test_generate_cashflow_schedules_matches_generate_cashflows(self):
+
+        result = generate_cashflow_schedules(self.security_terms)
+
+        self.assertEqual(result.security_id.tolist(), ["BOND_A"]*4 + ["BOND_B"]*5 + ["BOND_C"]*3 + ["BOND_D"]*3)
+        for terms in self.security_terms:
+            expected = generate_cashflows(
+                start_date = terms["start_date"].astype("datetime64[us]").astype(datetime.datetime),
+                end_date = terms["end_date"].astype("datetime64[us]").astype(datetime.datetime),
+                cashflow_freq = str(terms["cashflow_freq"]),
+                face_value = float(terms["face_value"]),
+                coupon_rate_or_margin = float(terms["coupon_rate_or_margin"])
+            )
+            self.assertEqual(result.select(terms["security_id"]).to_dict_list(), expected)
+
+    def test_generate_cashflow_schedules_dataframe_input(self):
+        import pandas as pd
+
+        security_terms = pd.DataFrame(self.security_terms.tolist(), columns=self.security_terms.dtype.names)
+        security_terms["variable_coupon"] = [False, False, False, True]
+
+        result = generate_cashflow_schedules(
+            security_terms,
+            underlying_curve = NelsonSiegelCurve(0.02, 0.00, 0.00, 1.0),
+            pricing_date = datetime.datetime(2000, 1, 1)
+        )
+        bond_d = result.select("BOND_D")
+
+        self.assertEqual(bond_d.payment_date.astype(str).tolist(), ["2001-02-28", "2002-02-28", "2003-02-28"])
+        self.assertTrue(np.allclose(bond_d.variable_coupon_interest_component, 0.02))
+        self.assertTrue(np.allclose(result.select("BOND_A").variable_coupon_interest_component, 0.00))
+        self.assertEqual(bond_d.total_principal.tolist(), [0.0, 0.0, 100.0])
+
+    def test_generate_cashflow_schedules_day_count(self):
+
+        result = generate_cashflow_schedules(self.security_terms, day_count="ACT/360")
+
+        self.assertEqual(result.day_count, "ACT/360")
+        for terms in self.security_terms:
+            expected = generate_cashflow_schedule(
+                start_date = terms["start_date"].astype("datetime64[us]").astype(datetime.datetime),
+                end_date = terms["end_date"].astype("datetime64[us]").astype(datetime.datetime),
+                cashflow_freq = str(terms["cashflow_freq"]),
+                face_value = float(terms["face_value"]),
+                coupon_rate_or_margin = float(terms["coupon_rate_or_margin"]),
+                day_count = "ACT/360"
+            )
+            selected = result.select(terms["security_id"])
+            self.assertEqual(selected.day_count, "ACT/360")
+            np.testing.assert_allclose(selected.total, expected.total)
+
+    def test_cashflow_schedule_to_matrix(self):
+
+        security_ids, payment_dates, matrix = generate_cashflow_schedules(self.security_terms).to_matrix()
+
+        self.assertEqual(security_ids.tolist(), ["BOND_A", "BOND_B", "BOND_C", "BOND_D"])
+        self.assertEqual(matrix.shape, (4, payment_dates.size))
+        self.assertTrue(np.all(np.diff(payment_dates) > np.timedelta64(0, "D")))
+        self.assertAlmostEqual(matrix[0].sum(), 110.00)
+        self.assertAlmostEqual(matrix[2, payment_dates == np.datetime64("2002-01-01")][0], 102.00)
+
+    def test_generate_cashflow_schedules_missing_column(self):
+
+        with self.assertRaises(Exception):
+            generate_cashflow_schedules(self.security_terms[["security_id", "start_date"]])
@@ -7,12 +7,16 @@ from src.analytics.utils.regression.nss import NelsonSiegelSvenssonCurve
 
 from src.analytics.utils.curve import (
     bootstrap_curve,
+    bootstrap_zero_rates,
     construct_ns_curve,
     ns_curve_output,
     construct_nss_curve,
     nss_curve_output,
+    incremental_curve_calibrator,
     convert_curve_dict_list_to_lists,
     forward_curve,
+    forward_curve_arrays,
+    forward_curves,
     curve_set,
     _clean_curve_tenor_round
 )
@@ -24,7 +28,12 @@ from ..helper.testConstants import (
     MOCK_BENCHMARK_CURVE_CLEAN_TENOR
 )
 
-from src.analytics.utils.regression.calibrate import calibrate_ns_ols, calibrate_nss_ols
+from src.analytics.utils.regression.calibrate import (
+    calibrate_ns_ols,
+    calibrate_nss_ols,
+    calibrate_ns_ols_gradient,
+    calibrate_nss_ols_gradient
+)
 
 class CurveTestCase(unittest.TestCase):
     def test_construct_ns_curve(self):
@@ -56,6 +65,91 @@ class CurveTestCase(unittest.TestCase):
         
         self.assertEqual(result[12], {'tenor': 1.0027855153203342, 'rate': -0.006983785586190569})
 
+    def test_construct_curves_with_grid_calibration(self):
+        market_curve = MOCK_BENCHMARK_CURVE
+        time_array = np.array(MOCK_BENCHMARK_CURVE_AS_YEARS_AS_LISTS[0])
+        rate_array = np.array(MOCK_BENCHMARK_CURVE_AS_YEARS_AS_LISTS[1])
+
+        ns_result = construct_ns_curve(datetime.datetime(1999, 1, 1), market_curve, calibration="GRID")
+        nss_result = construct_nss_curve(datetime.datetime(1999, 1, 1), market_curve, calibration="GRID")
+        ns_expected, opt = calibrate_ns_ols(time_array, rate_array, tau0=1.0)
+
+        self.assertIsInstance(ns_result, NelsonSiegelCurve)
+        self.assertIsInstance(nss_result, NelsonSiegelSvenssonCurve)
+        self.assertLessEqual(
+            np.sum((ns_result(time_array) - rate_array)**2),
+            np.sum((ns_expected(time_array) - rate_array)**2) + 1e-12
+        )
+
+        with self.assertRaises(AssertionError):
+            construct_ns_curve(datetime.datetime(1999, 1, 1), market_curve, calibration="BFGS")
+
+    def test_construct_curves_with_gradient_calibration(self):
+        pricing_date = datetime.datetime(1999, 1, 1)
+        market_curve = MOCK_BENCHMARK_CURVE
+        time_array = np.array(MOCK_BENCHMARK_CURVE_AS_YEARS_AS_LISTS[0])
+        rate_array = np.array(MOCK_BENCHMARK_CURVE_AS_YEARS_AS_LISTS[1])
+
+        ns_result = construct_ns_curve(pricing_date, market_curve, calibration="GRADIENT")
+        nss_result = construct_nss_curve(pricing_date, market_curve, calibration="GRADIENT")
+        ns_expected, opt = calibrate_ns_ols_gradient(time_array, rate_array, tau0=1.0)
+        nss_expected, opt = calibrate_nss_ols_gradient(time_array, rate_array, tau0=(2.2, 3.1))
+
+        self.assertEqual(ns_result, ns_expected)
+        self.assertEqual(nss_result, nss_expected)
+
+        # Warm start and multi start are passed through to the calibrators.
+        previous_curve = NelsonSiegelCurve(0.05, -0.01, 0.0, 0.5)
+        self.assertEqual(
+            construct_ns_curve(pricing_date, market_curve, calibration="GRADIENT", previous_curve=previous_curve),
+            calibrate_ns_ols_gradient(time_array, rate_array, previous_curve=previous_curve)[0]
+        )
+        self.assertEqual(
+            construct_nss_curve(pricing_date, market_curve, calibration="GRADIENT", previous_curve=nss_result, multi_start=3),
+            calibrate_nss_ols_gradient(time_array, rate_array, previous_curve=nss_result, multi_start=3)[0]
+        )
+
+        with self.assertRaises(AssertionError):
+            construct_nss_curve(pricing_date, market_curve, calibration="OLS", multi_start=3)
+
+    def test_construct_curves_with_day_count(self):
+        pricing_date = datetime.datetime(1999, 1, 1)
+        market_curve = [
+            {'date': datetime.datetime(1999, 4, 1), 'rate': 0.01},
+            {'date': datetime.datetime(1999, 10, 1), 'rate': 0.0125},
+        ] + MOCK_BENCHMARK_CURVE
+        time_array = np.array([90, 273] + [(point['date'] - pricing_date).days for point in MOCK_BENCHMARK_CURVE]) / 365
+        rate_array = np.array([point['rate'] for point in market_curve])
+
+        ns_result = construct_ns_curve(pricing_date, market_curve, calibration="GRID", day_count="ACT/365F")
+        nss_result = construct_nss_curve(pricing_date, market_curve, calibration="GRID", day_count="ACT/365F")
+        ns_expected, opt = calibrate_ns_ols(time_array, rate_array, tau0=1.0)
+
+        self.assertIsInstance(nss_result, NelsonSiegelSvenssonCurve)
+        self.assertLessEqual(
+            np.sum((ns_result(time_array) - rate_array)**2),
+            np.sum((ns_expected(time_array) - rate_array)**2) + 1e-12
+        )
+
+        with self.assertRaises(AssertionError):
+            construct_ns_curve(pricing_date, market_curve, day_count="BUS/252")
+
+    def test_incremental_curve_calibrator(self):
+        market_curve = MOCK_BENCHMARK_CURVE
+        time_array = np.array(MOCK_BENCHMARK_CURVE_AS_YEARS_AS_LISTS[0])
+
+        calibrator = incremental_curve_calibrator(datetime.datetime(1999, 1, 1), market_curve)
+        np.testing.assert_allclose(calibrator.t, time_array)
+
+        quote = market_curve[3]
+        curve, deltas = calibrator.update_key(quote['date'], quote['rate'] + 0.0005)
+        self.assertIsInstance(curve, NelsonSiegelCurve)
+        self.assertEqual(calibrator.y[3], quote['rate'] + 0.0005)
+        self.assertEqual(set(deltas), {'beta0', 'beta1', 'beta2', 'tau'})
+
+        with self.assertRaises(AssertionError):
+            incremental_curve_calibrator(datetime.datetime(1999, 1, 1), market_curve, curve_type="SPLINE")
+
     def test_construct_nss_curve(self):
 
         market_curve = MOCK_BENCHMARK_CURVE
@@ -140,6 +234,37 @@ class BootstrapCurveTestCase(unittest.TestCase):
 
         self.assertEqual(result, expected)
 
+    def test_bootstrap_curve_without_rounding(self):
+
+        curve = [
+            {"tenor": 1.0, "rate": 0.05},
+            {"tenor": 2.0, "rate": 0.0597},
+            {"tenor": 3.0, "rate": 0.0691},
+            {"tenor": 4.00, "rate": 0.0781},
+        ]
+
+        result = bootstrap_curve(curve, round_to=None)
+
+        self.assertEqual([obj['tenor'] for obj in result], [1.0, 2.0, 3.0, 4.0])
+        self.assertTrue(np.allclose([obj['rate'] for obj in result], [0.05, 0.06, 0.07, 0.08], atol=1e-4))
+        self.assertNotEqual(result[-1]['rate'], round(result[-1]['rate'], 4))
+
+    def test_bootstrap_zero_rates_matches_full_recomputation(self):
+
+        tenors = np.arange(1, 301) / 10
+        rates = 0.001 + 0.002 * np.sqrt(tenors / 30)
+
+        result = bootstrap_zero_rates(tenors, rates)
+
+        expected = [rates[0]]
+        for k in range(1, 40):
+            cashflow_sum = sum(rates[k] / (1 + expected[i])**tenors[i] for i in range(k))
+            expected.append((((1 + rates[k]) / (1 - cashflow_sum))**(1 / tenors[k])) - 1)
+
+        self.assertEqual(result.shape, tenors.shape)
+        self.assertTrue(np.allclose(result[:40], expected, rtol=0, atol=1e-14))
+        self.assertTrue(np.all(np.isfinite(result)))
+
     def test_bootstrap_empty_curve(self):
         curve = []
 
@@ -273,6 +398,38 @@ class ForwardCurveTestCase(unittest.TestCase):
 
         self.assertEqual(result, expected)
 
+    def test_forward_curve_arrays(self):
+
+        tenors = np.array([1.00, 2.00, 3.00])
+        rates = np.array([0.02548, 0.02983, 0.02891])
+
+        settle_tenors, workout_tenors, rates = forward_curve_arrays(tenors, rates, 1)
+
+        self.assertEqual(settle_tenors.tolist(), [1.0, 2.0])
+        self.assertEqual(workout_tenors.tolist(), [2.0, 3.0])
+        self.assertEqual(np.round(rates, 5).tolist(), [0.03420, 0.02707])
+
+    def test_forward_curves_monthly_grid(self):
+
+        tenors = np.arange(0, 121) / 12
+        rates = 0.02 + 0.01 * (1 - np.exp(-tenors / 2))
+        market_curve = [{"tenor": tenor, "rate": rate} for tenor, rate in zip(tenors.tolist(), rates.tolist())]
+
+        result = forward_curves(tenors, rates, ["M", "Q", "A"])
+
+        self.assertEqual(list(result.keys()), ["M", "Q", "A"])
+        for tenor_string, forward_tenor in [("M", 1/12), ("Q", 3/12), ("A", 12/12)]:
+            settle_tenors, workout_tenors, forward_rates = result[tenor_string]
+            self.assertTrue(np.allclose(workout_tenors - settle_tenors, forward_tenor))
+            self.assertEqual(
+                forward_curve(market_curve, forward_tenor),
+                [
+                    {"settle_tenor": settle, "workout_tenor": workout, "rate": round(rate, 5)}
+                    for settle, workout, rate in zip(settle_tenors.tolist(), workout_tenors.tolist(), forward_rates.tolist())
+                ]
+            )
+        self.assertEqual(result["Q"][0].size, 121 - 3 - 1)
+
 class CurveSetTestCase(unittest.TestCase):
     
     def test_curve_set_empty_curve(self):
@@ -290,6 +447,48 @@ class CurveSetTestCase(unittest.TestCase):
     
     def test_curve_set_not_enough_data(self):
         pass
+
+    def test_curve_set_is_lazy(self):
+        result = curve_set(
+            datetime.datetime(1999, 1, 1),
+            MOCK_BENCHMARK_CURVE,
+            ["Q", "SA"]
+        )
+        self.assertEqual(result.computed(), [])
+
+        settle_tenors, workout_tenors, forward_rates = result.forward_curve("Q")
+        self.assertEqual(result.computed(), ["constructed_curve", "interpolated", "forward_curve:Q"])
+        self.assertIs(result.forward_curve("Q")[2], forward_rates)
+
+        expected = forward_curve_arrays(result.interpolated.tenors, result.interpolated.rates, 3/12)
+        np.testing.assert_array_equal(forward_rates, expected[2])
+
+    def test_curve_set_day_count(self):
+        pricing_date = datetime.datetime(1999, 1, 1)
+        result = curve_set(pricing_date, MOCK_BENCHMARK_CURVE, ["Q"], day_count="ACT/365F")
+
+        self.assertEqual(result.constructed_curve, construct_ns_curve(pricing_date, MOCK_BENCHMARK_CURVE, day_count="ACT/365F"))
+        self.assertNotEqual(result.constructed_curve, construct_ns_curve(pricing_date, MOCK_BENCHMARK_CURVE))
+
+    def test_curve_set_legacy_components(self):
+        pricing_date = datetime.datetime(1999, 1, 1)
+        result = curve_set(pricing_date, MOCK_BENCHMARK_CURVE, ["SA"], curve_type="NSS")
+
+        constructed_curve = construct_nss_curve(pricing_date, MOCK_BENCHMARK_CURVE)
+        interpolated = nss_curve_output(constructed_curve, np.linspace(0, 30, num=30*12).tolist())
+        expected_forward = forward_curve(interpolated, 6/12)
+
+        self.assertEqual(result["constructed_curve"], constructed_curve)
+        self.assertEqual(set(result), {"constructed_curve", "interpolated_market_curve", "zero_curve", "forward_curves"})
+        np.testing.assert_allclose(
+            [point['rate'] for point in result["interpolated_market_curve"]],
+            [point['rate'] for point in interpolated],
+            rtol=0, atol=1e-15
+        )
+        self.assertEqual(result["forward_curves"]["SA"]["SA"], expected_forward)
+        self.assertEqual(len(result["zero_curve"]), len(interpolated))
+        with self.assertRaises(KeyError):
+            result["par_curve"]
     
 class CleanCurveTestCase(unittest.TestCase):
     
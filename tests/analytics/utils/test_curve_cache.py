@@ -0,0 +1,141 @@
+import unittest
+import datetime
+import copy
+
+from src.analytics.utils.curve import construct_ns_curve, construct_nss_curve
+from src.analytics.utils.curve_cache import (
+    CurveCache, DEFAULT_CURVE_CACHE, clear_curve_cache, market_curve_fingerprint
+)
+from src.analytics.security.security_yield_return import spread_to_benchmark
+
+from ..helper.testConstants import MOCK_BENCHMARK_CURVE, MOCK_SECURITY_CASHFLOW_ARRAY
+
+
+class CurveCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.pricing_date = datetime.datetime(1999, 1, 1)
+        self.market_curve = copy.deepcopy(MOCK_BENCHMARK_CURVE)
+
+    def test_market_curve_fingerprint(self):
+
+        ticked_curve = copy.deepcopy(self.market_curve)
+        ticked_curve[0]['rate'] += 0.0001
+
+        self.assertEqual(market_curve_fingerprint(self.market_curve), market_curve_fingerprint(copy.deepcopy(self.market_curve)))
+        self.assertNotEqual(market_curve_fingerprint(self.market_curve), market_curve_fingerprint(ticked_curve))
+
+    def test_curve_cache_hit_and_miss(self):
+
+        cache = CurveCache()
+
+        first = cache.get(self.pricing_date, self.market_curve, "NS")
+        second = cache.get(self.pricing_date, copy.deepcopy(self.market_curve), "NS")
+        cache.get(self.pricing_date, self.market_curve, "NSS")
+
+        self.assertIs(first, second)
+        self.assertEqual(first, construct_ns_curve(self.pricing_date, self.market_curve))
+        self.assertEqual(cache.stats(), {"size": 2, "max_size": 128, "hits": 1, "misses": 2, "hit_rate": 1/3})
+
+    def test_curve_cache_gradient_calibration(self):
+
+        cache = CurveCache()
+
+        ols = cache.get(self.pricing_date, self.market_curve, "NSS")
+        gradient = cache.get(self.pricing_date, self.market_curve, "NSS", calibration="GRADIENT")
+        multi_start = cache.get(self.pricing_date, self.market_curve, "NSS", calibration="GRADIENT", multi_start=3)
+        warm_start = cache.get(self.pricing_date, self.market_curve, "NSS", calibration="GRADIENT", previous_curve=ols)
+
+        self.assertIsNot(ols, gradient)
+        self.assertEqual(gradient, construct_nss_curve(self.pricing_date, self.market_curve, calibration="GRADIENT"))
+        self.assertEqual(
+            multi_start, construct_nss_curve(self.pricing_date, self.market_curve, calibration="GRADIENT", multi_start=3)
+        )
+        self.assertEqual(
+            warm_start, construct_nss_curve(self.pricing_date, self.market_curve, calibration="GRADIENT", previous_curve=ols)
+        )
+        self.assertEqual(cache.misses, 4)
+
+        self.assertIs(cache.get(self.pricing_date, self.market_curve, "NSS", calibration="GRADIENT"), gradient)
+        self.assertIs(
+            cache.get(self.pricing_date, self.market_curve, "NSS", calibration="GRADIENT", previous_curve=copy.deepcopy(ols)),
+            warm_start
+        )
+        self.assertEqual(cache.hits, 2)
+
+        with self.assertRaises(AssertionError):
+            cache.get(self.pricing_date, self.market_curve, "NS", calibration="GRADIENT", multi_start=3)
+
+    def test_curve_cache_lru_eviction(self):
+
+        cache = CurveCache(max_size=2)
+        dates = [datetime.datetime(1999, 1, 1), datetime.datetime(1999, 1, 2), datetime.datetime(1999, 1, 3)]
+
+        cache.get(dates[0], self.market_curve)
+        cache.get(dates[1], self.market_curve)
+        cache.get(dates[0], self.market_curve)
+        cache.get(dates[2], self.market_curve)
+        cache.get(dates[0], self.market_curve)
+        cache.get(dates[1], self.market_curve)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 4)
+
+    def test_curve_cache_invalidate(self):
+
+        cache = CurveCache()
+        cache.get(self.pricing_date, self.market_curve, "NS")
+        cache.get(self.pricing_date, self.market_curve, "NSS")
+        cache.get(datetime.datetime(1999, 1, 2), self.market_curve, "NS")
+
+        self.assertEqual(cache.invalidate(pricing_date=self.pricing_date, curve_type="NSS"), 1)
+        self.assertEqual(cache.invalidate(market_curve=self.market_curve), 2)
+        self.assertEqual(len(cache), 0)
+
+    def test_curve_cache_clear(self):
+
+        cache = CurveCache()
+        cache.get(self.pricing_date, self.market_curve, "NS")
+        cache.get(self.pricing_date, self.market_curve, "NS")
+        cache.clear()
+
+        self.assertEqual(cache.stats(), {"size": 0, "max_size": 128, "hits": 0, "misses": 0, "hit_rate": 0.0})
+
+    def test_spread_to_benchmark_default_cache(self):
+
+        clear_curve_cache()
+        spread_to_benchmark(
+            datetime.datetime(2000, 1, 1),
+            MOCK_SECURITY_CASHFLOW_ARRAY,
+            1000,
+            MOCK_SECURITY_CASHFLOW_ARRAY[-2]["date"],
+            MOCK_BENCHMARK_CURVE,
+            'ns'
+        )
+        self.assertEqual(len(DEFAULT_CURVE_CACHE), 1)
+
+        clear_curve_cache()
+        self.assertEqual(len(DEFAULT_CURVE_CACHE), 0)
+
+    def test_spread_to_benchmark_uses_cache(self):
+
+        cache = CurveCache()
+        workout_date = MOCK_SECURITY_CASHFLOW_ARRAY[-2]["date"]
+
+        results = [
+            spread_to_benchmark(
+                datetime.datetime(2000, 1, 1),
+                MOCK_SECURITY_CASHFLOW_ARRAY,
+                1000,
+                workout_date,
+                MOCK_BENCHMARK_CURVE,
+                'ns',
+                curve_cache=cache
+            )
+            for _ in range(3)
+        ]
+
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 2)
+        self.assertAlmostEqual(round(results[-1], 6), 0.825989)
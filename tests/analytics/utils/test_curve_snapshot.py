@@ -0,0 +1,84 @@
+import unittest
+import pickle
+
+import numpy as np
+
+from src.analytics.utils.curve_snapshot import CurveSnapshot
+from src.analytics.utils.regression.ns import NelsonSiegelCurve
+
+
+class CurveSnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        self.curve = NelsonSiegelCurve(0.04, -0.02, 0.01, 2.0)
+        self.tenors = np.linspace(0, 30, num=30*12)
+        self.snapshot = CurveSnapshot.from_curve(self.curve, self.tenors)
+
+    def test_snapshot_from_curve(self):
+        self.assertTrue(self.snapshot.is_uniform)
+        self.assertEqual(len(self.snapshot), 360)
+        np.testing.assert_allclose(self.snapshot.rates, self.curve(self.tenors))
+        np.testing.assert_allclose(self.snapshot.discount_factors, self.curve.discount_factor(self.tenors))
+
+    def test_lookup_at_grid_points(self):
+        np.testing.assert_allclose(self.snapshot.rate(self.tenors), self.snapshot.rates, rtol=0, atol=1e-15)
+        np.testing.assert_allclose(
+            self.snapshot.discount_factor(self.tenors), self.snapshot.discount_factors, rtol=1e-14
+        )
+        self.assertAlmostEqual(self.snapshot.rate(float(self.tenors[100])), self.snapshot.rates[100], places=15)
+
+    def test_uniform_and_irregular_grids_agree(self):
+        irregular = CurveSnapshot(self.tenors[[0, 1, 5, 17, 100, 359]], self.snapshot.rates[[0, 1, 5, 17, 100, 359]])
+        self.assertFalse(irregular.is_uniform)
+        regular = CurveSnapshot(np.array([0.0, 1.0, 2.0, 3.0]), np.array([0.01, 0.02, 0.04, 0.03]))
+        irregular = CurveSnapshot(np.array([0.0, 1.0, 2.5, 3.0]), np.array([0.01, 0.02, 0.035, 0.03]))
+        T = np.array([-1.0, 0.0, 0.5, 1.0, 2.5, 3.0, 4.0])
+
+        np.testing.assert_allclose(regular.rate(T), [0.01, 0.01, 0.015, 0.02, 0.035, 0.03, 0.03])
+        np.testing.assert_allclose(irregular.rate(T), [0.01, 0.01, 0.015, 0.02, 0.035, 0.03, 0.03])
+
+    def test_interpolation_between_grid_points(self):
+        T = np.linspace(0.01, 29.9, 1000)
+        np.testing.assert_allclose(self.snapshot.rate(T), self.curve(T), atol=1e-5)
+        log_linear = CurveSnapshot.from_curve(self.curve, self.tenors, interpolation="log_linear")
+        np.testing.assert_allclose(log_linear.discount_factor(T), self.curve.discount_factor(T), rtol=1e-4)
+        # Piecewise constant forwards only approximate the zero rate at the short end.
+        np.testing.assert_allclose(log_linear.rate(T[T > 1]), self.curve(T[T > 1]), atol=1e-5)
+
+    def test_log_linear_extrapolates_constant_forward(self):
+        snapshot = CurveSnapshot(np.array([0.0, 1.0, 2.0]), np.array([0.05, 0.05, 0.05]), interpolation="log_linear")
+        self.assertAlmostEqual(snapshot.rate(5.0), 0.05, places=14)
+        self.assertAlmostEqual(snapshot.discount_factor(5.0), 1.05 ** -5, places=14)
+
+    def test_dict_list_round_trip(self):
+        curve = [{'tenor': 0.0, 'rate': 0.01}, {'tenor': 0.5, 'rate': 0.02}, {'tenor': 1.0, 'rate': 0.025}]
+        snapshot = CurveSnapshot.from_curve_dicts(curve)
+        self.assertEqual(snapshot.to_dict_list(), curve)
+
+    def test_pickle(self):
+        restored = pickle.loads(pickle.dumps(self.snapshot))
+        np.testing.assert_array_equal(restored.rates, self.snapshot.rates)
+        self.assertEqual(restored.rate(7.3), self.snapshot.rate(7.3))
+
+    def test_shared_memory(self):
+        block = self.snapshot.to_shared_memory()
+        try:
+            attached = CurveSnapshot.from_shared_memory(block.name)
+            np.testing.assert_array_equal(attached.rates, self.snapshot.rates)
+            self.assertEqual(attached.interpolation, self.snapshot.interpolation)
+            self.assertEqual(attached.rate(12.34), self.snapshot.rate(12.34))
+            # The attached arrays are views of the block, not copies.
+            shared = np.ndarray((2 + 3 * len(attached),), dtype=np.float64, buffer=block.buf)
+            shared[2 + len(attached)] = 0.5
+            del shared
+            self.assertEqual(attached.rates[0], 0.5)
+            attached.close()
+            self.assertEqual(len(attached), 0)
+        finally:
+            block.close()
+            block.unlink()
+
+    def test_invalid_snapshot(self):
+        with self.assertRaises(AssertionError):
+            CurveSnapshot(np.array([1.0, 0.5]), np.array([0.01, 0.02]))
+        with self.assertRaises(AssertionError):
+            CurveSnapshot(self.tenors, self.snapshot.rates, interpolation="cubic")
@@ -1,21 +1,27 @@
 import unittest
 from datetime import datetime, time
+import numpy as np
 import pandas as pd
 
 from src.analytics.utils.date_time import (
-    _annual_range,
     _default_date,
-    _generate_pd_date_range,
-    _get_n_monthly,
-    _mid_month_adj,
-    _monthly_range,
     generate_date_range,
+    generate_schedule,
+    _cached_schedule,
     months_between_dates,
     years_between_dates,
     days_between_dates,
     get_days_before_date,
-    get_record_date
+    get_record_date,
+    get_record_and_ex_dates,
+    to_day_number,
+    from_day_number,
+    to_typed_dates,
+    parse_dates,
+    date_cache_info,
+    clear_date_cache
 )
+from src.analytics.utils.business_day import BusinessDayCalendar
 from src.analytics.utils.lookup import TIMESERIES_TIME_PERIODS
 
 
@@ -40,6 +46,16 @@ class DateTimeTestCase(unittest.TestCase):
         self.assertEqual(round(years_between_dates(datetime(2010, 10, 1), datetime(2009, 8, 1)), 4), -1.1671)
         self.assertEqual(round(years_between_dates(datetime(2000, 1, 1), datetime(2010, 1, 1)), 0), 10)
 
+    def test_years_between_dates_day_count(self):
+
+        self.assertEqual(years_between_dates(datetime(2000, 1, 1), datetime(2000, 7, 1), day_count="ACT/360"), 182/360)
+        self.assertEqual(years_between_dates(datetime(2000, 1, 31), datetime(2000, 7, 31), day_count="30/360"), 0.5)
+        self.assertEqual(years_between_dates(datetime(2000, 1, 1), datetime(2001, 1, 1), day_count="ACT/ACT"), 1.0)
+        self.assertEqual(
+            years_between_dates(datetime(2000, 1, 1), datetime(2000, 7, 1), day_count="ACT/ACT ICMA"),
+            years_between_dates(datetime(2000, 1, 1), datetime(2000, 7, 1), day_count="ACT/ACT")
+        )
+
     def test_get_days_before_date(self):
         
         start_date = datetime.strptime("2001-01-01", "%Y-%m-%d")
@@ -166,214 +182,77 @@ class DateTimeRangeTestCase(unittest.TestCase):
             ["2000-02-01","2000-03-01","2000-04-01"]
         )
 
-    def test_annual_range(self):
-
-        with self.assertRaises(Exception) as context:
-            _annual_range(
-                _default_date("2001-01-01"),
-                _default_date("2000-01-01")
-            )
-        self.assertEqual(context.exception.args[0], "start_date is after end_date")
-
-        with self.assertRaises(Exception) as context:
-            _annual_range(
-                "2000-01-01",
-                _default_date("2001-01-01")
-            )
-        self.assertEqual(context.exception.args[0], "start_date must be of type datetime.datetime")
-
-        with self.assertRaises(Exception) as context:
-            _annual_range(
-                _default_date("2001-01-01"),
-                "2000-01-01"
-            )
-        self.assertEqual(context.exception.args[0], "end_date must be of type datetime.datetime")
-
-        pd.testing.assert_index_equal(
-            _annual_range(_default_date("2000-01-01"), _default_date("2000-01-01")),
-            pd.DatetimeIndex(["2000-01-01"])
+    def test_generate_schedule_month_end_start(self):
+        self.assertEqual(
+            generate_schedule(datetime(2000, 1, 31), datetime(2001, 1, 31), "Q").astype(str).tolist(),
+            ["2000-04-30", "2000-07-31", "2000-10-31", "2001-01-31"]
         )
-
-        pd.testing.assert_index_equal(
-            _annual_range(_default_date("2000-01-01"), _default_date("2000-01-01")),
-            pd.DatetimeIndex(["2000-01-01"])
+        self.assertEqual(
+            generate_schedule(datetime(2000, 1, 31), datetime(2001, 1, 31), "Q", arrears=False).astype(str).tolist(),
+            ["2000-01-31", "2000-04-30", "2000-07-31", "2000-10-31"]
         )
-
-        pd.testing.assert_index_equal(
-            _annual_range(_default_date("2000-01-01"), _default_date("2003-01-01")),
-            pd.DatetimeIndex(["2000-01-01", "2001-01-01", "2002-01-01", "2003-01-01"])
+        self.assertEqual(
+            generate_schedule(datetime(2000, 8, 31), datetime(2002, 3, 15), "SA").astype(str).tolist(),
+            ["2001-02-28", "2001-08-31", "2002-02-28"]
         )
-
-    def test_monthly_range(self):
-
-        with self.assertRaises(Exception) as context:
-            _monthly_range(
-                _default_date("2001-01-01"),
-                _default_date("2000-01-01")
-            )
-        self.assertEqual(context.exception.args[0], "start_date is after end_date")
-
-        with self.assertRaises(Exception) as context:
-            _monthly_range(
-                "2000-01-01",
-                _default_date("2001-01-01")
-            )
-        self.assertEqual(context.exception.args[0], "start_date must be of type datetime.datetime")
-
-        with self.assertRaises(Exception) as context:
-            _monthly_range(
-                _default_date("2001-01-01"),
-                "2000-01-01"
-            )
-        self.assertEqual(context.exception.args[0], "end_date must be of type datetime.datetime")
-
-        pd.testing.assert_index_equal(
-            _monthly_range(_default_date("2000-01-01"), _default_date("2000-03-01")).strftime("%Y-%m-%d"), 
-            pd.DatetimeIndex(["2000-01-01", "2000-02-01", "2000-03-01"]).strftime("%Y-%m-%d")
+        self.assertEqual(
+            generate_schedule(datetime(1999, 3, 15), datetime(2003, 1, 1), "A", arrears=False).astype(str).tolist(),
+            ["1999-03-15", "2000-03-15", "2001-03-15"]
         )
+        self.assertEqual(generate_schedule(datetime(2000, 1, 15), datetime(2000, 1, 20), "M").size, 0)
 
-        pd.testing.assert_index_equal(
-            _monthly_range(_default_date("2000-01-10"), _default_date("2000-03-10")).strftime("%Y-%m-%d"), 
-            pd.DatetimeIndex(["2000-01-10", "2000-02-10", "2000-03-10"]).strftime("%Y-%m-%d")
+    def test_generate_schedule_end_of_month(self):
+        self.assertEqual(
+            generate_schedule(datetime(2021, 4, 30), datetime(2021, 8, 31), "M").astype(str).tolist(),
+            ["2021-05-30", "2021-06-30", "2021-07-30", "2021-08-30"]
         )
-
-    def test_mid_month_adj(self):
-
-        with self.assertRaises(Exception) as context:
-            _mid_month_adj(
-                _default_date("2000-01-01"),
-                None
-            )
-        self.assertEqual(context.exception.args[0], "'None' is not of type pd.DatetimeIndex.")
-
-        with self.assertRaises(Exception) as context:
-            _mid_month_adj(
-                "2000-01-01",
-                pd.date_range("2000-01-01", "2001-01-01")
-            )
-        self.assertEqual(context.exception.args[0], "'2000-01-01' is not of type datetime.datetime.")
-
-        self.assertCountEqual(
-            _mid_month_adj(_default_date("2000-01-20"), pd.date_range("2000-01-01", "2000-03-01", freq="MS")).strftime("%Y-%m-%d"),
-            pd.DatetimeIndex(["2000-01-20", "2000-02-20", "2000-03-20"]).strftime("%Y-%m-%d")
+        self.assertEqual(
+            generate_schedule(datetime(2021, 4, 30), datetime(2021, 8, 31), "M", end_of_month=True).astype(str).tolist(),
+            ["2021-05-31", "2021-06-30", "2021-07-31", "2021-08-31"]
         )
-
-        self.assertCountEqual(
-            _mid_month_adj(_default_date("2000-01-01"), pd.date_range("2000-01-01", "2000-03-01", freq="MS")).strftime("%Y-%m-%d"),
-            pd.DatetimeIndex(["2000-01-01", "2000-02-01", "2000-03-01"]).strftime("%Y-%m-%d")
+        self.assertEqual(
+            generate_schedule(datetime(2020, 2, 29), datetime(2024, 3, 1), "A").astype(str).tolist(),
+            ["2021-02-28", "2022-02-28", "2023-02-28", "2024-02-28"]
         )
-
-    def test_pd_generate_date_range(self):
-
-        pd.testing.assert_index_equal(
-            _generate_pd_date_range(_default_date("2000-01-01"), _default_date("2000-03-01"), 'MS'),
-            pd.DatetimeIndex(["2000-01-01", "2000-02-01", "2000-03-01"], dtype='datetime64[ns]', freq=None)
+        self.assertEqual(
+            generate_schedule(datetime(2020, 2, 29), datetime(2024, 3, 1), "A", end_of_month=True).astype(str).tolist(),
+            ["2021-02-28", "2022-02-28", "2023-02-28", "2024-02-29"]
         )
 
-        pd.testing.assert_index_equal(
-            _generate_pd_date_range(_default_date("2000-01-10") - pd.offsets.MonthBegin(), _default_date("2000-03-10"), 'MS'),
-            pd.DatetimeIndex(["2000-01-01", "2000-02-01", "2000-03-01"], dtype='datetime64[ns]', freq=None)
-        )
+    def test_generate_schedule_stubs(self):
+        start_date, end_date = datetime(2020, 1, 20), datetime(2021, 2, 10)
+        expected = {
+            "short_front": ["2020-01-20", "2020-02-10", "2020-05-10", "2020-08-10", "2020-11-10", "2021-02-10"],
+            "long_front": ["2020-01-20", "2020-05-10", "2020-08-10", "2020-11-10", "2021-02-10"],
+            "short_back": ["2020-01-20", "2020-04-20", "2020-07-20", "2020-10-20", "2021-01-20", "2021-02-10"],
+            "long_back": ["2020-01-20", "2020-04-20", "2020-07-20", "2020-10-20", "2021-02-10"]
+        }
+        for stub, dates in expected.items():
+            self.assertEqual(generate_schedule(start_date, end_date, "Q", arrears=True, stub=stub).astype(str).tolist(), dates[1:])
+            self.assertEqual(generate_schedule(start_date, end_date, "Q", arrears=False, stub=stub).astype(str).tolist(), dates[:-1])
+
+        # No stub when the dates are on the schedule.
+        for stub in expected.keys():
+            self.assertEqual(
+                generate_schedule(datetime(2021, 1, 15), datetime(2021, 7, 15), "Q", stub=stub).astype(str).tolist(),
+                ["2021-04-15", "2021-07-15"]
+            )
 
-    def test_get_n_monthly(self):
+    def test_generate_schedule_cache(self):
+        _cached_schedule.cache_clear()
+        first = generate_schedule(datetime(2021, 1, 15), datetime(2023, 1, 15), "SA")
+        second = generate_schedule(np.datetime64("2021-01-15"), datetime(2023, 1, 15, 12), "SA")
 
-        # Empty
-        with self.assertRaises(Exception) as context:
-            _get_n_monthly([], "A")
-        # Non datetime.datetime
-        with self.assertRaises(Exception) as context:
-            _get_n_monthly(["2000-01-01"], "A")
+        self.assertIs(first, second)
+        self.assertEqual(first.dtype, np.dtype("datetime64[D]"))
+        self.assertEqual(_cached_schedule.cache_info().hits, 1)
+        with self.assertRaises(ValueError):
+            first[0] = np.datetime64("2000-01-01")
 
-        # Semi-Annual
-        self.assertEqual(
-            _get_n_monthly(
-                [
-                    datetime.strptime("2000-01-01", "%Y-%m-%d"), 
-                    datetime.strptime("2000-02-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-03-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-04-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-05-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-06-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-07-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-08-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-09-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-10-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-11-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-12-01", "%Y-%m-%d"),
-                    datetime.strptime("2001-01-01", "%Y-%m-%d")
-                ],
-                "SA"
-            ),
-            [
-                datetime.strptime("2000-01-01", "%Y-%m-%d"),
-                datetime.strptime("2000-07-01", "%Y-%m-%d"),
-                datetime.strptime("2001-01-01", "%Y-%m-%d")
-            ]
-        )
-        # Quarterly
-        self.assertEqual(
-            _get_n_monthly(
-                [
-                    datetime.strptime("2000-01-01", "%Y-%m-%d"), 
-                    datetime.strptime("2000-02-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-03-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-04-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-05-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-06-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-07-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-08-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-09-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-10-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-11-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-12-01", "%Y-%m-%d"),
-                    datetime.strptime("2001-01-01", "%Y-%m-%d")
-                ],
-                "Q"
-            ),
-            [
-                datetime.strptime("2000-01-01", "%Y-%m-%d"), 
-                datetime.strptime("2000-04-01", "%Y-%m-%d"),
-                datetime.strptime("2000-07-01", "%Y-%m-%d"),
-                datetime.strptime("2000-10-01", "%Y-%m-%d"),
-                datetime.strptime("2001-01-01", "%Y-%m-%d")
-            ]
-        )
-        # Monthly
-        self.assertEqual(
-            _get_n_monthly(
-                [
-                    datetime.strptime("2000-01-01", "%Y-%m-%d"), 
-                    datetime.strptime("2000-02-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-03-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-04-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-05-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-06-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-07-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-08-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-09-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-10-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-11-01", "%Y-%m-%d"),
-                    datetime.strptime("2000-12-01", "%Y-%m-%d"),
-                    datetime.strptime("2001-01-01", "%Y-%m-%d")
-                ],
-                "M"
-            ),
-            [
-                datetime.strptime("2000-01-01", "%Y-%m-%d"), 
-                datetime.strptime("2000-02-01", "%Y-%m-%d"),
-                datetime.strptime("2000-03-01", "%Y-%m-%d"),
-                datetime.strptime("2000-04-01", "%Y-%m-%d"),
-                datetime.strptime("2000-05-01", "%Y-%m-%d"),
-                datetime.strptime("2000-06-01", "%Y-%m-%d"),
-                datetime.strptime("2000-07-01", "%Y-%m-%d"),
-                datetime.strptime("2000-08-01", "%Y-%m-%d"),
-                datetime.strptime("2000-09-01", "%Y-%m-%d"),
-                datetime.strptime("2000-10-01", "%Y-%m-%d"),
-                datetime.strptime("2000-11-01", "%Y-%m-%d"),
-                datetime.strptime("2000-12-01", "%Y-%m-%d"),
-                datetime.strptime("2001-01-01", "%Y-%m-%d")
-            ]
-        )
+        with self.assertRaises(AssertionError):
+            generate_schedule(datetime(2021, 1, 15), datetime(2023, 1, 15), "SA", stub="long")
+        with self.assertRaises(AssertionError):
+            generate_schedule(datetime(2023, 1, 15), datetime(2021, 1, 15), "SA")
 
     def test_default_date(self):
 
@@ -387,6 +266,35 @@ class DateTimeRangeTestCase(unittest.TestCase):
         
         self.assertEqual(_default_date("2000-01-01"), datetime.strptime("2000-01-01", "%Y-%m-%d"), "Normal case failed.")
 
+    def test_date_cache(self):
+        clear_date_cache()
+
+        first = _default_date("2000-01-01")
+        self.assertIs(_default_date("2000-01-01"), first)
+        self.assertEqual(to_day_number("2000-01-01"), 10957)
+        _default_date("2000-01-02")
+        with self.assertRaises(ValueError):
+            _default_date("2000-13-01")
+
+        info = date_cache_info()
+        self.assertEqual((info["hits"], info["misses"], info["size"]), (2, 3, 2))
+        self.assertAlmostEqual(info["hit_rate"], 2/5)
+
+        clear_date_cache()
+        self.assertEqual(date_cache_info()["size"], 0)
+        self.assertEqual(date_cache_info()["hit_rate"], 0.0)
+
+    def test_parse_dates(self):
+        dates = np.array([["2000-01-02", "1999-12-31"], ["2000-01-02", "2024-02-29"]])
+
+        result = parse_dates(dates)
+
+        self.assertEqual(result.dtype, np.dtype("datetime64[D]"))
+        np.testing.assert_array_equal(result, dates.astype("datetime64[D]"))
+        self.assertEqual(parse_dates(["2000-01-01"]).tolist(), [_default_date("2000-01-01").date()])
+        self.assertEqual(parse_dates([]).size, 0)
+        np.testing.assert_array_equal(parse_dates(result), result)
+
 class ExRecordDateTestCase(unittest.TestCase):
     
     def test_get_record_date(self):
@@ -402,4 +310,72 @@ class ExRecordDateTestCase(unittest.TestCase):
         }
         expected_date = datetime.strptime("2000-12-24", "%Y-%m-%d")
         
-        self.assertEqual(get_record_date(payment_date, ex_record_config), expected_date)
\ No newline at end of file
+        self.assertEqual(get_record_date(payment_date, ex_record_config), expected_date)
+
+    def test_get_record_date_business_days(self):
+
+        ex_record_config = {
+            "record_date": {
+                "days_before_payment_date": 8,
+                "record_time": 19,
+                "day_type": "business",
+                "time_of_record": time(19)
+            }
+        }
+        calendar = BusinessDayCalendar(holidays=["2000-12-25", "2000-12-26"])
+
+        # Eight weekdays before Monday 1 January 2001, then also skipping the holidays.
+        self.assertEqual(get_record_date(datetime(2001, 1, 1, 10), ex_record_config), datetime(2000, 12, 20, 10))
+        self.assertEqual(get_record_date(datetime(2001, 1, 1), ex_record_config, calendar), datetime(2000, 12, 18))
+        self.assertEqual(get_days_before_date(datetime(2001, 1, 1), 8, is_calendar_days=False), datetime(2000, 12, 20))
+
+        payment_dates = np.array(["2001-01-01", "2001-01-15"], dtype="datetime64[D]")
+        record_dates, ex_dates = get_record_and_ex_dates(payment_dates, ex_record_config, calendar)
+        self.assertEqual(record_dates.astype(str).tolist(), ["2000-12-18", "2001-01-03"])
+        self.assertEqual(ex_dates.astype(str).tolist(), ["2000-12-15", "2001-01-02"])
+
+        ex_record_config["record_date"]["day_type"] = "calendar"
+        record_dates, ex_dates = get_record_and_ex_dates(payment_dates, ex_record_config)
+        self.assertEqual(record_dates.astype(str).tolist(), ["2000-12-24", "2001-01-07"])
+        self.assertEqual(ex_dates.astype(str).tolist(), ["2000-12-23", "2001-01-06"])
+
+        ex_record_config["record_date"]["day_type"] = "trading"
+        with self.assertRaises(AssertionError):
+            get_record_date(datetime(2001, 1, 1), ex_record_config)
+
+    def test_day_numbers(self):
+        for date in ["1969-12-31", "1970-01-01", "2000-02-29", "2100-12-31"]:
+            expected = int(np.datetime64(date, "D").astype(np.int64))
+            self.assertEqual(to_day_number(date), expected)
+            self.assertEqual(to_day_number(_default_date(date)), expected)
+            self.assertEqual(to_day_number(np.datetime64(date)), expected)
+            self.assertEqual(to_day_number(expected), expected)
+            self.assertEqual(from_day_number(expected), _default_date(date))
+
+        self.assertEqual(to_day_number(datetime(2000, 1, 1, 23, 59)), to_day_number("2000-01-01"))
+        self.assertEqual(to_day_number(pd.Timestamp("2000-01-01 12:00")), to_day_number("2000-01-01"))
+        self.assertEqual(to_day_number("2000-1-1"), to_day_number("2000-01-01"))
+        self.assertEqual(to_day_number("2000-2-29"), to_day_number(_default_date("2000-2-29")))
+
+    def test_to_typed_dates(self):
+        index = {
+            "2000-01-03": {
+                "date": "2000-01-03",
+                "holdings": {"XS12345678901": {"volume": 100}},
+                "cashflows": [{"date": {"payment_date": "2000-02-01", "ex_date": datetime(2000, 1, 23)}, "cashflow": {"total": 1.0}}]
+            }
+        }
+
+        result = to_typed_dates(index)
+
+        self.assertEqual(
+            result,
+            {
+                10959: {
+                    "date": 10959,
+                    "holdings": {"XS12345678901": {"volume": 100}},
+                    "cashflows": [{"date": {"payment_date": 10988, "ex_date": 10979}, "cashflow": {"total": 1.0}}]
+                }
+            }
+        )
+        self.assertEqual(index["2000-01-03"]["date"], "2000-01-03")
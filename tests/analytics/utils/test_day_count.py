@@ -0,0 +1,104 @@
+import unittest
+import datetime
+
+import numpy as np
+
+from src.analytics.utils.day_count import (
+    day_counts,
+    year_fraction,
+    year_fractions,
+    _calendar,
+    _calendar_arithmetic
+)
+from src.analytics.utils.lookup import DAY_COUNT_CONVENTIONS
+
+
+class DayCountTestCase(unittest.TestCase):
+
+    def test_act_conventions(self):
+        start_date = datetime.datetime(2003, 11, 1)
+        end_date = datetime.datetime(2004, 5, 1)
+
+        self.assertAlmostEqual(year_fraction(start_date, end_date, "ACT/365F"), 182/365, 15)
+        self.assertAlmostEqual(year_fraction(start_date, end_date, "ACT/360"), 182/360, 15)
+        # ISDA example: 61 days in 2003 and 121 days in the leap year 2004.
+        self.assertAlmostEqual(year_fraction(start_date, end_date, "ACT/ACT"), 61/365 + 121/366, 14)
+        self.assertAlmostEqual(
+            year_fraction(
+                start_date,
+                end_date,
+                "ACT/ACT ICMA",
+                period_start=datetime.datetime(2003, 11, 1),
+                period_end=datetime.datetime(2004, 5, 1),
+                frequency=2
+            ),
+            0.5,
+            15
+        )
+        self.assertAlmostEqual(
+            year_fraction(
+                datetime.datetime(2000, 1, 15),
+                datetime.datetime(2000, 4, 15),
+                "ACT/ACT ICMA",
+                period_start=datetime.datetime(2000, 1, 15),
+                period_end=datetime.datetime(2000, 7, 15),
+                frequency=2
+            ),
+            91/364,
+            15
+        )
+
+    def test_thirty_360_conventions(self):
+        start_dates = np.array(["2007-02-28", "2007-01-31", "2007-08-31", "2007-02-28"], dtype="datetime64[D]")
+        end_dates = np.array(["2008-02-29", "2007-03-31", "2008-02-28", "2007-03-31"], dtype="datetime64[D]")
+
+        np.testing.assert_array_equal(day_counts(start_dates, end_dates, "30/360"), [361, 60, 178, 33])
+        np.testing.assert_array_equal(day_counts(start_dates, end_dates, "30/360 US"), [360, 60, 178, 30])
+        np.testing.assert_array_equal(day_counts(start_dates, end_dates, "30E/360"), [361, 60, 178, 32])
+        np.testing.assert_array_equal(day_counts(start_dates, end_dates, "30E/360 ISDA"), [360, 60, 178, 30])
+        np.testing.assert_array_equal(
+            day_counts(start_dates, end_dates, "30E/360 ISDA", maturity_date=np.datetime64("2008-02-29")),
+            [359, 60, 178, 30]
+        )
+        np.testing.assert_allclose(year_fractions(start_dates, end_dates, "30E/360"), np.array([361, 60, 178, 32]) / 360)
+
+    def test_act_day_counts(self):
+        result = day_counts(datetime.datetime(2000, 1, 1, 18), np.array(["2000-03-01", "1999-12-31"], dtype="datetime64[D]"), "ACT/360")
+
+        np.testing.assert_array_equal(result, [60, -1])
+
+    def test_calendar_lookup_matches_arithmetic(self):
+        days = np.random.default_rng(3).integers(-1000, 60000, 200000)
+
+        for looked_up, computed in zip(_calendar(days), _calendar_arithmetic(days)):
+            np.testing.assert_array_equal(looked_up, computed)
+
+        dates = days.astype("datetime64[D]")
+        month_serial, day, _, _ = _calendar(days)
+        np.testing.assert_array_equal(day, (dates - dates.astype("datetime64[M]")).astype(np.int64) + 1)
+        np.testing.assert_array_equal(
+            month_serial,
+            360 * (dates.astype("datetime64[Y]").astype(np.int64) + 1970) + 30 * (dates.astype("datetime64[M]").astype(np.int64) % 12 + 1)
+        )
+
+    def test_vectorised_matches_single_dates(self):
+        rng = np.random.default_rng(11)
+        start_dates = np.datetime64("1995-01-01") + rng.integers(0, 10000, 5000)
+        end_dates = start_dates + rng.integers(-400, 4000, 5000)
+
+        for day_count in DAY_COUNT_CONVENTIONS:
+            if day_count == "ACT/ACT ICMA":
+                continue
+            result = year_fractions(start_dates, end_dates, day_count)
+            expected = [year_fraction(start, end, day_count) for start, end in zip(start_dates[:50], end_dates[:50])]
+            np.testing.assert_allclose(result[:50], expected, rtol=0, atol=1e-15)
+
+    def test_invalid_day_count(self):
+        with self.assertRaises(AssertionError):
+            year_fractions(datetime.datetime(2000, 1, 1), datetime.datetime(2001, 1, 1), "BUS/252")
+        with self.assertRaises(AssertionError):
+            year_fractions(datetime.datetime(2000, 1, 1), datetime.datetime(2001, 1, 1), "ACT/ACT ICMA")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,17 @@
 import datetime
 import unittest
 
+import numpy as np
+
 from src.analytics.utils.financial import (calculate_daily_returns,
+                                           discount_factors,
                                            discount_rate,
                                            discount_rate_of_cashflows,
                                            future_value, implied_forward_rate, present_value,
-                                           present_value_of_cashflows)
+                                           present_value_of_cashflow_matrix,
+                                           present_value_of_cashflows,
+                                           yield_of_cashflows,
+                                           yields_of_cashflow_matrix)
 from tests.analytics.helper.testConstants import (MOCK_DISCOUNT_CURVE,
                                                   MOCK_SECURITY_CASHFLOW_ARRAY,
                                                   MOCK_SECURITY_PRICING_SERIES,
@@ -24,6 +30,18 @@ class FinancialTestCase(unittest.TestCase):
 
         self.assertEqual(round(result, 2), 62990.39)
 
+    def test_present_value_day_count(self):
+
+        pricing_date = datetime.datetime(2000, 1, 1)
+        cashflow_date = datetime.datetime(2006, 1, 1)
+
+        result = present_value(pricing_date, cashflow_date, 100000, 0.08, day_count="30/360")
+        discount = discount_factors(pricing_date, np.array([cashflow_date], dtype="datetime64[D]"), 0.08, day_count="ACT/360")
+
+        self.assertAlmostEqual(result, 100000 / 1.08**6, 8)
+        self.assertAlmostEqual(discount[0], 1.08 ** -(2192/360), 15)
+        self.assertAlmostEqual(future_value(pricing_date, cashflow_date, result, 0.08, day_count="30/360"), 100000, 8)
+
     def test_present_value_of_cashflows(self):
 
         pricing_date = datetime.datetime(2000, 1, 1)
@@ -33,6 +51,10 @@ class FinancialTestCase(unittest.TestCase):
         result = present_value_of_cashflows(pricing_date, cashflows, discount_curve)
 
         self.assertEqual(round(result, 2), 15033.82)
+        self.assertEqual(
+            present_value_of_cashflows(pricing_date, cashflows, discount_curve, day_count="ACT/ACT ICMA"),
+            present_value_of_cashflows(pricing_date, cashflows, discount_curve, day_count="ACT/ACT")
+        )
 
     def test_future_value(self):
 
@@ -73,6 +95,94 @@ class FinancialTestCase(unittest.TestCase):
 
         self.assertEqual(result, MOCK_SECURITY_RETURNS)
 
+class PresentValueMatrixTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.pricing_date = datetime.datetime(2000, 1, 1)
+        self.cashflow_dates = np.array([cashflow['date'] for cashflow in MOCK_SECURITY_CASHFLOW_ARRAY], dtype="datetime64[D]")
+        self.cashflow_matrix = np.array([
+            [cashflow['cashflow_value'] for cashflow in MOCK_SECURITY_CASHFLOW_ARRAY],
+            [5.00, 5.00, 5.00, 5.00, 105.00],
+        ])
+
+    def test_discount_factors(self):
+
+        result = discount_factors(self.pricing_date, self.cashflow_dates, 0.08)
+
+        for factor, cashflow_date in zip(result, self.cashflow_dates.astype(datetime.datetime)):
+            self.assertAlmostEqual(factor, present_value(self.pricing_date, datetime.datetime.combine(cashflow_date, datetime.time()), 1.00, 0.08), 12)
+
+    def test_present_value_of_cashflow_matrix_single_curve(self):
+
+        rates = np.array([discount['discount_rate'] for discount in MOCK_DISCOUNT_CURVE])
+
+        result = present_value_of_cashflow_matrix(
+            self.cashflow_matrix,
+            discount_factors(self.pricing_date, self.cashflow_dates, rates)
+        )
+
+        self.assertEqual(result.shape, (2,))
+        self.assertEqual(round(result[0], 2), 15033.82)
+        self.assertAlmostEqual(result[0], present_value_of_cashflows(self.pricing_date, MOCK_SECURITY_CASHFLOW_ARRAY, MOCK_DISCOUNT_CURVE), 8)
+
+    def test_present_value_of_cashflow_matrix_scenarios(self):
+
+        rates = np.array([[0.05]*5, [0.06]*5, [0.04]*5])
+
+        result = present_value_of_cashflow_matrix(
+            self.cashflow_matrix,
+            discount_factors(self.pricing_date, self.cashflow_dates, rates)
+        )
+
+        self.assertEqual(result.shape, (3, 2))
+        self.assertEqual(round(result[0, 0], 2), 15033.82)
+        self.assertTrue(result[1, 1] < result[0, 1] < result[2, 1])
+
+    def test_present_value_of_cashflow_matrix_mismatched_dates(self):
+
+        with self.assertRaises(Exception) as context:
+            present_value_of_cashflow_matrix(self.cashflow_matrix, np.ones(4))
+        self.assertEqual(context.exception.args[0], "discount_factors and cashflow_matrix must have the same number of dates.")
+
+class YieldSolverTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.pricing_date = datetime.datetime(2000, 1, 1)
+        self.cashflow_dates = np.array([cashflow['date'] for cashflow in MOCK_SECURITY_CASHFLOW_ARRAY], dtype="datetime64[D]")
+
+    def test_yield_of_cashflows_recovers_discount_rate(self):
+
+        result = yield_of_cashflows(self.pricing_date, MOCK_SECURITY_CASHFLOW_ARRAY, 15033.82)
+
+        self.assertEqual(round(result, 6), 0.05)
+
+    def test_yield_of_cashflows_reprices(self):
+
+        result = yield_of_cashflows(self.pricing_date, MOCK_SECURITY_CASHFLOW_ARRAY, 1000, guess=0.05)
+        repriced = sum(
+            present_value(self.pricing_date, cashflow['date'], cashflow['cashflow_value'], result)
+            for cashflow in MOCK_SECURITY_CASHFLOW_ARRAY
+        )
+
+        self.assertAlmostEqual(repriced, 1000, 8)
+
+    def test_yields_of_cashflow_matrix(self):
+
+        cashflow_matrix = np.array([
+            [5.00, 5.00, 5.00, 5.00, 105.00],
+            [3.00, 103.00, 0.00, 0.00, 0.00],
+            [0.00, 0.00, 0.00, 0.00, 0.00],
+        ])
+        present_values = np.array([100.00, 95.00, 100.00])
+
+        result = yields_of_cashflow_matrix(self.pricing_date, self.cashflow_dates, cashflow_matrix, present_values)
+        warm_started = yields_of_cashflow_matrix(self.pricing_date, self.cashflow_dates, cashflow_matrix, present_values, guess=result + 0.001)
+
+        factors = discount_factors(self.pricing_date, self.cashflow_dates, result[:2, None])
+        self.assertTrue(np.allclose((cashflow_matrix[:2] * factors).sum(axis=1), present_values[:2], atol=1e-9))
+        self.assertTrue(np.isnan(result[2]))
+        self.assertTrue(np.allclose(warm_started[:2], result[:2], atol=1e-12))
+
 class ImpliedForwardTestCase(unittest.TestCase):
 
     def test_implied_forward_rate_incorrect_input_type(self):
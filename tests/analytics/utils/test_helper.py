@@ -1,9 +1,14 @@
 import unittest
 import datetime
 
+import numpy as np
+
 from src.analytics.utils.helper import (
     calculate_years_between_dates,
+    calculate_years_between_date_arrays,
+    convert_date_series_to_arrays,
     convert_date_series_to_years,
+    year_fractions,
     get_dict_from_list
 )
 from ..helper.testConstants  import ( 
@@ -26,6 +31,37 @@ class HelperTestCase(unittest.TestCase):
 
         self.assertEqual(result, 1)
 
+    def test_calculate_years_between_date_arrays(self):
+
+        start_date = datetime.datetime(2000, 3, 31)
+        end_dates = [
+            datetime.datetime(2001, 3, 30),
+            datetime.datetime(2001, 3, 31),
+            datetime.datetime(2010, 2, 28),
+            datetime.datetime(1998, 4, 1),
+        ]
+
+        result = calculate_years_between_date_arrays(start_date, np.array(end_dates, dtype="datetime64[D]"))
+
+        self.assertEqual(result.tolist(), [calculate_years_between_dates(start_date, end_date) for end_date in end_dates])
+        self.assertEqual(result.tolist(), [0.0, 1.0, 9.0, -1.0])
+
+    def test_calculate_years_between_date_arrays_month_end(self):
+
+        start_date = datetime.datetime(2004, 2, 29)
+        end_dates = [
+            datetime.datetime(2005, 2, 27),
+            datetime.datetime(2005, 2, 28),
+            datetime.datetime(2008, 2, 28),
+            datetime.datetime(2008, 2, 29),
+            datetime.datetime(2003, 2, 28),
+        ]
+
+        result = calculate_years_between_date_arrays(start_date, np.array(end_dates, dtype="datetime64[D]"))
+
+        self.assertEqual(result.tolist(), [calculate_years_between_dates(start_date, end_date) for end_date in end_dates])
+        self.assertEqual(result.tolist(), [0.0, 1.0, 3.0, 4.0, -1.0])
+
     def test_convert_date_series_to_years(self):
         """Convert a list of dicts containing date attribute to
             have relative 'time' value instead of date.
@@ -38,6 +74,73 @@ class HelperTestCase(unittest.TestCase):
 
         self.assertEqual(result, MOCK_BENCHMARK_CURVE_AS_YEARS)
         
+    def test_convert_date_series_to_years_with_day_count(self):
+        series = [
+            {'date': datetime.datetime(1999, 7, 1), 'rate': 0.01},
+            {'date': datetime.datetime(1999, 12, 31), 'rate': 0.015},
+            {'date': datetime.datetime(2001, 1, 1), 'rate': 0.02},
+        ]
+        relative_date = datetime.datetime(1999, 1, 1)
+
+        self.assertEqual(
+            [obj['time'] for obj in convert_date_series_to_years(series, relative_date)],
+            [0.0, 0.0, 2.0]
+        )
+        result = convert_date_series_to_years(series, relative_date, day_count="ACT/365F")
+        self.assertEqual(result, [
+            {'time': 181/365, 'rate': 0.01},
+            {'time': 364/365, 'rate': 0.015},
+            {'time': 731/365, 'rate': 0.02},
+        ])
+
+        times, rates = convert_date_series_to_arrays(series, relative_date, day_count="ACT/360")
+        np.testing.assert_allclose(times, [181/360, 364/360, 731/360])
+        np.testing.assert_array_equal(rates, [0.01, 0.015, 0.02])
+
+    def test_convert_date_series_to_arrays_month_end(self):
+        series = [
+            {'date': datetime.datetime(2005, 2, 28), 'rate': 0.01},
+            {'date': datetime.datetime(2006, 2, 28), 'rate': 0.015},
+            {'date': datetime.datetime(2008, 2, 29), 'rate': 0.02},
+        ]
+        relative_date = datetime.datetime(2004, 2, 29)
+
+        times, _ = convert_date_series_to_arrays(series, relative_date)
+
+        self.assertEqual(times.tolist(), [calculate_years_between_dates(relative_date, obj['date']) for obj in series])
+        self.assertEqual(times.tolist(), [1.0, 2.0, 4.0])
+
+    def test_year_fractions(self):
+        start_date = datetime.datetime(2000, 3, 31)
+        end_dates = np.array(['2000-03-31', '2000-12-31', '2001-03-31', '2004-02-29', '1999-03-31'], dtype="datetime64[D]")
+
+        np.testing.assert_allclose(
+            year_fractions(start_date, end_dates, "ACT/365F"), np.array([0, 275, 365, 1430, -366]) / 365
+        )
+        np.testing.assert_allclose(
+            year_fractions(start_date, end_dates, "ACT/360"), np.array([0, 275, 365, 1430, -366]) / 360
+        )
+        # 2000 and 2004 are leap years.
+        np.testing.assert_allclose(
+            year_fractions(start_date, end_dates, "ACT/ACT"),
+            [0, 275/366, 276/366 + 89/365, 276/366 + 3 + 59/366, -(276/365 + 90/366)]
+        )
+        np.testing.assert_allclose(
+            year_fractions(start_date, end_dates, "30/360"), np.array([0, 270, 360, 1409, -360]) / 360
+        )
+
+    def test_year_fractions_30_360_month_ends(self):
+        start_dates = np.array(['2021-01-30', '2021-01-31', '2021-01-15', '2021-02-28'], dtype="datetime64[D]")
+        end_dates = np.array(['2021-03-31', '2021-03-31', '2021-03-31', '2021-03-31'], dtype="datetime64[D]")
+
+        result = year_fractions(start_dates, end_dates, "30/360")
+
+        np.testing.assert_allclose(result * 360, [60, 60, 76, 33])
+
+    def test_year_fractions_invalid_day_count(self):
+        with self.assertRaises(AssertionError):
+            year_fractions(datetime.datetime(2000, 1, 1), datetime.datetime(2001, 1, 1), "BUS/252")
+
 class GetDictFromListTestCase(unittest.TestCase):
     
     # Test empty dict
@@ -1,5 +1,6 @@
 from datetime import datetime
 import unittest
+import numpy as np
 import pandas as pd
 from typing import Any, Dict, List
 
@@ -8,12 +9,14 @@ from src.analytics.utils.cashflow import (
 )
 
 from src.analytics.utils.date_time import (
+    to_typed_dates,
     _default_date
 )
 
 from src.analytics.utils.pricing import (
     get_negative_accrued_interest,
     get_accrued_interest,
+    get_accrued_interest_array,
     get_pricing_history,
     get_period_total_return,
     get_annualised_return
@@ -96,6 +99,51 @@ class AccruedInterestTestCase(unittest.TestCase):
             -4.0
         )
     
+    def test_get_accrued_interest_day_count(self):
+
+        # 30/360 counts 30 days in January and 28 days to 29 January.
+        self.assertAlmostEqual(
+            get_accrued_interest(
+                datetime(2000, 1, 29),
+                datetime(2000, 1, 1),
+                datetime(2000, 1, 31),
+                datetime(2000, 1, 30),
+                30.00,
+                day_count="30/360"
+            ),
+            28.00
+        )
+
+    def test_get_accrued_interest_array(self):
+
+        pricing_dates = np.datetime64("2000-01-01") + np.arange(31)
+        record_date = datetime(2000, 1, 25)
+
+        for day_count in [None, "ACT/360", "30/360"]:
+            result = get_accrued_interest_array(
+                pricing_dates,
+                datetime(2000, 1, 1),
+                datetime(2000, 1, 31),
+                record_date,
+                31.00,
+                day_count
+            )
+            expected = [
+                get_accrued_interest(
+                    pricing_date.astype("datetime64[us]").astype(datetime),
+                    datetime(2000, 1, 1),
+                    datetime(2000, 1, 31),
+                    record_date,
+                    31.00,
+                    day_count
+                )
+                for pricing_date in pricing_dates
+            ]
+            np.testing.assert_allclose(result, expected, rtol=0, atol=1e-12)
+
+        with self.assertRaises(AssertionError):
+            get_accrued_interest_array(pricing_dates, datetime(2000, 1, 2), datetime(2000, 1, 31), record_date, 31.00)
+
     def test_get_accrued_interest_date_input_incorrect(self):
         
         coupon_period_start_date = datetime.strptime("2000-01-01", "%Y-%m-%d")
@@ -164,6 +212,28 @@ class PriceHistoryTestCase(unittest.TestCase):
         self.assertEqual(end_first_period, result[20])
         self.assertEqual(start_second_period, result[21])
         self.assertEqual(expected_last, result[-1])
+
+    def test_get_pricing_history_typed_dates(self):
+        cashflow_input = generate_cashflows(
+            start_date=_default_date("2000-01-01"),
+            end_date=_default_date("2001-01-01"),
+            cashflow_freq="Q",
+            face_value=100.00,
+            coupon_rate_or_margin=0.05
+        )
+        price_history_input = [{"date": date, "price": 99.5} for date in pd.bdate_range("2000-01-01", "2000-12-29")]
+
+        expected = get_pricing_history("2000-01-01", price_history_input, cashflow_input)
+        result = get_pricing_history(
+            to_typed_dates({"date": "2000-01-01"})["date"],
+            to_typed_dates(price_history_input),
+            to_typed_dates(cashflow_input)
+        )
+
+        self.assertEqual(result, to_typed_dates(expected))
+
+        with self.assertRaises(AssertionError):
+            get_pricing_history("2000-01-01", [{"date": datetime(2001, 1, 1), "price": 99.5}], cashflow_input)
         
 class HistoricalReturnsTestCase(unittest.TestCase):
     